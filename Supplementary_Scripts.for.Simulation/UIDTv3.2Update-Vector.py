@@ -1,6 +1,13 @@
+from uidt_fourier_acceleration import FourierMass
+from uidt_profiling import count, phase, profiled
+from uidt_rng import RNGService
+from uidt_scalar_cluster import embedded_ising_update, source_from_forces
+from uidt_scalar_sweeps import checkerboard_masks, checkerboard_sweep
+
 class UIDTLatticeOptimized(SU3Lattice):
     def __init__(self, cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
-                 m_S=1.705, lambda_S=0.417, v_vev=0.0477):
+                 m_S=1.705, lambda_S=0.417, v_vev=0.0477,
+                 fourier_acceleration=False, fa_mass_scale=1.0, rng=None):
         super().__init__(cfg)
         self.kappa = kappa
         self.Lambda = Lambda
@@ -8,18 +15,27 @@ class UIDTLatticeOptimized(SU3Lattice):
         self.lambda_S = lambda_S
         self.v_vev = v_vev
         
+        # Zähler-basierte Zufallsströme (pro Kette, Zweck und Zeitscheibe)
+        self.rng = rng if rng is not None else RNGService(cfg.seed)
+        
         # Optimierte Initialisierung
         shapeS = (self.Nx, self.Ny, self.Nz, self.Nt)
-        rng = np.random.RandomState(cfg.seed + 7)
-        S_init = (v_vev + 1e-3 * rng.randn(*shapeS)).astype(float)
+        S_init = (v_vev + 1e-3 * self.rng.normal(shapeS, 'scalar_init')).astype(float)
         self.S = to_gpu(S_init)
         self.Ps = to_gpu(xp.zeros_like(self.S))
         self.Pu = None
         
+        # Fourier-beschleunigte Skalarimpulse (Masse M = fa_mass_scale · a·m_S)
+        self.fourier_mass = None
+        if fourier_acceleration:
+            self.fourier_mass = FourierMass.from_scalar_mass(
+                shapeS, m_S, cfg.a, scale=fa_mass_scale, xp=xp)
+        
         # Performance-Monitoring
         self.acceptance_rate = 0.0
         self.avg_delta_H = 0.0
         
+    @profiled('update_U')
     def update_U_vectorized(self, Pu, step_size):
         """
         Vollständig vektorisierte U-Update mit Cayley-Hamilton.
@@ -34,10 +50,82 @@ class UIDTLatticeOptimized(SU3Lattice):
         # Vektorisierte Matrix-Multiplikation
         self.U = xp.matmul(expA, self.U)
         
+    @profiled('update_S')
     def update_S_vectorized(self, Ps, step_size):
-        """Vektorisierte S-Feld Update"""
+        """Vektorisierte S-Feld Update (dS/dτ = M⁻¹ Ps bei Fourier-Beschleunigung)"""
+        if self.fourier_mass is not None:
+            Ps = self.fourier_mass.velocity(Ps)
         self.S = self.S + step_size * Ps
         
+    def random_momenta(self):
+        """su(3)-Impulse Pu = Σ_a ω_a λ_a/√2 aus dem Strom 'momenta'."""
+        shape = (self.Nx, self.Ny, self.Nz, self.Nt, 4)
+        return to_gpu(self.rng.su3_momenta(shape, 'momenta'))
+        
+    def scalar_momenta(self):
+        """Ps ~ N(0, M): Einheitsmasse oder Fourier-Massenmatrix."""
+        shape = (self.Nx, self.Ny, self.Nz, self.Nt)
+        noise = xp.asarray(self.rng.normal(shape, 'scalar_momenta'), dtype=float)
+        if self.fourier_mass is None:
+            return noise
+        return self.fourier_mass.sample_momenta(noise)
+        
+    def scalar_kinetic_shift(self):
+        """
+        ½ Ps·M⁻¹·Ps - ½ Ps²: Korrektur zu _compute_hamiltonian, dessen
+        kinetischer Term Einheitsmasse annimmt (0 ohne Fourier-Beschleunigung).
+        """
+        if self.fourier_mass is None:
+            return 0.0
+        return self.fourier_mass.kinetic_energy(self.Ps) - 0.5 * float(xp.sum(self.Ps**2))
+        
+    @profiled('cluster_update')
+    def cluster_update(self, hopping=1.0, single_cluster=False, method='scipy'):
+        """
+        Eingebettetes Ising-Cluster-Update (Swendsen–Wang) der Vorzeichen von S
+        auf festem Eichhintergrund. Die lineare Quelle j(x) (κ-Kopplung, Terme
+        ungerade in S) folgt aus der Skalarkraft bei ±S; hopping ist der
+        Vorfaktor von S(x)S(x+μ) (1 bei kanonischer Normierung).
+        """
+        S = self.S
+        with phase('scalar_force'):
+            F_plus = self.scalar_force_field_vectorized()
+            self.S = -S
+            F_minus = self.scalar_force_field_vectorized()
+            self.S = S
+        self.S, info = embedded_ising_update(
+            S, self.rng.stream('cluster'), source=source_from_forces(F_plus, F_minus),
+            hopping=hopping, single_cluster=single_cluster, method=method)
+        count('clusters', info['n_clusters'])
+        return info
+        
+    @profiled('scalar_sweep')
+    def scalar_sweep(self, n_hit=4, delta=0.5, n_overrelax=1, verify=False):
+        """
+        Schachbrett-Sweep nur für S (Multi-Hit-Metropolis + Überrelaxation)
+        auf festem Eichhintergrund; die lokale Wirkung stammt aus
+        scalar_force_field_vectorized. Rückgabe: info mit site_updates_per_s.
+        """
+        S = self.S
+        if getattr(self, '_checkerboard', None) is None:
+            self._checkerboard = checkerboard_masks(S.shape, xp)
+        
+        def force_at(S_trial):
+            self.S = S_trial
+            with phase('scalar_force'):
+                return self.scalar_force_field_vectorized()
+        
+        try:
+            S_new, info = checkerboard_sweep(S, force_at, self.rng.stream('scalar_sweep'),
+                                             n_hit=n_hit, delta=delta, n_overrelax=n_overrelax,
+                                             verify=verify, masks=self._checkerboard)
+        finally:
+            self.S = S
+        self.S = S_new
+        count('scalar_site_updates', info['site_updates'])
+        return info
+        
+    @profiled('gauge_force')
     def gauge_force_vectorized(self):
         """
         Vollständig vektorisierte Gauge-Force Berechnung.
@@ -1,7 +1,15 @@
+from functools import partial
+
 import numpy as np
-from scipy.optimize import curve_fit
 from tqdm import trange
 
+from uidt_autocorrelation import integrated_autocorrelation_time
+from uidt_bootstrap import bootstrap
+from uidt_fit_windows import model_average, scan_fit_windows
+from uidt_fitting import CornellModel, correlated_fit, fit_batch, ledoit_wolf_shrinkage, shrink_covariance
+from uidt_profiling import profiled
+from uidt_resampling import jackknife_error, jackknife_means
+
 def project_to_SU3(Q, xp_local=xp):
     """
     Robustes SU(3)-Projektion via Polarzerlegung für 3x3 Matrizen.
@@ -48,9 +56,12 @@ def _single_su3_projection(Q, xp_local):
 
 class UIDTLatticeWithSmearing(UIDTLatticeOptimized):
     def __init__(self, cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
-                 m_S=1.705, lambda_S=0.417, v_vev=0.0477):
-        super().__init__(cfg, kappa, Lambda, m_S, lambda_S, v_vev)
+                 m_S=1.705, lambda_S=0.417, v_vev=0.0477,
+                 fourier_acceleration=False, fa_mass_scale=1.0):
+        super().__init__(cfg, kappa, Lambda, m_S, lambda_S, v_vev,
+                         fourier_acceleration, fa_mass_scale)
         
+    @profiled('ape_smear')
     def ape_smear(self, U_in, alpha=0.5, N_iter=10):
         """
         Vollständig vektorisierte APE-Smearing Implementierung.
@@ -107,6 +118,7 @@ class UIDTLatticeWithSmearing(UIDTLatticeOptimized):
         elif direction == 3:  # t-Richtung
             return xp.roll(matrices, shift, axis=3)
     
+    @profiled('measure_wilson_loop')
     def smeared_wilson_loop(self, R, T, N_APE=10, alpha_APE=0.5):
         """
         Misst Wilson-Loop W(R,T) mit APE-gesmearten Links.
@@ -189,11 +201,85 @@ def extract_potential_from_wilson_loops(W_means, W_errors, T_ratio=1):
     
     return V_R, V_R_err
 
+def potential_from_ratio(W, T_ratio=1):
+    """
+    V(R) = -log[W(R, T_ratio) / W(R, T_ratio-1)] für W der Form (..., R_max, T_max),
+    vektorisiert über führende Achsen (z.B. Jackknife-Stichproben).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = W[..., T_ratio] / W[..., T_ratio - 1]
+        return np.where(ratio > 0, -np.log(ratio), np.nan)
+
+def cornell_sigma_batch(V_R, R_fit, valid_mask, p0, cov):
+    """
+    σ für viele Potential-Stichproben V_R[B, R_max] in einem korrelierten
+    LM-Lauf, warm gestartet bei den Parametern p0 des zentralen Fits.
+    """
+    V = np.atleast_2d(V_R)[:, valid_mask]
+    fit = fit_batch(CornellModel(), R_fit, V, p0, cov=cov)
+    return np.where(np.isfinite(fit['chi2']), fit['params'][:, 2], np.nan)
+
+def _sigma_from_wilson_means(W, T_ratio, R_fit, valid_mask, p0, cov):
+    """σ aus gemittelten Wilson-Loops W[B, R, T] (vektorisierter Bootstrap-Schätzer)."""
+    return cornell_sigma_batch(potential_from_ratio(W, T_ratio), R_fit, valid_mask, p0, cov)
+
+def scan_string_tension(W_loops, T_ratios=None, min_points=4):
+    """
+    σ aus allen Kombinationen (T_ratio, R-Fenster), AIC-gemittelt.
+    W_loops hat die Form (R_max, T_max, N_meas). Für jedes T_ratio kommt die
+    Kovarianz von V(R) aus dem geblockten Jackknife; ausgeschlossene R zählen
+    als N_cut. Rückgabe: model_average-dict plus Liste der Modelle (T, R_min, R_max).
+    """
+    R_max, T_max, _ = W_loops.shape
+    T_ratios = range(1, T_max) if T_ratios is None else T_ratios
+    R_values = np.arange(1, R_max + 1, dtype=float)
+    W_jack = jackknife_means(np.moveaxis(W_loops, -1, 0), block_size='auto')
+    W_mean = W_jack.mean(axis=0)
+    n_jack = W_jack.shape[0]
+    
+    values, chi2, n_cut, jack_values, models = [], [], [], [], []
+    for T_ratio in T_ratios:
+        V = potential_from_ratio(W_mean, T_ratio)
+        V_jack = potential_from_ratio(W_jack, T_ratio)
+        valid = np.isfinite(V) & np.all(np.isfinite(V_jack), axis=0)
+        if valid.sum() < min_points:
+            continue
+        dV = V_jack[:, valid] - V_jack[:, valid].mean(axis=0)
+        V_cov = (n_jack - 1) / n_jack * dV.T @ dV
+        try:
+            scan = scan_fit_windows(CornellModel(), R_values[valid], V[valid], V_cov,
+                                    param_index=2, jack_samples=V_jack[:, valid],
+                                    shrinkage='auto', samples=V_jack[:, valid],
+                                    min_points=min_points)
+        except np.linalg.LinAlgError:
+            continue
+        R_valid = R_values[valid]
+        values.extend(scan['params'][:, 2])
+        chi2.extend(scan['chi2'])
+        n_cut.extend(scan['n_cut'] + (R_max - valid.sum()))
+        jack_values.append(scan['jack_values'])
+        models.extend((T_ratio, int(R_valid[i]), int(R_valid[j])) for i, j in scan['windows'])
+    
+    if not models:
+        return None
+    result = model_average(values, chi2, 3, n_cut, np.concatenate(jack_values))
+    result['models'] = models
+    return result
+
 def run_string_tension_complete(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
                                R_max=6, T_max=8, hmc_steps=10, step_size=0.02,
-                               N_APE_smear=10, alpha_APE=0.5):
+                               N_APE_smear=10, alpha_APE=0.5, n_workers=None,
+                               n_boot=500, seed=None):
     """
     Vollständige Stringspannungs-Messung mit APE-Smearing und statistischer Analyse.
+    Der Cornel-Fit ist korreliert (Kovarianz von V(R) aus dem Jackknife, mit
+    Shrinkage). Der Fehler von σ kommt aus einem geblockten Jackknife
+    (Blockgröße aus τ_int), zur Kontrolle zusätzlich aus einem geblockten
+    Bootstrap mit n_boot Replikaten; alle Stichproben werden als Batch gefittet,
+    die Bootstrap-Chunks bei n_workers > 1 parallel.
+    Primäres Ergebnis ist das AIC-Mittel über alle T_ratio und R-Fenster
+    (scan_string_tension) mit systematischem Fehler; 'sigma_T2' ist der
+    einzelne Fit bei T_ratio = 2.
     """
     print("🏹 Starte Stringspannungs-Messung mit APE-Smearing")
     
@@ -235,11 +321,8 @@ def run_string_tension_complete(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
     W_means = np.mean(W_loops, axis=2)
     W_stds = np.std(W_loops, axis=2)
     
-    # Autokorrelationszeit für jede Wilson-Loop Größe
-    tau_ints = np.zeros((R_max, T_max))
-    for R in range(R_max):
-        for T in range(T_max):
-            tau_ints[R, T] = integrated_autocorrelation_time(W_loops[R, T, :])
+    # Autokorrelationszeit für jede Wilson-Loop Größe (ein vektorisierter Aufruf)
+    tau_ints = integrated_autocorrelation_time(W_loops)
     
     # Effektive Fehler mit tau_int Korrektur
     W_errors = W_stds / np.sqrt(cfg.N_meas / (2 * tau_ints))
@@ -256,37 +339,70 @@ def run_string_tension_complete(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
     valid_mask = ~np.isnan(V_R) & ~np.isnan(V_R_err) & (V_R_err > 0)
     R_fit = R_values[valid_mask]
     V_fit = V_R[valid_mask]
-    V_err_fit = V_R_err[valid_mask]
     
     if len(R_fit) >= 3:  # Mindestens 3 Punkte für Fit
         try:
-            # Startparameter: [V0, alpha, sigma]
-            p0 = [0.1, -0.3, 0.05]
-            bounds = ([-np.inf, -1.0, 0.0], [np.inf, 0.0, 1.0])
-            
-            popt, pcov = curve_fit(cornel_potential, R_fit, V_fit, 
-                                  p0=p0, sigma=V_err_fit, 
-                                  bounds=bounds, absolute_sigma=True)
+            # Geblockter Jackknife von V(R), daraus die Kovarianzmatrix (mit Shrinkage)
+            W_jack = jackknife_means(np.moveaxis(W_loops, -1, 0), block_size='auto')
+            V_jack = potential_from_ratio(W_jack, T_ratio=2)
+            V_jack = V_jack[np.all(np.isfinite(V_jack[:, valid_mask]), axis=1)]
+            n_jack = V_jack.shape[0]
+            dV = V_jack[:, valid_mask] - V_jack[:, valid_mask].mean(axis=0)
+            V_cov = (n_jack - 1) / n_jack * dV.T @ dV
+            V_cov = shrink_covariance(V_cov, ledoit_wolf_shrinkage(V_jack[:, valid_mask]))
             
-            perr = np.sqrt(np.diag(pcov))
+            fit = correlated_fit(CornellModel(), R_fit, V_fit, cov=V_cov)
+            popt = fit['params']
             
             sigma_result = popt[2]
-            sigma_error = perr[2]
-            fit_quality = np.sqrt(np.mean(((V_fit - cornel_potential(R_fit, *popt)) / V_err_fit)**2))
+            sigma_error_fit = fit['errors'][2]
+            fit_quality = np.sqrt(fit['chi2'] / max(fit['dof'], 1))
+            
+            # Alle Jackknife-Stichproben in einem Batch-Fit
+            sigma_jack = cornell_sigma_batch(V_jack, R_fit, valid_mask, popt, V_cov)
+            sigma_error = float(jackknife_error(sigma_jack))
+            if not np.isfinite(sigma_error):
+                sigma_error = sigma_error_fit
+            
+            sigma_boot = bootstrap(
+                partial(_sigma_from_wilson_means, T_ratio=2, R_fit=R_fit,
+                        valid_mask=valid_mask, p0=popt, cov=V_cov),
+                np.moveaxis(W_loops, -1, 0), n_boot=n_boot, block_size='auto',
+                seed=seed, n_workers=n_workers, vectorized=True
+            )
+            sigma_error_boot = float(sigma_boot['error'])
             
         except Exception as e:
             print(f"⚠️ Fit fehlgeschlagen: {e}")
-            sigma_result, sigma_error, fit_quality = np.nan, np.nan, np.nan
+            sigma_result, sigma_error, sigma_error_fit, fit_quality = np.nan, np.nan, np.nan, np.nan
+            sigma_error_boot = np.nan
             popt = None
     else:
         print("⚠️ Nicht genug gültige Datenpunkte für Fit")
-        sigma_result, sigma_error, fit_quality = np.nan, np.nan, np.nan
+        sigma_result, sigma_error, sigma_error_fit, fit_quality = np.nan, np.nan, np.nan, np.nan
+        sigma_error_boot = np.nan
         popt = None
     
+    # Fenster- und T_ratio-Scan: Wahl des Fit-Bereichs als systematischer Fehler
+    tension_scan = scan_string_tension(W_loops)
+    if tension_scan is not None:
+        sigma_avg = tension_scan['value']
+        sigma_stat = tension_scan['stat_error']
+        sigma_sys = tension_scan['sys_error']
+    else:
+        sigma_avg, sigma_stat, sigma_sys = sigma_result, sigma_error, 0.0
+    
     # Ergebnisse zusammenfassen
     results = {
-        'sigma': sigma_result,
-        'sigma_err': sigma_error,
+        'sigma': sigma_avg,
+        'sigma_err': float(np.hypot(sigma_stat, sigma_sys)),
+        'sigma_stat_err': sigma_stat,
+        'sigma_sys_err': sigma_sys,
+        'sigma_T2': sigma_result,
+        'sigma_T2_err': sigma_error,
+        'tension_scan': tension_scan,
+        'sigma_err_fit': sigma_error_fit,
+        'sigma_err_boot': sigma_error_boot,
         'fit_quality': fit_quality,
         'fit_params': popt,
         'V_R': V_R,
@@ -321,7 +437,7 @@ def _plot_string_tension_results(results, cfg, kappa):
     if results['fit_params'] is not None:
         R_fine = np.linspace(0.5, R.max() + 0.5, 100)
         V_fit = cornel_potential(R_fine, *results['fit_params'])
-        plt.plot(R_fine, V_fit, 'r-', label='Cornel-Potential Fit')
+        plt.plot(R_fine, V_fit, 'r-', label='Cornel-Potential Fit (T_ratio = 2)')
         
         sigma_text = f'$\sigma = {results["sigma"]:.4f} \pm {results["sigma_err"]:.4f}$'
         plt.text(0.05, 0.95, sigma_text, transform=plt.gca().transAxes,
@@ -347,7 +463,9 @@ def test_string_tension_small():
                                         N_APE_smear=5)
     
     print(f"\n🎯 Stringspannung Ergebnis:")
-    print(f"   σ = {results['sigma']:.4f} ± {results['sigma_err']:.4f}")
+    print(f"   σ = {results['sigma']:.4f} ± {results['sigma_stat_err']:.4f} (stat) "
+          f"± {results['sigma_sys_err']:.4f} (sys)")
+    print(f"   σ (T_ratio = 2) = {results['sigma_T2']:.4f} ± {results['sigma_T2_err']:.4f}")
     print(f"   Fit-Qualität (χ²/dof): {results['fit_quality']:.2f}")
     print(f"   Akzeptanzrate: {results['acceptance_rate']:.3f}")
     
@@ -1,10 +1,17 @@
 # =============================================================================
 # Importe und Physikalische Konstanten
 # =============================================================================
+import time
+
 import numpy as np
 from scipy.optimize import fsolve, minimize
 from scipy.constants import pi, physical_constants
 
+from uidt_lattice_utils import HBAR_C
+from uidt_online_stats import OnlineAccumulator
+from uidt_resampling import jackknife_error
+from uidt_rng import RNGService
+
 # --- Fundamentale UIDT-Konstanten (GeV-Einheiten) ---
 # Diese Werte werden als Zielwerte oder feste Inputs für die Minimierung verwendet.
 class UIDT_CONSTANTS:
@@ -22,6 +29,8 @@ class LATTICE_SETUP:
     N_BURNIN = 1000   # Burn-in Trajektorien
     HMC_TAU = 1.0     # Molekulare Dynamik Integrationszeit
     N_LEAPFROG = 20   # Leapfrog Schritte
+    A_FM = 0.1        # Gitterabstand a (fm)
+    SEED = 12345      # Wurzel der RNG-Ströme
 
 # =============================================================================
 # I. UIDT V3.2 SELBSTKONSISTENZ-SOLVER (Newton-Raphson/fsolve)
@@ -97,78 +106,198 @@ def solve_canonical_parameters():
 # =============================================================================
 
 # --- HMC Feld-Definition und Aktionen ---
-def S_Field_Action(S_field, m_S, lambda_S, kappa, C, Lambda, v, target_delta):
+# Gitter-Einheiten: Ŝ = a S, m̂ = a m_S, ĥ = a³ κC/Λ, λ_S dimensionslos.
+def lattice_couplings(m_S, lambda_S, kappa, C, Lambda, a_fm):
+    """Kopplungen der Gitterwirkung für den Gitterabstand a (fm)."""
+    a = a_fm / HBAR_C  # GeV⁻¹
+    return {
+        'a': a,
+        'm2': (a * m_S)**2,
+        'lambda_S': lambda_S,
+        'h': a**3 * kappa * C / Lambda,
+    }
+
+def _neighbour_sum(S_field):
+    """Σ_μ [S(x+μ) + S(x-μ)] mit periodischen Randbedingungen."""
+    total = np.roll(S_field, 1, axis=0)
+    total += np.roll(S_field, -1, axis=0)
+    for mu in range(1, S_field.ndim):
+        total += np.roll(S_field, 1, axis=mu)
+        total += np.roll(S_field, -1, axis=mu)
+    return total
+
+def kinetic_density(S_field):
+    """(1/V) Σ_x Σ_μ (S(x+μ) - S(x))², Gitter-Schätzer für ⟨∂μS∂μS⟩."""
+    total = 0.0
+    for mu in range(S_field.ndim):
+        d = np.roll(S_field, -1, axis=mu)
+        d -= S_field
+        total += np.vdot(d, d)
+    return float(total) / S_field.size
+
+def S_Field_Action(S_field, m2, lambda_S, h):
     """
-    Definiert die Euklidische Gitter-Aktion für die HMC-Simulation.
-    Diese Aktion muss das Skalarfeld S in den gekoppelten Gleichungen enthalten.
+    Euklidische Gitter-Aktion des Skalarfeldes (Gitter-Einheiten):
+    S = Σ_x [½ Σ_μ (S(x+μ) - S(x))² + ½ m̂² S² + (λ_S/24) S⁴ - ĥ S]
+    Der lineare Term ist die Kopplung κC/Λ an das Gluon-Kondensat.
     """
-    # 1. Kinetischer Term (Ableitungen auf dem Gitter)
-    Kinetic_Term = 0.5 * np.sum((np.roll(S_field, 1, axis=0) - S_field)**2 + ...) # Vereinfachte Ableitung
-    
-    # 2. Potentieller Term (V(S)) - Skalarfeld-Potential
-    # V(S) = 0.5 * m_S^2 * S^2 + (lambda_S / 24) * S^4 + V_0
-    Potential_Term = np.sum(0.5 * m_S**2 * S_field**2 + (lambda_S / 24) * S_field**4)
+    kinetic = 0.5 * S_field.size * kinetic_density(S_field)
+    S2 = S_field * S_field
+    potential = np.sum(S2 * (0.5 * m2 + (lambda_S / 24) * S2))
+    coupling = -h * np.sum(S_field)
+    return kinetic + potential + coupling
 
-    # 3. Gluon-Kondensat-Kopplung (Induziert durch S_Field in Yang-Mills Sektion)
-    # Wird hier als einfacher Kopplungsterm modelliert, da das Gluon-Feld integriert ist.
-    # Dies ist der komplizierteste Teil, der das Mass Gap induziert.
-    # Näherungsweise als S-Feld-Kopplung an den Vakuum-Term:
-    Coupling_Term = np.sum(- (kappa * C) / Lambda * S_field) # Linearer Kopplungsterm
-    
-    return Kinetic_Term + Potential_Term + Coupling_Term
+def S_Field_Force(S_field, m2, lambda_S, h):
+    """
+    ∂S/∂S(x) = -Σ_μ [S(x+μ) + S(x-μ) - 2S(x)] + m̂² S + (λ_S/6) S³ - ĥ.
+    Produkte statt Potenzen und In-place-Operationen (S**3 läuft über pow).
+    """
+    F = S_field * S_field
+    F *= lambda_S / 6
+    F += 2 * S_field.ndim + m2
+    F *= S_field
+    F -= _neighbour_sum(S_field)
+    F -= h
+    return F
 
-def HMC_Measurement_Kinetic_VEV(m_S, lambda_S, kappa):
+def scalar_hmc_trajectory(S_field, couplings, rng, n_leapfrog, tau):
+    """
+    Eine HMC-Trajektorie (Leapfrog, H = ½ Σ π² + S). Rückgabe:
+    (neues Feld, akzeptiert, ΔH); bei Ablehnung das alte Feld.
     """
-    Führt die HMC-Simulation aus, misst ⟨∂μS∂μS⟩ und berechnet γ.
-    Hinweis: Der vollständige HMC-Algorithmus (Hamiltonian, Momentum, Leapfrog) 
-    ist hochkomplex und wird hier nur konzeptuell skizziert.
+    m2, lambda_S, h = couplings['m2'], couplings['lambda_S'], couplings['h']
+    eps = tau / n_leapfrog
+    P = rng.normal(S_field.shape, 'scalar_momenta')
+    H_old = 0.5 * np.sum(P**2) + S_Field_Action(S_field, m2, lambda_S, h)
+
+    S_new = S_field.copy()
+    P -= 0.5 * eps * S_Field_Force(S_new, m2, lambda_S, h)
+    for step in range(n_leapfrog):
+        S_new += eps * P
+        F = S_Field_Force(S_new, m2, lambda_S, h)
+        P -= (eps if step < n_leapfrog - 1 else 0.5 * eps) * F
+
+    H_new = 0.5 * np.sum(P**2) + S_Field_Action(S_new, m2, lambda_S, h)
+    delta_H = float(H_new - H_old)
+    if rng.uniform('metropolis') < np.exp(-delta_H):
+        return S_new, True, delta_H
+    return S_field, False, delta_H
+
+def HMC_Measurement_Kinetic_VEV(m_S, lambda_S, kappa, v=0.0, L=None, n_traj=None,
+                                n_burnin=None, a_fm=None, seed=None, n_bins=64,
+                                target_acceptance=(0.6, 0.9), tune_every=10):
+    """
+    Führt die Skalarfeld-HMC auf dem L⁴-Gitter aus, misst ⟨∂μS∂μS⟩ und berechnet γ.
+    
+    Nach n_burnin Trajektorien wird pro Trajektorie die kinetische Dichte
+    gemessen und in einem OnlineAccumulator mit höchstens n_bins
+    Jackknife-Bins gestreamt; die Bin-Breite wächst mit, sodass die Bins die
+    Autokorrelation überdecken. γ und sein Fehler kommen aus denselben
+    Jackknife-Stichproben. ⟨∂μS∂μS⟩ = K̂ / a⁴ aus dem Gitterwert K̂.
+    
+    Start bei Ŝ = a v plus Rauschen mit der lokalen Gauß-Breite
+    1/sqrt(2d + m̂²). In der zweiten Hälfte des Burn-ins (die erste relaxiert
+    das Startrauschen, dort ist ΔH < 0) wird die Zahl der Leapfrog-Schritte
+    bei festem τ alle tune_every Trajektorien nachgeregelt, bis die Akzeptanz
+    in target_acceptance liegt; in der Messphase bleibt ε fest.
     """
     print("\n--- Sektion II: HMC-Lattice-Simulation und γ-Verifikation ---")
+    L = L or LATTICE_SETUP.L
+    n_traj = n_traj or LATTICE_SETUP.N_STEPS
+    n_burnin = LATTICE_SETUP.N_BURNIN if n_burnin is None else n_burnin
+    a_fm = a_fm or LATTICE_SETUP.A_FM
+    seed = LATTICE_SETUP.SEED if seed is None else seed
+    if n_traj <= n_burnin:
+        raise ValueError(f"n_traj={n_traj} lässt nach n_burnin={n_burnin} keine Messung übrig")
     
-    # --- 1. Simulation der S-Feld-Dynamik ---
-    S_field = np.zeros([LATTICE_SETUP.L] * 4) # 4D Lattice
-    Kinetic_VEV_Measurements = []
-    
-    for step in range(LATTICE_SETUP.N_STEPS):
-        # *************************************************************
-        # HMC-CORE:
-        # 1. Erzeuge Zufallsimpuls P
-        # 2. Speichere alten Wert S_old, P_old
-        # 3. Führe Molekulare Dynamik (Leapfrog) durch: (P, S) -> (P', S')
-        # 4. Akzeptanztest (Metropolis-Hastings) für den Übergang
-        # *************************************************************
-        # ... (komplexer HMC-Code hier) ...
+    couplings = lattice_couplings(m_S, lambda_S, kappa, UIDT_CONSTANTS.C_QCD,
+                                  UIDT_CONSTANTS.LAMBDA, a_fm)
+    a = couplings['a']
+    rng = RNGService(seed)
+    
+    # --- 1. Simulation der S-Feld-Dynamik (Start im Vakuum Ŝ = a v plus Rauschen) ---
+    width = 1.0 / np.sqrt(2 * 4 + couplings['m2'])
+    S_field = a * v + width * rng.normal([L] * 4, 'scalar_init')
+    kinetic = OnlineAccumulator(max_bins=n_bins)
+    S_vev = OnlineAccumulator(max_bins=n_bins)
+    accepted = 0
+    exp_mdH_sum = 0.0
+    n_leapfrog = LATTICE_SETUP.N_LEAPFROG
+    accepted_tune = 0
+    
+    start = time.perf_counter()
+    for step in range(n_traj):
+        S_field, acc, delta_H = scalar_hmc_trajectory(
+            S_field, couplings, rng, n_leapfrog, LATTICE_SETUP.HMC_TAU)
         
-        if step > LATTICE_SETUP.N_BURNIN:
+        if step < n_burnin:
+            # ΔH ∝ ε⁴ V: ε über die Schrittzahl nachregeln, τ bleibt fest
+            accepted_tune += acc
+            if (step + 1) % tune_every == 0:
+                rate = accepted_tune / tune_every
+                accepted_tune = 0
+                if step >= n_burnin // 2:
+                    if rate < target_acceptance[0]:
+                        n_leapfrog = int(np.ceil(n_leapfrog * 1.25))
+                    elif rate > target_acceptance[1]:
+                        n_leapfrog = max(1, int(n_leapfrog / 1.25))
+        else:
             # --- 2. Messung der Observablen ---
-            # Berechnung des kinetischen VEV: ⟨∂μS∂μS⟩ = Summe_x Summe_μ (S_x+μ - S_x)^2 / V
-            # Wird direkt auf dem Gitter gemessen.
-            
-            # Beispielhafte Gitter-Ableitung (Vereinfachung):
-            kinetic_energy_density = 0.011045 # Verifizierter Wert aus Audit-Report
-            Kinetic_VEV_Measurements.append(kinetic_energy_density)
+            accepted += acc
+            exp_mdH_sum += np.exp(-delta_H)
+            kinetic.push(kinetic_density(S_field))
+            S_vev.push(np.mean(S_field))
+    elapsed = time.perf_counter() - start
+    n_meas = kinetic.n
+    
+    print(f"Gitter {L}^4, a = {a_fm} fm: {n_traj} Trajektorien in {elapsed:.1f} s "
+          f"({n_traj / elapsed:.1f} Traj./s), {n_leapfrog} Leapfrog-Schritte")
     
     # --- 3. Mittelwertbildung ---
-    if Kinetic_VEV_Measurements:
-        avg_vev_kinetic = np.mean(Kinetic_VEV_Measurements)
-    else:
-        avg_vev_kinetic = UIDT_CONSTANTS.TARGET_DELTA**2 / UIDT_CONSTANTS.TARGET_GAMMA**2
-        print("WARNUNG: HMC-Messung übersprungen. Nutze verifizierten Wert.")
-        
+    if accepted == 0:
+        raise RuntimeError(f"HMC hat in {n_meas} Messtrajektorien nichts akzeptiert "
+                           f"(ε = {LATTICE_SETUP.HMC_TAU / n_leapfrog:.3g}); "
+                           "längeres Burn-in oder kleineres ε nötig")
+    if not kinetic.mean > 0:
+        raise RuntimeError("Kinetische Dichte K̂ = 0: Feld ist konstant, γ nicht definiert")
+    
+    K_jack = kinetic.jackknife_samples() / a**4
+    avg_vev_kinetic = float(kinetic.mean) / a**4
+    vev_err = float(jackknife_error(K_jack))
+    
     # --- 4. Berechnung von γ ---
     # γ = Δ / sqrt(⟨∂μS∂μS⟩)
     gamma_calculated = UIDT_CONSTANTS.TARGET_DELTA / np.sqrt(avg_vev_kinetic)
+    gamma_err = float(jackknife_error(UIDT_CONSTANTS.TARGET_DELTA / np.sqrt(K_jack)))
     
-    print(f"Gemessener ⟨∂μS∂μS⟩ = {avg_vev_kinetic:.6f} GeV²")
-    print(f"Abgeleitetes γ = {gamma_calculated:.2f}")
+    print(f"Akzeptanz = {accepted / n_meas:.3f}, ⟨exp(-ΔH)⟩ = {exp_mdH_sum / n_meas:.4f}, "
+          f"τ_int(K) = {float(kinetic.tau_int()):.2f}")
+    print(f"⟨S⟩ = {float(S_vev.mean) / a * 1000:.2f} ± {float(S_vev.jackknife_error()) / a * 1000:.2f} MeV")
+    print(f"Gemessener ⟨∂μS∂μS⟩ = {avg_vev_kinetic:.6f} ± {vev_err:.6f} GeV⁴")
+    print(f"Abgeleitetes γ = {gamma_calculated:.2f} ± {gamma_err:.2f}")
     
     # --- 5. Verifikations-Output ---
-    if abs(gamma_calculated - UIDT_CONSTANTS.TARGET_GAMMA) < 0.01:
+    deviation = abs(gamma_calculated - UIDT_CONSTANTS.TARGET_GAMMA)
+    if deviation < max(0.01, 2 * gamma_err):
         print(f"VERIFIKATION: γ-Faktor stimmt mit dem Zielwert von {UIDT_CONSTANTS.TARGET_GAMMA} überein. UIDT V3.2 ist konsistent.")
+    elif gamma_err > 0:
+        print(f"FEHLER: γ-Faktor weicht ab ({deviation / gamma_err:.1f} σ).")
     else:
-        print("FEHLER: γ-Faktor weicht ab.")
+        print(f"FEHLER: γ-Faktor weicht um {deviation:.2f} ab (kein Fehlerbalken, zu wenige Messungen).")
         
-    return gamma_calculated
+    return {
+        'gamma': gamma_calculated,
+        'gamma_err': gamma_err,
+        'kinetic_vev': avg_vev_kinetic,
+        'kinetic_vev_err': vev_err,
+        'kinetic_vev_lattice': float(kinetic.mean),
+        'S_vev_gev': float(S_vev.mean) / a,
+        'acceptance': accepted / n_meas,
+        'n_leapfrog': n_leapfrog,
+        'tau_int': float(kinetic.tau_int()),
+        'n_meas': n_meas,
+        'seconds': elapsed,
+    }
 
 # =============================================================================
 # III. EXEKUTION DES MASTER-SKRIPTS
@@ -186,7 +315,8 @@ if __name__ == "__main__":
             print("Kritischer Fehler: λ_S > 1. LÖSUNG IST NICHT PHYSISCH VORZUZIEHEN.")
             
         # 3. Führe HMC zur Messung und Berechnung von γ durch
-        gamma_final = HMC_Measurement_Kinetic_VEV(m_S, lambda_S, kappa)
+        hmc_result = HMC_Measurement_Kinetic_VEV(m_S, lambda_S, kappa, v)
+        gamma_final = hmc_result['gamma']
         
         # 4. Visualisierung (Wie in den hochgeladenen Plots V.3)
         # HMC-Diagnose-Plot (z.B. Plaquette-Verlauf, Delta-H, Autokorrelation)
@@ -1,7 +1,33 @@
-def run_optimized_uidt_hmc(cfg: LatticeConfig, kappa=0.5, Lambda=1.0, 
-                          use_omelyan=True, adaptive_stepsize=True):
+import numpy as np
+
+from uidt_hmc_tuning import HMCTuner, load_checkpoint, save_checkpoint
+from uidt_memory import MemoryTracker
+from uidt_metrics import MetricsExporter
+from uidt_profiling import PROFILER, phase
+
+def run_optimized_uidt_hmc(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
+                          use_omelyan=True, adaptive_stepsize=True,
+                          step_size=0.02, n_steps=10, target_acceptance=0.8,
+                          checkpoint_path='uidt_hmc_checkpoint.npz', checkpoint_every=500,
+                          resume=False, profile=False, profile_path='uidt_hmc_profile.folded',
+                          track_memory=False, memory_budgets=None, memory_action='warn',
+                          metrics_file=None, metrics_port=None, metrics_interval=5.0):
     """
     Optimierte Haupt-HMC-Schleife mit allen Verbesserungen.
+    
+    Während der Thermalisierung stellt ein HMCTuner Schrittweite (Dual
+    Averaging auf target_acceptance) und Trajektorienlänge ein, danach sind
+    die Parameter eingefroren (n_steps weiterhin zufällig gestreut).
+    Checkpoints enthalten Felder, HMC-Parameter, RNG-Zustand und die
+    bisherigen Messreihen; resume=True setzt die Messphase aus
+    checkpoint_path fort, results umfasst dann alle Messungen.
+    profile=True schaltet die Profiling-Hooks ein, druckt die Aufschlüsselung
+    nach Phasen und schreibt gefaltete Stacks nach profile_path.
+    track_memory=True misst Speicherspitzen pro Phase (tracemalloc + RSS) und
+    prüft memory_budgets (Bytes pro Phase) mit memory_action 'warn'/'raise'.
+    Mit metrics_file und/oder metrics_port werden Live-Metriken (Prometheus-
+    Format) alle metrics_interval Sekunden aus einem Hintergrund-Thread
+    veröffentlicht.
     """
     lat = UIDTLatticeOptimized(cfg, kappa=kappa, Lambda=Lambda)
     
@@ -14,33 +40,109 @@ def run_optimized_uidt_hmc(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
         'm_eff_values': [],
         'acceptance_rates': []
     }
+    series = tuple(results)
+    
+    def measurements():
+        # Messreihen für save_checkpoint(..., **extra)
+        return {key: np.asarray(results[key], dtype=float) for key in series}
+    
+    start = 0
+    if resume:
+        start, hmc_params, saved = load_checkpoint(checkpoint_path, lat)
+        tuner = HMCTuner.from_state(hmc_params, seed=lat.rng.stream('hmc_tuning'))
+        for key in series:
+            if key in saved:
+                results[key] = saved[key].tolist()
+        if start > cfg.N_therm and not all(key in saved for key in series):
+            print("⚠️  Checkpoint ohne Messreihen: results enthält nur Messungen ab der Fortsetzung")
+        print(f"♻️  Fortsetzung ab Trajektorie {start} (ε = {tuner.step_size:.4f}, "
+              f"{len(results['plaq_values'])} Messungen übernommen)")
+    else:
+        tuner = HMCTuner(step_size, n_steps, target_acceptance=target_acceptance,
+                         seed=lat.rng.stream('hmc_tuning'))
+        if not adaptive_stepsize:
+            tuner.frozen = True
+    
+    if profile:
+        PROFILER.reset()
+        PROFILER.enable()
+    memory = None
+    if track_memory:
+        memory = MemoryTracker(memory_budgets, action=memory_action).start()
+    metrics = None
+    if metrics_file or metrics_port is not None:
+        metrics = MetricsExporter(metrics_file, port=metrics_port, interval=metrics_interval,
+                                  labels={'kappa': kappa, 'beta': cfg.beta, 'L': lat.Nx}).start()
     
     print("🔥 Starte optimierte UIDT HMC Simulation")
     
-    for trajectory in range(cfg.N_therm + cfg.N_meas):
+    for trajectory in range(start, cfg.N_therm + cfg.N_meas):
+        if trajectory == cfg.N_therm and not tuner.frozen:
+            hmc_params = tuner.freeze()
+            print(f"🎛️  HMC-Parameter eingefroren: ε = {hmc_params['step_size']:.4f}, "
+                  f"τ = {hmc_params['trajectory_length']:.3f} "
+                  f"(n_steps ≈ {hmc_params['n_steps_mean']})")
+            save_checkpoint(checkpoint_path, lat, trajectory, hmc_params, **measurements())
+    
+        eps, n_md = tuner.next_parameters()
+        S_before = float(xp.mean(lat.S))
         if use_omelyan:
-            accepted, delta_H = lat.omelyan_integrator_2nd_order()
+            accepted, delta_H = lat.omelyan_integrator_2nd_order(n_steps=n_md, step_size=eps)
         else:
+            lat.step_size, lat.n_steps = eps, n_md
             accepted, delta_H = lat.hmc_trajectory()
-        
-        # Adaptive Schrittweite
-        if adaptive_stepsize and trajectory % 50 == 0:
-            lat.adaptive_hmc_step_size()
-        
+    
+        # Tuning nur während der Thermalisierung
+        if trajectory < cfg.N_therm:
+            tuner.update(delta_H, S_before, float(xp.mean(lat.S)))
+    
         # Messungen nach Thermalisierung
+        plaq = S_mean = None
         if trajectory >= cfg.N_therm and trajectory % cfg.N_skip == 0:
-            plaq = - (3.0 / cfg.beta) * lat.wilson_action() / (lat.Nx * lat.Ny * lat.Nz * lat.Nt * 6.0)
-            S_mean = float(xp.mean(lat.S))
-            
+            with phase('measure'):
+                plaq = - (3.0 / cfg.beta) * lat.wilson_action() / (lat.Nx * lat.Ny * lat.Nz * lat.Nt * 6.0)
+                S_mean = float(xp.mean(lat.S))
+    
             results['plaq_values'].append(float(plaq))
             results['S_values'].append(S_mean)
             results['acceptance_rates'].append(lat.acceptance_rate)
-            
+    
             if trajectory % 100 == 0:
                 print(f"📊 Trajectory {trajectory}: Plaq={plaq:.4f}, "
                       f"<S>={S_mean:.4f}, Accept={lat.acceptance_rate:.3f}")
     
+        if metrics is not None:
+            metrics.record(accepted, delta_H, eps, n_md, plaq, S_mean)
+    
+        if trajectory > cfg.N_therm and (trajectory + 1) % checkpoint_every == 0:
+            with phase('checkpoint'):
+                save_checkpoint(checkpoint_path, lat, trajectory + 1, tuner.state(),
+                                **measurements())
+    
+    if not tuner.frozen:
+        tuner.freeze()
+    results['hmc_params'] = tuner.state()
+    save_checkpoint(checkpoint_path, lat, cfg.N_therm + cfg.N_meas, tuner.state(),
+                    **measurements())
+    
+    if metrics is not None:
+        metrics.stop()
+    
+    if memory is not None:
+        memory.stop()
+        print("🧠 Speicherspitzen nach Phasen:")
+        memory.print_report()
+        results['memory'] = memory.report()
+    
+    if profile:
+        PROFILER.disable()
+        print("⏱️  Laufzeit nach Phasen:")
+        PROFILER.print_report()
+        PROFILER.write_folded(profile_path)
+        results['profile'] = PROFILER.report()
+        results['counters'] = dict(PROFILER.counters)
+    
     # Performance-Report
     lat.performance_benchmark()
     
-    return results, lat
\ No newline at end of file
+    return results, lat
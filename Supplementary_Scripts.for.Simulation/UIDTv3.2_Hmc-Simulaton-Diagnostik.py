@@ -1,3 +1,5 @@
+from functools import partial
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
@@ -5,11 +7,51 @@ from tqdm import trange
 import warnings
 warnings.filterwarnings('ignore')
 
+from uidt_glueball_gevp import (
+    analyze_variational_glueball, timeslice_correlator_matrix, variational_operator_basis
+)
+from uidt_glueball_irreps import GlueballOperatorBuilder, compare_with_predictions
+from uidt_autocorrelation import autocorrelation_fft, gamma_method
+from uidt_bootstrap import bootstrap, parametric_bootstrap
+from uidt_fit_windows import scan_windows_from_bins
+from uidt_fitting import MultiExpModel
+from uidt_lattice_utils import to_physical_units
+from uidt_online_stats import ObservableRecorder
+from uidt_parallel_tempering import ParallelTempering
+from uidt_profiling import profiled
+from uidt_reweighting import kappa_conjugate_action, kappa_reweighting
+from uidt_scan_scheduler import (
+    ScanScheduler, config_grid, config_variants, failures, result_rows
+)
+from uidt_thermalization import lattice_state, load_lattice_state, thermalize
+
+# UIDT-Vorhersage (UIDT-3.3-Verification.py, _predict_glueball_spectrum)
+UIDT_GLUEBALL_SPECTRUM = {
+    '0++': 1.710,
+    '2++': 1.710 * 1.395,
+    '0-+': 1.710 * 1.475,
+    '1+-': 1.710 * 1.825,
+    '2-+': 1.710 * 2.110,
+}
+
 # ============ ERWEITERTE DIAGNOSTIK ============
 
-def run_full_hmc_simulation(config=None):
+def run_full_hmc_simulation(config=None, variational=True, irreps=True,
+                            smear_levels=(0, 4, 8, 16), alpha_APE=0.5,
+                            snapshot_every=None, on_snapshot=None,
+                            n_boot=1000, seed=None, n_workers=None):
     """
-    Vollständige HMC-Simulation mit erweiterter Diagnostik
+    Vollständige HMC-Simulation mit erweiterter Diagnostik.
+    Mit variational=True wird zusätzlich die GEVP-Operatorbasis
+    (Plaquette + Rechteck auf mehreren APE-Stufen) pro Konfiguration gemessen,
+    mit irreps=True alle O_h × P × C Kanäle für das volle Glueball-Spektrum.
+
+    Messungen laufen in einen ObservableRecorder (lattice.measurement_stats),
+    Speicherbedarf unabhängig von N_meas. Mit snapshot_every wird alle n
+    Messungen on_snapshot(i, recorder.snapshot()) aufgerufen.
+    Die Glueball-Masse ist das AIC-Mittel über alle Fit-Fenster (mit
+    systematischem Fehler der Fensterwahl), zum Vergleich wird der
+    Plateau-Wert mit Bootstrap-Fehler ausgegeben.
     """
     if config is None:
         config = LatticeConfig(
@@ -47,8 +89,12 @@ def run_full_hmc_simulation(config=None):
     
     # Messphase
     print("📊 Messphase...")
-    S_vev_measurements = []
-    correlators = []
+    stats = ObservableRecorder()
+    stats.declare('S_vev', trace_length=1000)
+    stats.declare('correlator', covariance=True, trace_length=100)
+    lattice.measurement_stats = stats
+    t_extent = min(12, config.N_temporal // 2 + 1)
+    irrep_builder = GlueballOperatorBuilder(alpha=alpha_APE, t_extent=t_extent) if irreps else None
     
     for i in trange(config.N_meas):
         # HMC Updates
@@ -65,28 +111,55 @@ def run_full_hmc_simulation(config=None):
             lattice.acceptance_rate.append(acceptance_count / total_trajectories)
         
         # Messungen
-        S_vev = float(np.mean(lattice.S))
-        S_vev_measurements.append(S_vev)
+        stats.record(S_vev=float(np.mean(lattice.S)),
+                     correlator=simple_correlator(lattice, t_max=min(12, config.N_temporal)))
         
-        C = simple_correlator(lattice, t_max=min(12, config.N_temporal))
-        correlators.append(C)
+        if variational:
+            O, _ = variational_operator_basis(lattice.U, smear_levels=smear_levels,
+                                              alpha=alpha_APE)
+            c_ij, O_mean = timeslice_correlator_matrix(O, t_extent=t_extent)
+            stats.record(gevp_c=c_ij, gevp_O=O_mean)
+        
+        if irreps:
+            c_rows, O_rows = irrep_builder.measure(lattice.U)
+            stats.record(irrep_c=c_rows, irrep_O=O_rows)
+        
+        if snapshot_every and on_snapshot is not None and (i + 1) % snapshot_every == 0:
+            on_snapshot(i + 1, stats.snapshot())
     
     # Statistische Analyse
-    C_array = np.array(correlators)
-    C_avg = np.mean(C_array, axis=0)
-    C_err = np.std(C_array, axis=0) / np.sqrt(len(correlators))
-    
-    # Massenextraktion
-    m_glueball, m_err = extract_mass_exponential(C_avg, config.a)
+    C_avg = stats['correlator'].mean
+    C_err = stats['correlator'].std_error
+    
+    # Plateau-Masse (feste Fenster t = 2..6), Fehler per Bootstrap
+    m_plateau, _ = extract_mass_exponential(C_avg, config.a)
+    m_boot = bootstrap(partial(glueball_mass_estimate, a=config.a),
+                       stats['correlator'].jackknife_bins(), n_boot=n_boot,
+                       seed=seed, n_workers=n_workers)
+    m_plateau_err = float(m_boot['error'])
+    
+    # Alle Fit-Fenster (t_min, t_max), AIC-gemittelt → systematischer Fehler der Fensterwahl
+    try:
+        window_scan = scan_windows_from_bins(MultiExpModel(1), np.arange(len(C_avg)),
+                                             stats['correlator'].jackknife_bins(),
+                                             t_min_range=(1, 4))
+        m_glueball = to_physical_units(window_scan['value'], config.a)
+        m_err = to_physical_units(window_scan['stat_error'], config.a)
+        m_sys = to_physical_units(window_scan['sys_error'], config.a)
+    except (np.linalg.LinAlgError, ValueError) as e:
+        print(f"⚠️ Fenster-Scan fehlgeschlagen ({e}), verwende Plateau-Wert")
+        window_scan = None
+        m_glueball, m_err, m_sys = m_plateau, m_plateau_err, 0.0
     
     # Vergleich mit Lattice QCD
     lattice_qcd_mass = 1.710  # GeV
     lattice_qcd_err = 0.080   # GeV
     
-    z_score = abs(m_glueball - lattice_qcd_mass) / np.sqrt(m_err**2 + lattice_qcd_err**2)
+    z_score = abs(m_glueball - lattice_qcd_mass) / np.sqrt(m_err**2 + m_sys**2 + lattice_qcd_err**2)
     
     print(f"\n📊 ERGEBNISSE:")
-    print(f"   Glueball-Masse: {m_glueball:.3f} ± {m_err:.3f} GeV")
+    print(f"   Glueball-Masse: {m_glueball:.3f} ± {m_err:.3f} (stat) ± {m_sys:.3f} (sys) GeV")
+    print(f"   Plateau t=2..6: {m_plateau:.3f} ± {m_plateau_err:.3f} GeV")
     print(f"   Lattice QCD:    {lattice_qcd_mass:.3f} ± {lattice_qcd_err:.3f} GeV")
     print(f"   Z-Score:        {z_score:.2f}σ")
     
@@ -97,11 +170,38 @@ def run_full_hmc_simulation(config=None):
     else:
         print("  → SIGNIFIKANTE ABWEICHUNG! Potentieller UIDT-Effekt")
     
+    # Variationsanalyse (GEVP) über die Operatorbasis
+    spectroscopy = {'window_scan': window_scan}
+    if variational:
+        # Jackknife über die Bin-Mittelwerte (geblockt, begrenzte Anzahl)
+        gevp_results = analyze_variational_glueball(
+            stats['gevp_c'].jackknife_bins(), stats['gevp_O'].jackknife_bins(),
+            config.a, t0=1, t_min=2, t_max=6
+        )
+        print(f"\n📊 GEVP ({gevp_results['n_operators_kept']} Operatoren):")
+        for n, (m, dm) in enumerate(zip(gevp_results['masses'], gevp_results['mass_errors'])):
+            print(f"   0++ Zustand {n}: {m:.3f} ± {dm:.3f} GeV")
+        spectroscopy['gevp'] = gevp_results
+    
+    # Glueball-Spektrum aller J^PC-Kanäle
+    if irreps:
+        irrep_results = irrep_builder.analyze(stats['irrep_c'].jackknife_bins(),
+                                              stats['irrep_O'].jackknife_bins(), config.a)
+        comparison = compare_with_predictions(irrep_results, UIDT_GLUEBALL_SPECTRUM)
+        print("\n📊 Glueball-Spektrum (O_h-Kanäle):")
+        for jpc, row in comparison.items():
+            print(f"   {jpc}: {row['measured']:.3f} ± {row['measured_err']:.3f} GeV "
+                  f"(UIDT: {row['predicted']:.3f} GeV, Z = {row['z_score']:.2f}σ)")
+        spectroscopy['irreps'] = irrep_results
+        spectroscopy['spectrum_comparison'] = comparison
+    
     # Visualisierung
-    plot_hmc_diagnostics(lattice, correlators, C_avg, C_err, config)
+    plot_hmc_diagnostics(lattice, stats['correlator'].trace, C_avg, C_err, config,
+                         S_vev_trace=stats['S_vev'].trace)
     
-    return lattice, S_vev_measurements, correlators
+    return lattice, stats['S_vev'], stats['correlator'], spectroscopy
 
+@profiled('measure_correlator')
 def simple_correlator(lattice, t_max=10):
     """
     Vereinfachter Glueball-Korrelator
@@ -156,25 +256,21 @@ def extract_mass_exponential(C, a, t_min=2, t_max=6):
     
     return m_phys_gev, m_err_gev
 
-def integrated_autocorr_time(data, max_lag=100):
+def glueball_mass_estimate(C, a, t_min=2, t_max=6):
+    """Nur die Masse aus extract_mass_exponential (Schätzer für Resampling)."""
+    return extract_mass_exponential(C, a, t_min, t_max)[0]
+
+def integrated_autocorr_time(data, max_lag=None, S=1.5, return_error=False):
     """
     Integrierte Autokorrelationszeit
-    τ_int = 1/2 + Σ_{t=1}^∞ ρ(t)
+    τ_int = 1/2 + Σ_{t=1}^W ρ(t), ρ via FFT, Fenster W automatisch (Γ-Methode)
     """
-    data = np.array(data) - np.mean(data)
-    n = len(data)
-    
-    autocorr = np.correlate(data, data, mode='full')[n-1:] / (n * np.var(data))
-    
-    tau_int = 0.5
-    for t in range(1, min(max_lag, len(autocorr))):
-        if autocorr[t] < 0.01:  # Cutoff für kleine Korrelationen
-            break
-        tau_int += autocorr[t]
-    
-    return max(0.5, tau_int)
+    result = gamma_method(np.asarray(data, dtype=float), S=S, max_lag=max_lag)
+    if return_error:
+        return float(result['tau_int']), float(result['tau_int_err'])
+    return float(result['tau_int'])
 
-def plot_hmc_diagnostics(lattice, correlators, C_avg, C_err, config):
+def plot_hmc_diagnostics(lattice, correlators, C_avg, C_err, config, S_vev_trace=None):
     """Umfassende Visualisierung"""
     
     fig = plt.figure(figsize=(16, 12))
@@ -266,7 +362,8 @@ def plot_hmc_diagnostics(lattice, correlators, C_avg, C_err, config):
     
     # 6. S-Feld VEV Historie
     ax6 = fig.add_subplot(gs[1, 2])
-    # Hier müssten S_vev_measurements übergeben werden
+    if S_vev_trace is not None and len(S_vev_trace) > 0:
+        ax6.plot(np.asarray(S_vev_trace), color='orange', alpha=0.7, linewidth=0.8)
     ax6.set_xlabel('Konfiguration')
     ax6.set_ylabel('⟨S⟩ [GeV]')
     ax6.set_title('Skalarfeld VEV')
@@ -275,20 +372,19 @@ def plot_hmc_diagnostics(lattice, correlators, C_avg, C_err, config):
     # 7. Autokorrelation (Action)
     ax7 = fig.add_subplot(gs[2, 0])
     if hasattr(lattice, 'action_history'):
-        action_data = np.array(lattice.action_history) - np.mean(lattice.action_history)
-        autocorr = np.correlate(action_data, action_data, mode='full')
-        autocorr = autocorr[len(autocorr)//2:] / autocorr[len(autocorr)//2]
+        autocorr = autocorrelation_fft(lattice.action_history, max_lag=200)
         
-        lag_max = min(200, len(autocorr))
+        lag_max = len(autocorr)
         ax7.plot(range(lag_max), autocorr[:lag_max], color='blue')
         ax7.axhline(0, color='black', linestyle='-', linewidth=0.5)
         ax7.axhline(np.exp(-1), color='red', linestyle='--', 
                     label='e⁻¹ Schwelle')
         
         # Integrierte Autokorrelationszeit
-        tau_int = integrated_autocorr_time(lattice.action_history)
+        tau_int, tau_int_err = integrated_autocorr_time(lattice.action_history,
+                                                        return_error=True)
         ax7.axvline(tau_int, color='green', linestyle='--', 
-                    label=f'τ_int = {tau_int:.1f}')
+                    label=f'τ_int = {tau_int:.1f} ± {tau_int_err:.1f}')
     
     ax7.set_xlabel('Lag')
     ax7.set_ylabel('Autokorrelation')
@@ -342,13 +438,124 @@ def plot_hmc_diagnostics(lattice, correlators, C_avg, C_err, config):
 
 # ============ PARAMETER-SCANS ============
 
-def parameter_scan_kappa():
+KAPPA_SCAN_COLUMNS = [
+    ('kappa', 'kappa'),
+    ('m_glueball_GeV', 'm_glueball'),
+    ('m_err_GeV', 'm_err'),
+    ('S_vev', 'S_vev'),
+    ('z_score', 'z_score'),
+]
+
+
+def _scan_lattice(config, initial_state=None, n_therm=100, n_meas=50, n_skip=5):
+    """
+    Verkürzte Simulation für Scans: Gitter und Recorder mit Korrelator, ⟨S⟩
+    und dem κ-konjugierten Wirkungsterm X = ∂S/∂κ (für Reweighting) pro
+    Konfiguration. Mit initial_state startet das Gitter von einem thermalisierten Feld eines
+    Nachbarpunkts; die Thermalisierung endet in beiden Fällen automatisch
+    (MSER), höchstens nach n_therm Trajektorien.
+    """
+    lattice = UIDTLatticeHMC(config)
+    if initial_state is not None:
+        load_lattice_state(lattice, initial_state)
+    therm = thermalize(lattice, max_traj=n_therm)
+    
+    stats = ObservableRecorder(trace_length=n_meas)
+    for _ in range(n_meas):
+        for _ in range(n_skip):
+            lattice.hmc_trajectory_omelyan()
+        stats.record(correlator=simple_correlator(lattice),
+                     S_vev=float(np.mean(lattice.S)),
+                     kappa_action=kappa_conjugate_action(lattice))
+    return lattice, stats, therm
+
+
+def _thermalized_trunk(config, seed=0):
+    """Gemeinsames thermalisiertes Startfeld für den Verzweigungsmodus."""
+    np.random.seed(seed)
+    lattice = UIDTLatticeHMC(config)
+    therm = thermalize(lattice, max_traj=config.N_therm)
+    print(f"🌱 Stamm thermalisiert nach {therm['n_traj']} Trajektorien")
+    return lattice_state(lattice)
+
+
+def kappa_scan_job(config, seed, initial_state=None):
+    """Ein Punkt des κ-Scans (läuft im Worker-Prozess des Schedulers)."""
+    lattice, stats, therm = _scan_lattice(config, initial_state)
+    
+    C_avg = stats['correlator'].mean
+    m_glueball, m_err = extract_mass_exponential(C_avg, config.a)
+    
+    # Vergleich mit Lattice QCD
+    z_score = abs(m_glueball - 1.710) / np.sqrt(m_err**2 + 0.080**2)
+    return {
+        'm_glueball': m_glueball,
+        'm_err': m_err,
+        'S_vev': float(stats['S_vev'].mean),
+        'z_score': z_score,
+        'n_therm': therm['n_traj'],
+        '_state': lattice_state(lattice),
+        '_samples': {name: np.array(stats[name].trace)
+                     for name in ('kappa_action', 'S_vev', 'correlator')}
+    }
+
+
+def beta_scan_job(config, seed, initial_state=None):
+    """Ein Punkt des β-Scans mit Bootstrap-Fehler der Masse."""
+    lattice, stats, therm = _scan_lattice(config, initial_state)
+    
+    correlators = np.array(stats['correlator'].trace)
+    m_glueball, _ = extract_mass_exponential(correlators.mean(axis=0), config.a)
+    m_err = float(bootstrap(partial(glueball_mass_estimate, a=config.a),
+                            correlators, n_boot=500, seed=seed)['error'])
+    return {'m_glueball': m_glueball, 'm_err': m_err, 'n_therm': therm['n_traj'],
+            '_state': lattice_state(lattice)}
+
+
+def _run_scan(scheduler, jobs, mode, resume, seed):
+    """
+    Scan-Modi:
+      'parallel' – unabhängige Kaltstarts im Prozesspool
+      'branch'   – ein thermalisierter Stamm in der Gittermitte, alle Punkte
+                   verzweigen parallel davon (unabhängige Zufallsströme)
+      'chain'    – seriell, jeder Punkt startet vom Endfeld des Vorgängers
+                   (geringste Kosten, benachbarte Punkte korreliert)
+    """
+    if mode == 'parallel':
+        return scheduler.run(jobs, resume=resume)
+    if mode == 'branch':
+        trunk_config = jobs[len(jobs) // 2][1]
+        return scheduler.run(jobs, resume=resume,
+                             initial_state=_thermalized_trunk(trunk_config, seed))
+    if mode == 'chain':
+        return scheduler.run_chain(jobs, resume=resume)
+    raise ValueError(f"Unbekannter Scan-Modus: {mode}")
+
+
+def _print_thermalization(records):
+    n_therm = [r['result']['n_therm'] for r in records if r['status'] == 'ok']
+    if n_therm:
+        print(f"   Thermalisierung: {sum(n_therm)} Trajektorien gesamt "
+              f"(Ø {np.mean(n_therm):.0f} pro Punkt)")
+
+
+def _report_failures(records):
+    for record in failures(records):
+        print(f"\n❌ Job {record['job']} {record['params']} fehlgeschlagen:")
+        print(record['traceback'])
+
+
+def parameter_scan_kappa(n_workers=None, output_dir='scan_results', seed=0, resume=True,
+                         mode='branch'):
     """
     Systematischer κ-Scan
     Ziel: Finde κ-Bereich, der mit Lattice QCD kompatibel ist
+    
+    Die Punkte laufen im ScanScheduler (mode: 'parallel', 'branch', 'chain',
+    siehe _run_scan); Teilergebnisse stehen in output_dir/kappa_scan.partial.jsonl,
+    die Tabelle in kappa_scan_results.csv.
     """
     kappa_values = np.linspace(0.1, 1.0, 10)
-    results = []
     
     base_config = LatticeConfig(
         N_spatial=12,
@@ -366,63 +573,73 @@ def parameter_scan_kappa():
     print("PARAMETER-SCAN: κ ∈ [0.1, 1.0]")
     print("="*60)
     
-    for i, kappa in enumerate(kappa_values):
-        print(f"\n[{i+1}/{len(kappa_values)}] κ = {kappa:.3f}")
-        print("-" * 40)
-        
-        base_config.kappa = kappa
-        
-        try:
-            # Verkürzte Simulation
-            lattice = UIDTLatticeHMC(base_config)
-            
-            # Schnelle Thermalisierung
-            for _ in range(100):
-                lattice.hmc_trajectory_omelyan()
-            
-            # Messungen
-            correlators = []
-            S_vevs = []
-            for _ in range(50):  # Weniger Messungen
-                for _ in range(5):
-                    lattice.hmc_trajectory_omelyan()
-                C = simple_correlator(lattice)
-                correlators.append(C)
-                S_vevs.append(float(np.mean(lattice.S)))
-            
-            C_avg = np.mean(correlators, axis=0)
-            m_glueball, m_err = extract_mass_exponential(C_avg, base_config.a)
-            S_vev_avg = np.mean(S_vevs)
-            
-            # Vergleich mit Lattice QCD
-            z_score = abs(m_glueball - 1.710) / np.sqrt(m_err**2 + 0.080**2)
-            
-            results.append({
-                'kappa': kappa,
-                'm_glueball': m_glueball,
-                'm_err': m_err,
-                'S_vev': S_vev_avg,
-                'z_score': z_score
-            })
-            
-            print(f"   m_glueball = {m_glueball:.3f} ± {m_err:.3f} GeV")
-            print(f"   ⟨S⟩ = {S_vev_avg:.4f}")
-            print(f"   Z-Score = {z_score:.2f}σ")
-            
-        except Exception as e:
-            print(f"   ❌ Fehler: {e}")
-            results.append({
-                'kappa': kappa,
-                'm_glueball': np.nan,
-                'm_err': np.nan,
-                'S_vev': np.nan,
-                'z_score': np.nan
-            })
+    scheduler = ScanScheduler(kappa_scan_job, name='kappa_scan', output_dir=output_dir,
+                              n_workers=n_workers, root_seed=seed)
+    records = _run_scan(scheduler, config_grid(base_config, kappa=kappa_values),
+                        mode, resume, seed)
+    _report_failures(records)
+    _print_thermalization(records)
+    
+    path = scheduler.write_table(records, KAPPA_SCAN_COLUMNS, 'kappa_scan_results.csv')
+    print(f"✓ κ-Scan Tabelle gespeichert: {path}")
+    
+    results = result_rows(records, [key for _, key in KAPPA_SCAN_COLUMNS])
+    for r in results:
+        print(f"   κ = {r['kappa']:.3f}: m_glueball = {r['m_glueball']:.3f} ± "
+              f"{r['m_err']:.3f} GeV, ⟨S⟩ = {r['S_vev']:.4f}, Z = {r['z_score']:.2f}σ")
     
     return results
 
-def plot_kappa_scan(results):
-    """Visualisiere κ-Scan Ergebnisse"""
+def _plateau_mass_batch(C, a, t_min=2, t_max=6):
+    """Plateau der effektiven Masse wie extract_mass_exponential, für Korrelatoren (L, T)."""
+    C = np.asarray(C, dtype=float)
+    t = np.arange(t_min, min(t_max, C.shape[-1] - 1))
+    valid = (C[..., t] > 0) & (C[..., t + 1] > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m_eff = np.where(valid, np.log(C[..., t] / C[..., t + 1]), np.nan)
+    m_lattice = np.where(valid.sum(axis=-1) >= 2, np.nanmean(m_eff, axis=-1), np.nan)
+    return to_physical_units(m_lattice, a)
+
+
+def reweighted_kappa_scan(kappa_dense=None, a=0.12, output_dir='scan_results', n_bins=10):
+    """
+    MBAR-Reweighting der κ-Scan-Ensembles auf ein dichtes κ-Gitter, ohne
+    neue Simulationen. Verwendet die von kappa_scan_job gespeicherten
+    Messreihen (X = ∂S/∂κ, ⟨S⟩, Korrelator) aller erfolgreichen Punkte;
+    a ist der Gitterabstand des Scans (wie in parameter_scan_kappa).
+    """
+    scheduler = ScanScheduler(kappa_scan_job, name='kappa_scan', output_dir=output_dir)
+    records = [r for _, r in sorted(scheduler.load_partial().items()) if r['status'] == 'ok']
+    samples = [(r['params']['kappa'], scheduler.load_arrays(r['job'], 'samples'))
+               for r in records]
+    samples = [(kappa, data) for kappa, data in samples if data is not None]
+    if len(samples) < 2:
+        print("❌ Zu wenige gespeicherte Ensembles für Reweighting")
+        return None
+    
+    kappas = np.array([kappa for kappa, _ in samples])
+    if kappa_dense is None:
+        kappa_dense = np.linspace(kappas.min(), kappas.max(), 10 * len(kappas) - 9)
+    
+    result = kappa_reweighting(
+        np.concatenate([data['kappa_action'] for _, data in samples]),
+        {name: np.concatenate([data[name] for _, data in samples])
+         for name in ('S_vev', 'correlator')},
+        kappas, [len(data['kappa_action']) for _, data in samples], kappa_dense,
+        derived={'m_glueball': lambda means: _plateau_mass_batch(means['correlator'], a)},
+        n_bins=n_bins
+    )
+    
+    n_reliable = int(np.sum(result['reliable']))
+    gap = np.sort(np.linalg.eigvals(result['overlap']).real)[-2]
+    print(f"\n🔁 κ-Reweighting: {len(kappas)} Ensembles → {len(kappa_dense)} κ-Werte")
+    print(f"   ESS ≥ 50 an {n_reliable}/{len(kappa_dense)} Punkten, "
+          f"2. Eigenwert der Überlappungsmatrix: {gap:.3f}")
+    return result
+
+
+def plot_kappa_scan(results, reweighted=None):
+    """Visualisiere κ-Scan Ergebnisse (optional mit MBAR-Reweighting-Band)"""
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
     
     # Filtere gültige Ergebnisse
@@ -445,6 +662,15 @@ def plot_kappa_scan(results):
                 label='Lattice QCD (1.710 GeV)')
     ax1.fill_between(kappas, 1.710-0.080, 1.710+0.080, 
                      alpha=0.2, color='red', label='Lattice Fehler')
+    
+    # MBAR-Reweighting (nur Punkte mit ausreichender Überlappung)
+    if reweighted is not None:
+        ok = reweighted['reliable']
+        k_rw = reweighted['kappa'][ok]
+        m_rw = reweighted['derived']['m_glueball'][ok]
+        dm_rw = reweighted['derived_error']['m_glueball'][ok]
+        ax1.plot(k_rw, m_rw, '-', color='navy', alpha=0.7, label='Reweighting (MBAR)')
+        ax1.fill_between(k_rw, m_rw - dm_rw, m_rw + dm_rw, color='navy', alpha=0.15)
     ax1.set_xlabel('κ (UIDT Kopplung)')
     ax1.set_ylabel('m_glueball [GeV]')
     ax1.set_title('Glueball-Masse vs UIDT-Kopplung')
@@ -467,6 +693,10 @@ def plot_kappa_scan(results):
     # ⟨S⟩
     line2 = ax2_twin.plot(kappas, S_vevs, 'o-', color='blue', 
                           label='⟨S⟩', linewidth=2)
+    if reweighted is not None:
+        S_rw = reweighted['mean']['S_vev'][ok]
+        dS_rw = reweighted['error']['S_vev'][ok]
+        ax2_twin.fill_between(k_rw, S_rw - dS_rw, S_rw + dS_rw, color='blue', alpha=0.15)
     ax2_twin.set_ylabel('⟨S⟩ [VEV]', color='blue')
     ax2_twin.tick_params(axis='y', labelcolor='blue')
     
@@ -485,73 +715,52 @@ def plot_kappa_scan(results):
 
 # ============ BETA-SCAN FÜR KONTINUUMSLIMES ============
 
-def beta_scan_continuum_limit():
+def beta_scan_continuum_limit(n_workers=None, output_dir='scan_results', seed=0,
+                              resume=True, mode='chain'):
     """
     β-Scan zur Untersuchung des Kontinuumslimes
     Verschiedene β-Werte entsprechen verschiedenen Gitterabständen a
+    
+    Standardmäßig als Kette (mode='chain'): jedes β startet vom Feld des
+    nächstgröberen Gitters.
     """
     beta_values = [5.6, 5.7, 5.8, 5.9, 6.0]
     a_values = [0.15, 0.12, 0.10, 0.08, 0.07]  # Typische Werte für SU(3)
     
-    results = []
+    base_config = LatticeConfig(
+        N_spatial=12,
+        N_temporal=24,
+        beta=beta_values[0],
+        a=a_values[0],
+        N_therm=500,
+        N_meas=1000,
+        N_skip=5,
+        kappa=0.5,
+        Lambda=1.0
+    )
     
     print("\n" + "="*60)
     print("KONTINUUMSLIMES: β-SCAN")
     print("="*60)
     
-    for beta, a in zip(beta_values, a_values):
-        print(f"\nβ = {beta}, a = {a:.3f} fm")
-        print("-" * 30)
-        
-        config = LatticeConfig(
-            N_spatial=12,
-            N_temporal=24,
-            beta=beta,
-            a=a,
-            N_therm=500,
-            N_meas=1000,
-            N_skip=5,
-            kappa=0.5,
-            Lambda=1.0
-        )
-        
-        try:
-            # Schnelle Simulation
-            lattice = UIDTLatticeHMC(config)
-            
-            for _ in range(100):
-                lattice.hmc_trajectory_omelyan()
-            
-            correlators = []
-            for _ in range(50):
-                for _ in range(5):
-                    lattice.hmc_trajectory_omelyan()
-                C = simple_correlator(lattice)
-                correlators.append(C)
-            
-            C_avg = np.mean(correlators, axis=0)
-            m_glueball, m_err = extract_mass_exponential(C_avg, a)
-            
-            # Physikalische Masse in GeV
-            m_phys = m_glueball
-            
-            results.append({
-                'beta': beta,
-                'a': a,
-                'm_glueball': m_phys,
-                'm_err': m_err
-            })
-            
-            print(f"   m_glueball = {m_phys:.3f} ± {m_err:.3f} GeV")
-            
-        except Exception as e:
-            print(f"   ❌ Fehler: {e}")
-            results.append({
-                'beta': beta,
-                'a': a,
-                'm_glueball': np.nan,
-                'm_err': np.nan
-            })
+    # β und a gehören paarweise zusammen: kein Gitterprodukt
+    jobs = config_variants(base_config, [{'beta': beta, 'a': a}
+                                         for beta, a in zip(beta_values, a_values)])
+    scheduler = ScanScheduler(beta_scan_job, name='beta_scan', output_dir=output_dir,
+                              n_workers=n_workers, root_seed=seed)
+    records = _run_scan(scheduler, jobs, mode, resume, seed)
+    _report_failures(records)
+    _print_thermalization(records)
+    
+    columns = [('beta', 'beta'), ('a_fm', 'a'), ('m_glueball_GeV', 'm_glueball'),
+               ('m_err_GeV', 'm_err')]
+    path = scheduler.write_table(records, columns)
+    print(f"✓ β-Scan Tabelle gespeichert: {path}")
+    
+    results = result_rows(records, [key for _, key in columns])
+    for r in results:
+        print(f"   β = {r['beta']}, a = {r['a']:.3f} fm: "
+              f"m_glueball = {r['m_glueball']:.3f} ± {r['m_err']:.3f} GeV")
     
     return results
 
@@ -585,10 +794,16 @@ def plot_continuum_limit(results):
             ax1.plot(a_fine, mass_fit, '--', color='gray', 
                      label=f'Linearer Fit: {coeffs[0]:.2f}a + {coeffs[1]:.2f}')
             
-            # Extrapolation zu a=0
+            # Extrapolation zu a=0, Fehler per parametrischem Bootstrap
             m_continuum = coeffs[1]
+            extrapolation = parametric_bootstrap(
+                lambda m: np.polyfit(a_values, m, 1)[1], masses, mass_errs, n_boot=2000, seed=0
+            )
+            m_continuum_err = float(extrapolation['error'])
             ax1.axhline(m_continuum, color='green', linestyle=':', 
-                        label=f'Extrapoliert: {m_continuum:.3f} GeV')
+                        label=f'Extrapoliert: {m_continuum:.3f} ± {m_continuum_err:.3f} GeV')
+            ax1.axhspan(m_continuum - m_continuum_err, m_continuum + m_continuum_err,
+                        color='green', alpha=0.1)
         except:
             pass
     
@@ -611,6 +826,81 @@ def plot_continuum_limit(results):
     plt.savefig('continuum_limit.png', dpi=300, bbox_inches='tight')
     print("✓ Kontinuumslimes Plot gespeichert: continuum_limit.png")
 
+# ============ PARALLEL TEMPERING NAHE DEM PHASENÜBERGANG ============
+
+def _tempering_measure(lattice):
+    """Messungen pro Tauschrunde (picklebar für die Replikat-Prozesse)."""
+    n_sites = lattice.cfg.N_spatial**3 * lattice.cfg.N_temporal * 6.0
+    return {'S_vev': float(np.mean(lattice.S)),
+            'plaquette': -(3.0 / lattice.cfg.beta) * float(lattice.wilson_action()) / n_sites}
+
+
+def parallel_tempering_kappa(kappa_values=None, n_rounds=300, n_adapt=100, n_traj=5, seed=0):
+    """
+    Replica Exchange über eine κ-Leiter: am Phasenübergang erster Ordnung
+    (Sprung in ⟨S⟩, UIDT-3.3 _predict_phase_transition) tunnelt eine einzelne
+    HMC-Kette kaum; getauschte Replikate überqueren die Barriere über
+    benachbarte κ. Die Leiter wird während n_adapt Runden angepasst.
+    """
+    if kappa_values is None:
+        kappa_values = np.linspace(0.1, 1.0, 8)
+    
+    config = LatticeConfig(
+        N_spatial=12,
+        N_temporal=24,
+        beta=5.7,
+        a=0.12,
+        N_therm=500,
+        N_meas=1000,
+        N_skip=5,
+        kappa=float(kappa_values[0]),
+        Lambda=1.0
+    )
+    
+    print("\n" + "="*60)
+    print(f"PARALLEL TEMPERING: {len(kappa_values)} Replikate, "
+          f"κ ∈ [{min(kappa_values)}, {max(kappa_values)}]")
+    print("="*60)
+    
+    tempering = ParallelTempering(UIDTLatticeHMC, config, kappa_values, parameter='kappa',
+                                  n_traj=n_traj, measure=_tempering_measure, seed=seed)
+    result = tempering.run(n_rounds, n_adapt=n_adapt)
+    
+    for kappa, stats, acc in zip(result['ladder'], result['stats'], result['hmc_acceptance']):
+        snap = stats['S_vev'].snapshot()
+        print(f"   κ = {kappa:.3f}: ⟨S⟩ = {snap['mean']:.4f} ± {snap['error']:.4f}, "
+              f"HMC-Akzeptanz {acc:.2f}")
+    return result
+
+
+def plot_parallel_tempering(result):
+    """⟨S⟩ entlang der Leiter, Tauschraten und Replikatfluss"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    
+    ladder = result['ladder']
+    S_mean = [float(st['S_vev'].mean) for st in result['stats']]
+    S_err = [float(st['S_vev'].snapshot()['error']) for st in result['stats']]
+    ax1.errorbar(ladder, S_mean, yerr=S_err, fmt='o-', capsize=4, color='blue')
+    ax1.set_xlabel('κ (UIDT Kopplung)')
+    ax1.set_ylabel('⟨S⟩ [VEV]')
+    ax1.set_title('Ordnungsparameter entlang der κ-Leiter')
+    ax1.grid(alpha=0.3)
+    
+    mid = 0.5 * (ladder[1:] + ladder[:-1])
+    ax2.plot(mid, result['swap_acceptance'], 's-', color='red', label='Tauschrate')
+    ax2.plot(ladder, result['up_fraction'], 'o--', color='green',
+             label='Anteil aufwärts wandernder Replikate')
+    ax2.set_xlabel('κ (UIDT Kopplung)')
+    ax2.set_ylim(0, 1.05)
+    ax2.set_title(f"Round-Trips: {result['round_trips']} "
+                  f"(Ø {result['round_trip_time']:.0f} Trajektorien)")
+    ax2.legend()
+    ax2.grid(alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig('parallel_tempering_kappa.png', dpi=300, bbox_inches='tight')
+    print("✓ Parallel-Tempering Plot gespeichert: parallel_tempering_kappa.png")
+
 # ============ HAUPTAUSFÜHRUNG ============
 
 if __name__ == "__main__":
@@ -621,18 +911,24 @@ if __name__ == "__main__":
     
     # 1. Hauptsimulation
     print("🎯 1. VOLLSTÄNDIGE HMC-SIMULATION")
-    lattice, S_vev_data, correlator_data = run_full_hmc_simulation()
+    lattice, S_vev_stats, correlator_stats, spectroscopy = run_full_hmc_simulation()
     
     # 2. κ-Scan
     print("\n🎯 2. κ-PARAMETER-SCAN")
     kappa_results = parameter_scan_kappa()
-    plot_kappa_scan(kappa_results)
+    kappa_reweighted = reweighted_kappa_scan()
+    plot_kappa_scan(kappa_results, kappa_reweighted)
     
     # 3. Kontinuumslimes
     print("\n🎯 3. KONTINUUMSLIMES-ANALYSE") 
     continuum_results = beta_scan_continuum_limit()
     plot_continuum_limit(continuum_results)
     
+    # 4. Replica Exchange nahe dem Phasenübergang
+    print("\n🎯 4. PARALLEL TEMPERING IN κ")
+    tempering_results = parallel_tempering_kappa()
+    plot_parallel_tempering(tempering_results)
+    
     print("\n" + "="*60)
     print("ANALYSE ABGESCHLOSSEN")
     print("="*60)
@@ -642,7 +938,9 @@ if __name__ == "__main__":
     print("   1. Vollständige HMC-Simulation mit Diagnostik")
     print("   2. κ-Scan zur Identifikation kompatibler Parameter")
     print("   3. β-Scan für Kontinuumslimes-Extrapolation")
+    print("   4. Parallel Tempering über die κ-Leiter")
     print("\n📊 Ergebnisse in Plots gespeichert:")
     print("   - uidt_hmc_full_diagnostics.png")
     print("   - kappa_scan_results.png") 
-    print("   - continuum_limit.png")
\ No newline at end of file
+    print("   - continuum_limit.png")
+    print("   - parallel_tempering_kappa.png")
\ No newline at end of file
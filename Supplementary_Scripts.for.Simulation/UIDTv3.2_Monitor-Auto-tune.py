@@ -15,40 +15,89 @@ def adaptive_hmc_step_size(self, target_acceptance=0.8, adjustment_rate=0.05):
     
     return self.step_size
 
-def performance_benchmark(self, n_trajectories=100):
+def performance_benchmark(self, n_trajectories=100, warmup=2, report_path=None, baseline_path=None):
     """
     Benchmark der Performance-Optimierungen.
+    
+    Zeitmessung mit time.perf_counter (uidt_benchmark.time_kernel), Ausgabe von
+    Median und Interquartilsabstand. Mit report_path wird ein JSON/CSV-Bericht
+    inkl. Maschinen- und Commit-Metadaten geschrieben, mit baseline_path gegen
+    einen gespeicherten Bericht verglichen. Die Skalierung über Gittergrößen
+    und Präzisionen misst uidt_benchmark.run_benchmarks.
     """
+    from uidt_benchmark import (compare_with_baseline, git_metadata, load_report,
+                                machine_metadata, print_comparison, time_kernel,
+                                write_report)
+    
     print("🚀 Performance Benchmark für UIDT HMC")
     print("=" * 50)
     
-    import time
-    
     # Test mit verschiedenen Methoden
     methods = {
-        'Original Leapfrog': self.hmc_trajectory,
-        'Omelyan + Cayley-Hamilton': self.omelyan_integrator_2nd_order
+        'leapfrog': self.hmc_trajectory,
+        'omelyan_cayley_hamilton': self.omelyan_integrator_2nd_order
     }
     
+    L = self.Nx
+    dtype = str(self.U.dtype)
+    rows = []
     for name, method in methods.items():
         print(f"\n📊 Testing: {name}")
         
-        times = []
         acceptances = []
         
-        for i in range(n_trajectories):
-            start_time = time.time()
+        def trajectory():
             accepted, delta_H = method()
-            end_time = time.time()
-            
-            times.append(end_time - start_time)
             acceptances.append(accepted)
         
-        avg_time = np.mean(times)
-        acceptance_rate = np.mean(acceptances)
+        t = time_kernel(trajectory, repeats=n_trajectories, warmup=warmup, xp=xp)
+        acceptance_rate = np.mean(acceptances[warmup:])
         
-        print(f"   ⏱️  Average time: {avg_time:.4f}s")
+        print(f"   ⏱️  Median time: {t['median']:.4f}s (IQR {t['iqr']:.4f}s)")
         print(f"   ✅ Acceptance rate: {acceptance_rate:.3f}")
-        print(f"   🎯 Performance: {1/avg_time:.2f} trajectories/s")
+        print(f"   🎯 Performance: {1/t['median']:.2f} trajectories/s")
+        
+        rows.append({
+            'kernel': f'trajectory_{name}', 'L': L, 'dtype': dtype,
+            'median_s': t['median'], 'iqr_s': t['iqr'], 'min_s': t['min'], 'max_s': t['max'],
+            'repeats': n_trajectories, 'items': self.Nx * self.Ny * self.Nz * self.Nt,
+            'throughput': 1.0 / t['median'], 'times': t['times'],
+            'acceptance': float(acceptance_rate),
+        })
+    
+    metadata = machine_metadata()
+    metadata.update(git_metadata())
+    metadata.update({'lattice': [self.Nx, self.Ny, self.Nz, self.Nt], 'warmup': warmup})
+    report = {'metadata': metadata, 'results': rows}
+    if report_path:
+        write_report(report, report_path)
+    if baseline_path:
+        baseline = load_report(baseline_path)
+        print_comparison(compare_with_baseline(report, baseline), baseline['metadata'])
+    
+    return report
+
+def memory_profile(self, n_trajectories=2, budgets=None, action='warn', report_path=None,
+                   measure=None):
+    """
+    Speicherspitzen pro Phase für einige Trajektorien (und optional eine
+    Messung `measure(self)`), z.B. auf einem kleinen Gitter mit Budgets in
+    Vielfachen von link_field_bytes, um Speicher-Regressionen früh zu sehen.
+    """
+    from uidt_memory import MemoryTracker
+    from uidt_profiling import phase
+    
+    print("🧠 Speicherprofil für UIDT HMC")
+    print("=" * 50)
+    
+    with MemoryTracker(budgets, action=action) as memory:
+        for _ in range(n_trajectories):
+            self.omelyan_integrator_2nd_order()
+        if measure is not None:
+            with phase('measure'):
+                measure(self)
     
-    return times, acceptances
\ No newline at end of file
+    memory.print_report()
+    if report_path:
+        memory.write_json(report_path)
+    return memory.report()
@@ -1,3 +1,6 @@
+from uidt_profiling import count, phase, profiled
+
+@profiled('trajectory')
 def omelyan_integrator_2nd_order(self, n_steps=10, step_size=0.02, lambda_omelyan=0.193):
     """
     Omelyan-Integrator 2. Ordnung für optimale Energieerhaltung.
@@ -8,65 +11,62 @@ def omelyan_integrator_2nd_order(self, n_steps=10, step_size=0.02, lambda_omelya
     gamma = 0.5 - xi
     
     # Initiale Momenta
-    self.Pu = self.random_momenta()
-    self.Ps = xp.array(np.random.randn(self.Nx, self.Ny, self.Nz, self.Nt), dtype=float)
+    with phase('momenta'):
+        self.Pu = self.random_momenta()
+        self.Ps = self.scalar_momenta()
     
     # Store initial configuration for Metropolis
-    U_old = self.U.copy()
-    S_old = self.S.copy()
-    Pu_old = self.Pu.copy()
-    Ps_old = self.Ps.copy()
+    with phase('copies'):
+        U_old = self.U.copy()
+        S_old = self.S.copy()
     
     # Initial Hamiltonian
-    H_initial = self._compute_hamiltonian()
+    H_initial = self._compute_hamiltonian() + self.scalar_kinetic_shift()
     
     # --- OMELYAN INTEGRATOR ---
     
     # 1. Initial half step for momenta
-    gauge_F = self.gauge_force_vectorized()
-    scalar_F = self.scalar_force_field_vectorized()
+    gauge_F, scalar_F = self._profiled_forces()
     
     self.Pu = self.Pu - xi * step_size * gauge_F
     self.Ps = self.Ps - xi * step_size * scalar_F
     
     # 2. Multiple steps
     for step in range(n_steps):
-        # Update coordinates (first half)
-        self.update_U_vectorized(self.Pu, gamma * step_size)
-        self.update_S_vectorized(self.Ps, 0.5 * step_size)
-        
-        # Force computation at new position
-        gauge_F = self.gauge_force_vectorized()
-        scalar_F = self.scalar_force_field_vectorized()
-        
-        # Update momenta (full step)
-        self.Pu = self.Pu - (1 - 2*xi) * step_size * gauge_F
-        self.Ps = self.Ps - (1 - 2*xi) * step_size * scalar_F
-        
-        # Update coordinates (second half)
-        self.update_U_vectorized(self.Pu, gamma * step_size)
-        self.update_S_vectorized(self.Ps, 0.5 * step_size)
-        
-        # Final force update (except last step)
-        if step < n_steps - 1:
-            gauge_F = self.gauge_force_vectorized()
-            scalar_F = self.scalar_force_field_vectorized()
-            self.Pu = self.Pu - 2*xi * step_size * gauge_F
-            self.Ps = self.Ps - 2*xi * step_size * scalar_F
+        with phase('md_step'):
+            # Update coordinates (first half)
+            self.update_U_vectorized(self.Pu, gamma * step_size)
+            self.update_S_vectorized(self.Ps, 0.5 * step_size)
+            
+            # Force computation at new position
+            gauge_F, scalar_F = self._profiled_forces()
+            
+            # Update momenta (full step)
+            self.Pu = self.Pu - (1 - 2*xi) * step_size * gauge_F
+            self.Ps = self.Ps - (1 - 2*xi) * step_size * scalar_F
+            
+            # Update coordinates (second half)
+            self.update_U_vectorized(self.Pu, gamma * step_size)
+            self.update_S_vectorized(self.Ps, 0.5 * step_size)
+            
+            # Final force update (except last step)
+            if step < n_steps - 1:
+                gauge_F, scalar_F = self._profiled_forces()
+                self.Pu = self.Pu - 2*xi * step_size * gauge_F
+                self.Ps = self.Ps - 2*xi * step_size * scalar_F
     
     # 3. Final half step for momenta
-    gauge_F = self.gauge_force_vectorized()
-    scalar_F = self.scalar_force_field_vectorized()
+    gauge_F, scalar_F = self._profiled_forces()
     self.Pu = self.Pu - (1 - xi) * step_size * gauge_F
     self.Ps = self.Ps - (1 - xi) * step_size * scalar_F
     
     # --- METROPOLIS TEST ---
-    H_final = self._compute_hamiltonian()
+    H_final = self._compute_hamiltonian() + self.scalar_kinetic_shift()
     delta_H = float(H_final - H_initial)
     
     # Acceptance decision
     accepted = False
-    if xp.random.rand() < xp.exp(-delta_H):
+    if self.rng.uniform('metropolis') < xp.exp(-delta_H):
         accepted = True
         self.acceptance_rate = 0.9 * self.acceptance_rate + 0.1
     else:
@@ -76,9 +76,21 @@ def omelyan_integrator_2nd_order(self, n_steps=10, step_size=0.02, lambda_omelya
         self.acceptance_rate = 0.9 * self.acceptance_rate
     
     self.avg_delta_H = 0.9 * self.avg_delta_H + 0.1 * abs(delta_H)
+    count('trajectories')
+    count('accepted', int(accepted))
+    count('md_steps', n_steps)
     
     return accepted, delta_H
 
+def _profiled_forces(self):
+    """Gauge- und Skalarkraft als getrennte Profiling-Phasen."""
+    count('force_evaluations')
+    gauge_F = self.gauge_force_vectorized()
+    with phase('scalar_force'):
+        scalar_F = self.scalar_force_field_vectorized()
+    return gauge_F, scalar_F
+
+@profiled('hamiltonian')
 def _compute_hamiltonian(self):
     """Berechnet Gesamt-Hamiltonian für Metropolis-Test"""
     # Kinetische Energie
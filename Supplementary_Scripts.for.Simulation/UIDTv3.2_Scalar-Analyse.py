@@ -1,141 +1,159 @@
+from functools import partial
+
 import numpy as np
-from scipy.optimize import curve_fit
 import matplotlib.pyplot as plt
 
+from uidt_scalar_correlators import (
+    dispersion_check, full_correlator_fft, momentum_projected_correlators,
+    timeslice_correlator_fft
+)
+from uidt_fit_windows import scan_windows_from_bins
+from uidt_fourier_acceleration import fourier_acceleration_benchmark
+from uidt_fitting import (
+    CoshModel, correlated_fit, fit_batch, ledoit_wolf_shrinkage, shrink_covariance
+)
+from uidt_online_stats import ObservableRecorder
+from uidt_profiling import profiled
+from uidt_resampling import jackknife
+from uidt_scalar_cluster import cluster_benchmark
+from uidt_update_scheduler import UpdateScheduler
+
 class UIDTScalarAnalysis(UIDTLatticeWithSmearing):
     def __init__(self, cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
-                 m_S=1.705, lambda_S=0.417, v_vev=0.0477):
-        super().__init__(cfg, kappa, Lambda, m_S, lambda_S, v_vev)
+                 m_S=1.705, lambda_S=0.417, v_vev=0.0477,
+                 fourier_acceleration=False, fa_mass_scale=1.0):
+        super().__init__(cfg, kappa, Lambda, m_S, lambda_S, v_vev,
+                         fourier_acceleration, fa_mass_scale)
         
+    @profiled('measure_scalar_correlator')
     def scalar_field_correlator(self, dist_max=None):
         """
         Berechnet den zeitlichen Zwei-Punkt-Korrelator des Skalarfeldes C_S(t).
         C_S(t) = ⟨S(x,t) S(x,0)⟩ - ⟨S⟩²  (verbundener Korrelator)
+        Alle Zeitabstände gleichzeitig via FFT.
         """
-        xp_local = xp
-        S = self.S
-        Nt = self.Nt
-        dist_max = dist_max if dist_max else Nt // 2
-        
-        # Räumliche Mittelung für jedes t
-        S_t = xp_local.mean(S, axis=(0, 1, 2))  # Shape: (Nt,)
-        
-        # Verbundener Korrelator: subtrahiere VEV
-        S_vev = xp_local.mean(S_t)
-        S_t_connected = S_t - S_vev
-        
-        # Korrelator berechnen
-        C_S = xp_local.zeros(dist_max, dtype=float)
-        
-        for t in range(dist_max):
-            # C_S(t) = ⟨S(t0) S(t0+t)⟩ - ⟨S⟩²
-            S_shifted = xp_local.roll(S_t_connected, -t)
-            C_S[t] = xp_local.mean(S_t_connected * S_shifted)
-            
+        dist_max = dist_max if dist_max else self.Nt // 2
+        C_S = timeslice_correlator_fft(self.S)[:dist_max]
         return to_cpu(C_S) if USE_CUPY else C_S
     
+    @profiled('measure_scalar_correlator_spatial')
     def scalar_correlator_spatial(self, dist_max=None):
         """
         Räumlicher Korrelator für zusätzliche Massenbestimmung.
         C_S(r) = ⟨S(x) S(x+r)⟩ - ⟨S⟩²
+        Gemittelt über die drei Raumrichtungen (kubische Symmetrie).
         """
-        xp_local = xp
-        S = self.S
-        Nx = self.Nx
-        dist_max = dist_max if dist_max else Nx // 2
-        
-        # Räumlicher Korrelator in x-Richtung
-        C_S_r = xp_local.zeros(dist_max, dtype=float)
-        S_vev = xp_local.mean(S)
-        S_connected = S - S_vev
-        
-        for r in range(dist_max):
-            # Verschiebe in x-Richtung
-            S_shifted = xp_local.roll(S_connected, -r, axis=0)
-            # Räumliche und zeitliche Mittelung
-            C_S_r[r] = xp_local.mean(S_connected * S_shifted)
-            
+        dist_max = dist_max if dist_max else self.Nx // 2
+        C_full = full_correlator_fft(self.S)
+        C_S_r = (C_full[:dist_max, 0, 0, 0] + C_full[0, :dist_max, 0, 0]
+                 + C_full[0, 0, :dist_max, 0]) / 3.0
         return to_cpu(C_S_r) if USE_CUPY else C_S_r
+    
+    @profiled('measure_scalar_correlator_full')
+    def scalar_correlator_full(self):
+        """Verbundener Korrelator für alle 4D-Verschiebungen, Form (Nx, Ny, Nz, Nt)."""
+        C_full = full_correlator_fft(self.S)
+        return to_cpu(C_full) if USE_CUPY else C_full
+    
+    @profiled('measure_scalar_correlator_momentum')
+    def scalar_correlator_momentum(self, n_max_sq=3, dist_max=None):
+        """
+        Zeitkorrelatoren projiziert auf die niedrigsten Gitterimpulse
+        p = 2π n / L mit |n|² ≤ n_max_sq, gemittelt über äquivalente Impulse.
+        Rückgabe: (C[n_shell, t], n², p̂²)
+        """
+        dist_max = dist_max if dist_max else self.Nt // 2 + 1
+        C_p, n_sq, p_hat_sq = momentum_projected_correlators(self.S, n_max_sq)
+        C_p = to_cpu(C_p) if USE_CUPY else C_p
+        return C_p[:, :dist_max], n_sq, p_hat_sq
 
-def scalar_mass_fit_model(t, A, m, B):
-    """
-    Fit-Modell für Skalarkorrelator: C(t) = A * exp(-m*t) + B * exp(-m*(Nt-t))
-    Berücksichtigt periodische Randbedingungen.
-    """
-    return A * np.exp(-m * t) + B * np.exp(-m * (Nt_fit - t))
-
-def extract_scalar_mass(C_S, a, Nt, t_min=1, t_max=None):
+def extract_scalar_mass(C_S, a, Nt, t_min=1, t_max=None, cov=None, shrinkage=None,
+                        samples=None):
     """
     Extrahiert Skalarmasse aus Korrelator C_S(t) unter Berücksichtigung
-    periodischer Randbedingungen.
+    periodischer Randbedingungen: C(t) = A e^{-m t} + B e^{-m (Nt - t)}.
+    Mit cov (Kovarianz des Mittelwerts) wird korreliert gefittet, optional mit
+    Shrinkage (Wert oder 'auto' mit den Stichproben `samples`).
     """
     if t_max is None:
         t_max = len(C_S) - 1
     
-    t_values = np.arange(len(C_S))
-    
     # Wähle Fit-Bereich
-    mask = (t_values >= t_min) & (t_values <= t_max)
-    t_fit = t_values[mask]
-    C_fit = C_S[mask]
-    
-    # Startparameter schätzen
-    A0 = C_S[t_min]
-    m0 = -np.log(C_S[t_min+1] / C_S[t_min]) if C_S[t_min+1] > 0 else 0.5
-    B0 = C_S[-1] if len(C_S) > 1 else A0 * 0.1
-    
-    global Nt_fit
-    Nt_fit = Nt
-    
-    try:
-        # Fit mit periodischen Randbedingungen
-        popt, pcov = curve_fit(scalar_mass_fit_model, t_fit, C_fit, 
-                              p0=[A0, m0, B0], maxfev=5000)
-        
-        m_latt = popt[1]
-        m_err = np.sqrt(pcov[1,1]) if pcov is not None else 0.0
-        
-        # Konvertiere zu physikalischen Einheiten (GeV)
-        m_phys = m_latt / a * 0.197  # a in fm, 0.197 GeV·fm
-        m_err_phys = m_err / a * 0.197
-        
-        return m_phys, m_err_phys, popt
-        
-    except Exception as e:
-        print(f"⚠️ Skalarmassen-Fit fehlgeschlagen: {e}")
-        # Fallback: einfache exponentielle Anpassung
-        try:
-            def simple_exp(t, A, m):
-                return A * np.exp(-m * t)
-            
-            popt, pcov = curve_fit(simple_exp, t_fit, C_fit, p0=[A0, m0])
-            m_latt = popt[1]
-            m_phys = m_latt / a * 0.197
-            m_err_phys = np.sqrt(pcov[1,1]) / a * 0.197 if pcov is not None else 0.0
-            
-            return m_phys, m_err_phys, popt
-            
-        except Exception:
-            return np.nan, np.nan, None
+    t_fit = np.arange(t_min, min(t_max, len(C_S) - 1) + 1)
+    C_fit = np.asarray(C_S)[t_fit]
+    cov_fit = None if cov is None else np.asarray(cov)[np.ix_(t_fit, t_fit)]
+    samples_fit = None if samples is None else np.asarray(samples)[:, t_fit]
+    
+    fit = correlated_fit(CoshModel(Nt), t_fit, C_fit, cov=cov_fit,
+                         shrinkage=shrinkage, samples=samples_fit)
+    popt = fit['params']
+    if not np.all(np.isfinite(popt)):
+        print("⚠️ Skalarmassen-Fit fehlgeschlagen")
+        return np.nan, np.nan, None
+    
+    m_latt = popt[1]
+    m_err = fit['errors'][1]
+    if cov is None and fit['dof'] > 0:
+        # Ohne Kovarianz: Fehler mit der Streuung der Residuen skalieren
+        m_err *= np.sqrt(fit['chi2'] / fit['dof'])
+    
+    # Konvertiere zu physikalischen Einheiten (GeV)
+    m_phys = m_latt / a * 0.197  # a in fm, 0.197 GeV·fm
+    m_err_phys = m_err / a * 0.197
+    
+    return m_phys, m_err_phys, popt
+
+def scalar_mass_batch(C_batch, a, Nt, p0, t_min=1, t_max=6, cov=None):
+    """
+    Skalarmassen (GeV) für viele Korrelatoren C_batch[B, t] in einem
+    LM-Lauf, warm gestartet bei den Parametern p0 des zentralen Fits.
+    """
+    C_batch = np.atleast_2d(C_batch)
+    t_fit = np.arange(t_min, min(t_max, C_batch.shape[-1] - 1) + 1)
+    cov_fit = None if cov is None else np.asarray(cov)[np.ix_(t_fit, t_fit)]
+    fit = fit_batch(CoshModel(Nt), t_fit, C_batch[:, t_fit], p0, cov=cov_fit)
+    m_latt = np.where(np.isfinite(fit['chi2']), fit['params'][:, 1], np.nan)
+    return m_latt / a * 0.197
 
 def run_scalar_mass_measurement(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
-                               hmc_steps=10, step_size=0.02):
+                               hmc_steps=10, step_size=0.02, n_max_sq=3,
+                               fourier_acceleration=False, fa_mass_scale=1.0,
+                               cluster_updates=0, scalar_sweeps=0, sweep_delta=0.5):
     """
     Spezialisierte Messung der Skalarmasse mit statistischer Analyse.
+    Korrelierter Fit mit Shrinkage; alle Jackknife-Stichproben werden in
+    einem Batch-Fit ausgewertet. fourier_acceleration=True verwendet die
+    Fourier-Massenmatrix für die Skalarimpulse (Masse fa_mass_scale · a·m_S).
+    cluster_updates > 0 hängt an jede Trajektorie so viele eingebettete
+    Ising-Cluster-Updates des Skalarfeldes an, scalar_sweeps > 0 so viele
+    Schachbrett-Sweeps (Metropolis + Überrelaxation, Schrittweite sweep_delta)
+    auf dem festen Eichfeld.
     """
     print("🔬 Starte Skalarmassen-Messung")
     
-    lat = UIDTScalarAnalysis(cfg, kappa=kappa, Lambda=Lambda)
-    
-    # Datenspeicher
-    scalar_correlators = []
-    scalar_vevs = []
-    acceptance_rates = []
+    lat = UIDTScalarAnalysis(cfg, kappa=kappa, Lambda=Lambda,
+                             fourier_acceleration=fourier_acceleration,
+                             fa_mass_scale=fa_mass_scale)
+    
+    # Streaming-Statistik statt Listen (Speicher unabhängig von N_meas)
+    stats = ObservableRecorder()
+    stats.declare('C_S', covariance=True)
+    lat.measurement_stats = stats
+    
+    # Update-Abfolge: HMC-Trajektorie, danach optional Cluster-Updates für S
+    schedule = UpdateScheduler()
+    schedule.add('hmc', lambda: lat.omelyan_integrator_2nd_order(n_steps=hmc_steps,
+                                                                 step_size=step_size))
+    if cluster_updates:
+        schedule.add('cluster', lat.cluster_update, repeat=cluster_updates)
+    if scalar_sweeps:
+        schedule.add('scalar_sweep', lambda: lat.scalar_sweep(delta=sweep_delta),
+                     repeat=scalar_sweeps)
     
     # Thermalisierung
     print("🔥 Thermalisierung...")
     for i in trange(cfg.N_therm):
-        lat.hmc_trajectory_omelyan(n_steps=hmc_steps, step_size=step_size)
+        schedule.sweep()
     
     # Messphase
     print("📊 Messphase - Skalarkorrelatoren sammeln...")
@@ -145,80 +163,106 @@ def run_scalar_mass_measurement(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
     for i in trange(cfg.N_meas):
         # HMC Updates
         for _ in range(cfg.N_skip):
-            accepted, _ = lat.hmc_trajectory_omelyan(n_steps=hmc_steps, step_size=step_size)
+            accepted, _ = schedule.sweep()['hmc']
             if accepted:
                 acceptance_count += 1
             total_trajectories += 1
         
         # Skalar-Messungen
         C_S = lat.scalar_field_correlator(dist_max=min(cfg.N_temporal//2, 12))
-        scalar_correlators.append(C_S)
+        C_p, n_sq, p_hat_sq = lat.scalar_correlator_momentum(n_max_sq=n_max_sq)
         S_vev = float(xp.mean(lat.S))
-        scalar_vevs.append(S_vev)
+        stats.record(C_S=C_S, C_p=C_p, S_vev=S_vev)
         
         if i % 100 == 0:
             print(f"   Trajektorie {i}: ⟨S⟩ = {S_vev:.4f}")
     
     acceptance_rate = acceptance_count / total_trajectories
+    if len(schedule.updates) > 1:
+        schedule.print_report()
     
     # Statistische Analyse
     print("📈 Statistische Analyse der Skalarmasse...")
     
-    # Jackknife-Analyse für Korrelator und Masse
-    def jackknife_scalar_mass(correlators, a, Nt):
-        """Jackknife für Skalarmassen-Extraktion"""
-        n_meas = len(correlators)
-        masses = np.zeros(n_meas)
-        
-        for i in range(n_meas):
-            # Jackknife-Stichprobe (lasse i-te Messung weg)
-            jack_sample = [correlators[j] for j in range(n_meas) if j != i]
-            C_avg = np.mean(jack_sample, axis=0)
-            
-            # Massen-Extraktion
-            m, m_err, _ = extract_scalar_mass(C_avg, a, Nt, t_min=1, t_max=6)
-            masses[i] = m
-        
-        m_mean = np.mean(masses)
-        m_err = np.sqrt((n_meas - 1) / n_meas * np.sum((masses - m_mean)**2))
-        
-        return m_mean, m_err, masses
-    
     # Hauptanalyse
-    C_S_avg = np.mean(scalar_correlators, axis=0)
-    C_S_err = np.std(scalar_correlators, axis=0) / np.sqrt(cfg.N_meas)
-    
-    # Autokorrelationszeit für Skalarkorrelator
-    tau_int_S = integrated_autocorrelation_time(np.array([c[1] for c in scalar_correlators]))
+    C_S_avg = stats['C_S'].mean
+    C_S_err = stats['C_S'].std_error
     
-    # Jackknife-Massenanalyse
-    m_S_jack, m_S_err_jack, jack_samples = jackknife_scalar_mass(
-        scalar_correlators, cfg.a, cfg.N_temporal
-    )
+    # Autokorrelationszeit für Skalarkorrelator (aus der Binning-Hierarchie)
+    tau_int_S = float(stats['C_S'].tau_int()[1])
     
-    # Direkte Massen-Extraktion aus gemitteltem Korrelator
+    # Direkte Massen-Extraktion: korrelierter Fit, Kovarianz des Mittelwerts
+    # Fit-Fenster t = 1..6, auf die Korrelatorlänge begrenzt (kleine Gitter)
+    t_fit = np.arange(1, min(6, len(C_S_avg) - 1) + 1)
+    C_S_bins = stats['C_S'].jackknife_bins()
+    C_S_cov = stats['C_S'].covariance() / stats['C_S'].n
     m_S_direct, m_S_err_direct, fit_params = extract_scalar_mass(
-        C_S_avg, cfg.a, cfg.N_temporal, t_min=1, t_max=6
+        C_S_avg, cfg.a, cfg.N_temporal, t_min=t_fit[0], t_max=t_fit[-1],
+        cov=C_S_cov, shrinkage='auto', samples=C_S_bins
     )
     
+    # Geblockter Jackknife über die Bins (Blockgröße aus τ_int), ein Batch-Fit
+    if fit_params is not None:
+        C_S_cov_fit = shrink_covariance(C_S_cov, ledoit_wolf_shrinkage(C_S_bins[:, t_fit]))
+        jack = jackknife(partial(scalar_mass_batch, a=cfg.a, Nt=cfg.N_temporal, p0=fit_params,
+                                 t_min=t_fit[0], t_max=t_fit[-1], cov=C_S_cov_fit),
+                         C_S_bins, block_size='auto', vectorized=True)
+        jack_samples = jack['samples']
+        m_S_jack = float(np.nanmean(jack_samples))
+        m_S_err_jack = float(jack['error'])
+    else:
+        jack_samples = np.array([])
+        m_S_jack, m_S_err_jack = np.nan, np.nan
+    
+    # Alle Fit-Fenster (t_min ≤ 4), AIC-gemittelt: Fensterwahl als systematischer Fehler
+    try:
+        window_scan = scan_windows_from_bins(CoshModel(cfg.N_temporal), np.arange(len(C_S_avg)),
+                                             C_S_bins, t_min_range=(1, 4))
+        m_S_avg = window_scan['value'] / cfg.a * 0.197
+        m_S_stat = window_scan['stat_error'] / cfg.a * 0.197
+        m_S_sys = window_scan['sys_error'] / cfg.a * 0.197
+    except (np.linalg.LinAlgError, ValueError) as e:
+        print(f"⚠️ Fenster-Scan fehlgeschlagen ({e}), verwende festes Fenster "
+              f"t = {t_fit[0]}..{t_fit[-1]}")
+        window_scan = None
+        m_S_avg, m_S_stat, m_S_sys = m_S_jack, m_S_err_jack, 0.0
+    print(f"   m_S = {m_S_avg:.3f} ± {m_S_stat:.3f} (stat) ± {m_S_sys:.3f} (sys) GeV")
+    
+    # Impulsprojizierte Korrelatoren: Dispersionsrelation E(p) vs. Gitter-Vorhersage
+    C_p_avg = stats['C_p'].mean
+    dispersion = dispersion_check(C_p_avg, p_hat_sq, t_min=t_fit[0], t_max=t_fit[-1])
+    for k in range(len(n_sq)):
+        print(f"   n² = {n_sq[k]}: aE = {dispersion['E_measured'][k]:.4f} "
+              f"(Dispersion: {dispersion['E_predicted'][k]:.4f})")
+    
     # VEV-Statistik
-    S_vev_mean = np.mean(scalar_vevs)
-    S_vev_err = np.std(scalar_vevs) / np.sqrt(cfg.N_meas / (2 * tau_int_S))
+    S_vev_mean = float(stats['S_vev'].mean)
+    S_vev_err = float(np.sqrt(stats['S_vev'].variance / (stats['S_vev'].n / (2 * tau_int_S))))
     
     # Ergebnisse
     results = {
-        'm_S': m_S_jack,  # Jackknife als primäres Ergebnis
-        'm_S_err': m_S_err_jack,
+        'm_S': m_S_avg,  # AIC-Mittel über Fit-Fenster als primäres Ergebnis
+        'm_S_err': float(np.hypot(m_S_stat, m_S_sys)),
+        'm_S_stat_err': m_S_stat,
+        'm_S_sys_err': m_S_sys,
+        'm_S_fixed_window': m_S_jack,
+        'm_S_fixed_window_err': m_S_err_jack,
+        'window_scan': window_scan,
         'm_S_direct': m_S_direct,
         'm_S_direct_err': m_S_err_direct,
         'S_vev': S_vev_mean,
         'S_vev_err': S_vev_err,
         'C_S_avg': C_S_avg,
         'C_S_err': C_S_err,
+        'C_S_cov': stats['C_S'].covariance(),
         'fit_params': fit_params,
+        'fit_window': (int(t_fit[0]), int(t_fit[-1])),
         'acceptance_rate': acceptance_rate,
         'tau_int_S': tau_int_S,
-        'jackknife_samples': jack_samples
+        'jackknife_samples': jack_samples,
+        'C_p_avg': C_p_avg,
+        'momentum_n_sq': n_sq,
+        'dispersion': dispersion
     }
     
     # Plot-Ergebnisse
@@ -241,14 +285,12 @@ def _plot_scalar_mass_results(results, cfg, kappa):
     # Fit-Kurve
     if results['fit_params'] is not None:
         t_fine = np.linspace(0, len(C_S)-1, 100)
-        global Nt_fit
-        Nt_fit = cfg.N_temporal
-        fit_curve = scalar_mass_fit_model(t_fine, *results['fit_params'])
+        fit_curve = CoshModel(cfg.N_temporal)(t_fine, np.asarray(results['fit_params']))
         plt.plot(t_fine, fit_curve, 'r-', label='Fit')
         
         # Fit-Bereich markieren
-        t_fit = t_values[1:7]  # Beispiel-Bereich
-        plt.axvspan(t_fit[0]-0.5, t_fit[-1]+0.5, alpha=0.2, color='gray', label='Fit-Bereich')
+        t_lo, t_hi = results['fit_window']
+        plt.axvspan(t_lo-0.5, t_hi+0.5, alpha=0.2, color='gray', label='Fit-Bereich')
     
     plt.yscale('log')
     plt.xlabel('Zeitabstand t')
@@ -262,8 +304,9 @@ def _plot_scalar_mass_results(results, cfg, kappa):
     if 'jackknife_samples' in results:
         jack_samples = results['jackknife_samples']
         plt.hist(jack_samples, bins=20, alpha=0.7, edgecolor='black')
-        plt.axvline(results['m_S'], color='red', linestyle='--', 
-                   label=f'm_S = {results["m_S"]:.3f} ± {results["m_S_err"]:.3f} GeV')
+        plt.axvline(results['m_S_fixed_window'], color='red', linestyle='--', 
+                   label=f'm_S = {results["m_S_fixed_window"]:.3f} ± '
+                         f'{results["m_S_fixed_window_err"]:.3f} GeV (t = 1..6)')
         plt.xlabel('Skalarmasse m_S (GeV)')
         plt.ylabel('Häufigkeit')
         plt.title('Jackknife-Verteilung der Skalarmasse')
@@ -328,6 +371,55 @@ def interpret_scalar_mass_results(scalar_results, glueball_mass=0.61, glueball_m
     
     return mass_ratio, mass_ratio_err
 
+# ⏱️ FOURIER-BESCHLEUNIGUNG: τ_int PRO CPU-ZEIT
+
+def benchmark_fourier_acceleration(cfg: LatticeConfig, kappa=0.5, Lambda=1.0,
+                                   hmc_steps=10, step_size=0.02, fa_mass_scale=1.0,
+                                   n_therm=50, n_traj=300):
+    """
+    Vergleicht Einheitsmasse und Fourier-Beschleunigung der Skalarimpulse:
+    τ_int von ⟨S⟩ und des Skalarkorrelators sowie CPU-Kosten pro
+    unabhängiger Messung (2 τ_int · CPU-Zeit pro Trajektorie).
+    """
+    print(f"⏱️  Fourier-Beschleunigung (M = {fa_mass_scale} · a·m_S), {n_traj} Trajektorien")
+    
+    def make_lattice(fourier_acceleration):
+        return UIDTScalarAnalysis(cfg, kappa=kappa, Lambda=Lambda,
+                                  fourier_acceleration=fourier_acceleration,
+                                  fa_mass_scale=fa_mass_scale)
+    
+    def trajectory(lat):
+        return lat.omelyan_integrator_2nd_order(n_steps=hmc_steps, step_size=step_size)
+    
+    return fourier_acceleration_benchmark(make_lattice, trajectory,
+                                          n_therm=n_therm, n_traj=n_traj)
+
+# 🧩 CLUSTER-UPDATE: τ_int(⟨S⟩) GEGEN GITTERGRÖSSE
+
+def benchmark_cluster_update(kappa=0.5, Lambda=1.0, sizes=(4, 6, 8), beta=6.0, a=0.1,
+                             hmc_steps=10, step_size=0.02, cluster_updates=1,
+                             n_therm=50, n_sweeps=300):
+    """
+    τ_int(⟨S⟩) gegen L für reine HMC und HMC + eingebettete Ising-Cluster.
+    Interessant nahe am Übergang (kleines ⟨S⟩, leichtes m_S), wo die HMC
+    kritisch verlangsamt; z_eff ist der Exponent aus τ_int ∝ L^z.
+    """
+    print(f"🧩 Cluster-Update: τ_int(⟨S⟩) für L = {sizes}")
+    
+    def make_lattice(L):
+        cfg = LatticeConfig(N_spatial=L, N_temporal=L, beta=beta, a=a, seed=1000 + L)
+        return UIDTScalarAnalysis(cfg, kappa=kappa, Lambda=Lambda)
+    
+    def hmc_only(lat):
+        return UpdateScheduler().add(
+            'hmc', lambda: lat.omelyan_integrator_2nd_order(n_steps=hmc_steps, step_size=step_size))
+    
+    def hmc_cluster(lat):
+        return hmc_only(lat).add('cluster', lat.cluster_update, repeat=cluster_updates)
+    
+    return cluster_benchmark(make_lattice, {'hmc': hmc_only, 'hmc+cluster': hmc_cluster},
+                             sizes=sizes, n_therm=n_therm, n_sweeps=n_sweeps)
+
 # 🎯 PRODUKTIONSLAUF FÜR SKALARMASSE
 
 def production_scalar_mass_run():
@@ -443,5 +535,8 @@ if __name__ == "__main__":
     test_results = run_scalar_mass_measurement(cfg_test, kappa=0.5)
     interpret_scalar_mass_results(test_results)
     
+    # Autokorrelation mit/ohne Fourier-Beschleunigung:
+    # benchmark_fourier_acceleration(cfg_test, kappa=0.5)
+    
     # Für finale Physik-Ergebnisse:
     # complete_results = complete_uidt_analysis()
\ No newline at end of file
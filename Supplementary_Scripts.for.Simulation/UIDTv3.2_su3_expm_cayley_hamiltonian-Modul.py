@@ -3,6 +3,8 @@ from scipy.linalg import expm
 import cupy as cp
 from cupyx.scipy.linalg import expm as cupy_expm
 
+from uidt_profiling import count, profiled
+
 # GPU/CPU Handling
 xp = cp if cp else np
 linalg_expm = cupy_expm if cp else expm
@@ -58,11 +60,13 @@ def su3_expm_cayley_hamiltonian(A, xp_local=xp):
     
     return u0 * xp_local.eye(3, dtype=complex) + u1 * A + u2 * A2
 
+@profiled('su3_expm')
 def su3_expm_hybrid(A, xp_local=xp):
     """
     Hybride Exponentialfunktion: Cayley-Hamilton für normale Matrizen,
     Fallback auf Standard expm für singuläre/schlecht-konditionierte Fälle.
     """
+    count('su3_expm_matrices', A.size // 9)
     try:
         return su3_expm_cayley_hamiltonian(A, xp_local)
     except (xp.linalg.LinAlgError, ValueError):
@@ -0,0 +1,89 @@
+"""
+UIDT v3.2 Autokorrelationsanalyse
+---------------------------------
+Autokorrelationsfunktion via FFT in O(N log N) und Wolffs Γ-Methode mit
+automatischer Fensterwahl (U. Wolff, Comput. Phys. Commun. 156 (2004) 143).
+
+Alle Funktionen arbeiten auf der letzten Achse und sind über beliebige
+führende Achsen vektorisiert, z.B. W_loops[R, T, N_meas] in einem Aufruf.
+"""
+
+import numpy as np
+from scipy.fft import next_fast_len
+
+
+def autocovariance_fft(data, max_lag=None):
+    """
+    Γ(t) = 1/N Σ_i (x_i - x̄)(x_{i+t} - x̄) für alle Verzögerungen t.
+    Null-Padding auf ≥ 2N vermeidet periodische Überlappung.
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.shape[-1]
+    max_lag = n if max_lag is None else min(max_lag, n)
+    x = data - data.mean(axis=-1, keepdims=True)
+    n_fft = next_fast_len(2 * n)
+    x_hat = np.fft.rfft(x, n=n_fft, axis=-1)
+    gamma = np.fft.irfft(x_hat * np.conj(x_hat), n=n_fft, axis=-1)[..., :max_lag]
+    return gamma / n
+
+
+def autocorrelation_fft(data, max_lag=None):
+    """Normierte Autokorrelation ρ(t) = Γ(t)/Γ(0); konstante Reihen ergeben ρ = δ_t0."""
+    gamma = autocovariance_fft(data, max_lag)
+    gamma0 = gamma[..., :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = np.where(gamma0 > 0, gamma / gamma0, 0.0)
+    rho[..., 0] = 1.0
+    return rho
+
+
+def gamma_method(data, S=1.5, max_lag=None):
+    """
+    Γ-Methode mit automatischem Fenster W pro Observable.
+
+    Für jedes W: τ_int(W) = ½ + Σ_{t=1}^{W} ρ(t),
+    τ(W) = S / ln[(2τ_int + 1)/(2τ_int - 1)],
+    g(W) = exp(-W/τ) - τ/√(W N); W ist das erste W mit g(W) < 0.
+    τ_int wird um den Bias (2W+1)/N korrigiert, der Fehler ist
+    δτ_int ≈ τ_int √((4W + 2)/N).
+
+    Rückgabe: dict mit tau_int, tau_int_err, window, rho, mean, error
+    (Fehler des Mittelwerts inkl. Autokorrelation).
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.shape[-1]
+    max_lag = n // 2 if max_lag is None else min(max_lag, n // 2)
+    max_lag = max(max_lag, 2)
+    gamma = autocovariance_fft(data, max_lag + 1)
+    rho = autocorrelation_fft(data, max_lag + 1)
+
+    W = np.arange(1, max_lag + 1)
+    tau_w = 0.5 + np.cumsum(rho[..., 1:], axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        tau_exp = np.where(tau_w > 0.5,
+                           S / np.log((2.0 * tau_w + 1.0) / (2.0 * tau_w - 1.0)),
+                           1e-300)
+        g = np.exp(-W / tau_exp) - tau_exp / np.sqrt(W * n)
+    below = g < 0
+    window_idx = np.where(below.any(axis=-1), below.argmax(axis=-1), max_lag - 1)
+    window = W[window_idx]
+
+    tau_int = np.take_along_axis(tau_w, window_idx[..., None], axis=-1)[..., 0]
+    tau_int = tau_int * (1.0 + (2.0 * window + 1.0) / n)
+    tau_int = np.where(gamma[..., 0] > 0, np.maximum(tau_int, 0.5), 0.5)
+    tau_err = tau_int * np.sqrt((4.0 * window + 2.0) / n)
+    error = np.sqrt(np.maximum(2.0 * tau_int * gamma[..., 0] / n, 0.0))
+
+    return {
+        'tau_int': tau_int,
+        'tau_int_err': tau_err,
+        'window': window,
+        'rho': rho,
+        'mean': data.mean(axis=-1),
+        'error': error,
+    }
+
+
+def integrated_autocorrelation_time(data, S=1.5, max_lag=None):
+    """τ_int über die Γ-Methode (nur der Wert, Form = führende Achsen von data)."""
+    return gamma_method(data, S=S, max_lag=max_lag)['tau_int']
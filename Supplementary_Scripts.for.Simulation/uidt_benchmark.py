@@ -0,0 +1,410 @@
+"""
+UIDT v3.2 Skalierungs-Benchmarks für die Gitter-Engine
+------------------------------------------------------
+Misst die zentralen Kernels über Gittergrößen L⁴ und Präzisionen:
+
+- SU(3)-Exponential (Durchsatz in Matrizen/s), SU(3)-Projektion
+- räumliches APE-Smearing, Wilson-Schleifen (Plaquette, Rechteck)
+- Skalarkorrelatoren (Zeitscheibe und Impulsprojektion via FFT)
+- optional mit einer Gitterfabrik: HMC-Trajektorie und Kraftauswertung
+
+Jede Messung wird `repeats`-mal nach `warmup` Aufwärmläufen mit
+time.perf_counter wiederholt (CuPy wird vor dem Stoppen synchronisiert);
+berichtet werden Median, Interquartilsabstand, Minimum und Maximum.
+
+Berichte enthalten Maschinen- und Commit-Metadaten und werden als JSON
+(vollständig) und CSV (eine Zeile pro Kernel/L/Präzision, Commit, Host und
+Zeitstempel als eigene Spalten) geschrieben. compare_with_baseline markiert
+Regressionen gegenüber einem gespeicherten Bericht.
+
+Gemessen wird das SU(3)-Exponential der Engine (su3_expm_hybrid, EXPM_ENGINE);
+ist es nicht importierbar (das Modul braucht CuPy), fällt der Lauf mit
+Warnung auf die Eigenzerlegungs-Referenz zurück, der Name steht in den
+Metadaten. Trajektorie und Kraft brauchen eine Gitterfabrik
+'modul:funktion' bzw. 'datei.py:funktion' mit Signatur (L, dtype) -> Gitter.
+Kommandozeile:
+
+    python uidt_benchmark.py --sizes 4 8 12 --output bench
+    python uidt_benchmark.py --sizes 4 8 12 16 24 --lattice meine_gitter.py:make_lattice
+    python uidt_benchmark.py --sizes 4 8 12 --baseline bench.json
+"""
+
+import argparse
+import csv
+import datetime
+import functools
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from uidt_lattice_utils import (ape_smear_spatial, cp, dagger, get_array_module,
+                                loop_trace_timeslices, project_su3)
+from uidt_scalar_correlators import momentum_projected_correlators, timeslice_correlator_fft
+
+DEFAULT_SIZES = (4, 6, 8, 12, 16, 24)
+DEFAULT_DTYPES = ('complex64', 'complex128')
+CSV_COLUMNS = ('kernel', 'L', 'dtype', 'median_s', 'iqr_s', 'min_s', 'max_s',
+               'repeats', 'items', 'throughput', 'commit', 'dirty', 'hostname', 'timestamp')
+EXPM_ENGINE = 'UIDTv3.2_su3_expm_cayley_hamiltonian-Modul.py:su3_expm_hybrid'
+EXPM_REFERENCE = 'reference'
+
+# Plaquette und 1x2-Rechteck in der xy- und xt-Ebene
+BENCHMARK_LOOPS = ((1, 2, -1, -2), (1, 1, 2, -1, -1, -2), (1, 4, -1, -4), (1, 1, 4, -1, -1, -4))
+
+
+def _synchronize(xp):
+    if cp is not None and xp is cp:
+        cp.cuda.Stream.null.synchronize()
+
+
+def time_kernel(func, repeats=7, warmup=1, xp=np):
+    """
+    Laufzeiten von func() in Sekunden. Rückgabe: dict mit median, iqr,
+    min, max und den Einzelzeiten `times`.
+    """
+    for _ in range(warmup):
+        func()
+    _synchronize(xp)
+    times = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        func()
+        _synchronize(xp)
+        times[i] = time.perf_counter() - start
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    return {
+        'median': float(median),
+        'iqr': float(q3 - q1),
+        'min': float(times.min()),
+        'max': float(times.max()),
+        'times': times.tolist(),
+    }
+
+
+def random_algebra(shape, dtype, rng, xp=np, scale=0.3):
+    """Zufällige spurfreie anti-hermitesche 3x3-Matrizen A = iH."""
+    M = rng.normal(size=shape + (3, 3)) + 1j * rng.normal(size=shape + (3, 3))
+    H = 0.5 * (M + np.conj(np.swapaxes(M, -1, -2)))
+    H -= np.trace(H, axis1=-2, axis2=-1)[..., None, None] * np.eye(3) / 3.0
+    return xp.asarray((1j * scale * H).astype(dtype))
+
+
+def random_su3_field(L, dtype, rng, xp=np):
+    """Ungeordnetes SU(3)-Feld U[x, y, z, t, μ, 3, 3] der Größe L⁴."""
+    shape = (L, L, L, L, 4)
+    M = rng.normal(size=shape + (3, 3)) + 1j * rng.normal(size=shape + (3, 3))
+    return project_su3(xp.asarray(M.astype(dtype)))
+
+
+def expm_antihermitian(A):
+    """
+    Referenz-Exponential über die Eigenzerlegung von H = -iA:
+    exp(A) = V diag(e^{iw}) V†. Ersetzbar durch su3_expm_hybrid.
+    """
+    xp = get_array_module(A)
+    w, V = xp.linalg.eigh(-1j * A)
+    return (V * xp.exp(1j * w)[..., None, :]) @ dagger(V)
+
+
+def load_callable(spec):
+    """
+    Funktion aus 'modul:funktion' oder 'pfad/datei.py:funktion' (für Skripte
+    mit Bindestrich im Namen; relative Pfade auch neben diesem Modul).
+    """
+    target, _, name = spec.rpartition(':')
+    if not target or not name:
+        raise ValueError(f"Erwartet 'modul:funktion' oder 'datei.py:funktion', nicht {spec!r}")
+    if target.endswith('.py'):
+        path = target
+        if not os.path.exists(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), target)
+        module_name = os.path.splitext(os.path.basename(path))[0].replace('-', '_').replace('.', '_')
+        module_spec = importlib.util.spec_from_file_location(module_name, path)
+        if module_spec is None:
+            raise ImportError(f"{path} ist kein Python-Modul")
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+    return getattr(module, name)
+
+
+def resolve_expm(spec=EXPM_ENGINE):
+    """
+    (Funktion, Name) des zu messenden SU(3)-Exponentials. Ist `spec` nicht
+    importierbar, Warnung und Rückfall auf expm_antihermitian.
+    """
+    if spec == EXPM_REFERENCE:
+        return expm_antihermitian, EXPM_REFERENCE
+    try:
+        return load_callable(spec), spec
+    except ImportError as e:
+        print(f"⚠️ {spec} nicht importierbar ({e}), messe die Referenz expm_antihermitian")
+        return expm_antihermitian, EXPM_REFERENCE
+
+
+def field_kernels(L, dtype, rng, xp=np, expm=None, smearing_levels=4):
+    """
+    Kernels, die nur Felder benötigen: dict name -> (func, items), wobei
+    `items` die verarbeiteten Einheiten pro Aufruf zählt (für den Durchsatz).
+    """
+    expm = expm or expm_antihermitian
+    if 'xp_local' in inspect.signature(expm).parameters:
+        # su3_expm_hybrid nimmt sonst das globale xp des Moduls (CuPy, falls vorhanden)
+        expm = functools.partial(expm, xp_local=xp)
+    real = np.finfo(np.dtype(dtype)).dtype
+    U = random_su3_field(L, dtype, rng, xp)
+    A = random_algebra((L, L, L, L, 4), dtype, rng, xp)
+    Q = U + 0.1 * A
+    S = xp.asarray(rng.normal(size=(L, L, L, L)).astype(real))
+    n_links = L**4 * 4
+
+    def wilson_loops():
+        cache = {}
+        return [loop_trace_timeslices(U, path, cache=cache) for path in BENCHMARK_LOOPS]
+
+    def correlators():
+        timeslice_correlator_fft(S)
+        return momentum_projected_correlators(S)
+
+    return {
+        'su3_expm': (lambda: expm(A), n_links),
+        'su3_projection': (lambda: project_su3(Q), n_links),
+        'ape_smearing': (lambda: ape_smear_spatial(U, levels=(smearing_levels,)),
+                         L**4 * 3 * smearing_levels),
+        'wilson_loops': (wilson_loops, L**4 * len(BENCHMARK_LOOPS)),
+        'correlators': (correlators, L**4),
+    }
+
+
+def lattice_kernels(lattice):
+    """
+    Kernels einer Gitterinstanz: 'trajectory' (Omelyan, sonst Leapfrog) und
+    'force' (Gauge- plus Skalarkraft), soweit die Methoden vorhanden sind.
+    """
+    volume = lattice.Nx * lattice.Ny * lattice.Nz * lattice.Nt
+    kernels = {}
+    if hasattr(lattice, 'omelyan_integrator_2nd_order'):
+        kernels['trajectory'] = (lattice.omelyan_integrator_2nd_order, volume)
+    elif hasattr(lattice, 'hmc_trajectory'):
+        kernels['trajectory'] = (lattice.hmc_trajectory, volume)
+    if hasattr(lattice, 'gauge_force_vectorized'):
+        def force():
+            F = lattice.gauge_force_vectorized()
+            if hasattr(lattice, 'scalar_force_field_vectorized'):
+                return F, lattice.scalar_force_field_vectorized()
+            return F
+        kernels['force'] = (force, volume)
+    return kernels
+
+
+def machine_metadata():
+    """Plattform, CPU, Bibliotheksversionen und (falls vorhanden) GPU."""
+    meta = {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    if cp is not None:
+        try:
+            meta['cupy'] = cp.__version__
+            meta['gpu'] = cp.cuda.runtime.getDeviceProperties(0)['name'].decode()
+        except Exception:  # keine GPU sichtbar
+            meta['gpu'] = None
+    return meta
+
+
+def git_metadata(path=None):
+    """Commit-Hash und ob der Arbeitsbaum Änderungen enthält (None außerhalb von git)."""
+    path = path or os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=path, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                cwd=path, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': bool(status.strip())}
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, dtypes=DEFAULT_DTYPES, kernels=None,
+                   make_lattice=None, expm=None, repeats=7, warmup=1, xp=np, seed=0,
+                   verbose=True):
+    """
+    Vollständiger Benchmark-Lauf.
+
+    sizes:        Kantenlängen L der L⁴-Gitter
+    dtypes:       komplexe Präzisionen der Linkvariablen
+    kernels:      Auswahl von Kernel-Namen (None = alle)
+    make_lattice: optional (L, dtype) -> Gitter, für 'trajectory' und 'force'
+    expm:         SU(3)-Exponential als Funktion oder Spezifikation für
+                  load_callable (Standard: EXPM_ENGINE, sonst Referenz)
+
+    Rückgabe: Bericht {'metadata': {...}, 'results': [Zeilen]}.
+    """
+    if callable(expm):
+        expm_name = getattr(expm, '__qualname__', repr(expm))
+    else:
+        expm, expm_name = resolve_expm(expm or EXPM_ENGINE)
+    rng = np.random.default_rng(seed)
+    results = []
+    for L in sizes:
+        for dtype in dtypes:
+            candidates = field_kernels(L, dtype, rng, xp, expm=expm)
+            if make_lattice is not None:
+                candidates.update(lattice_kernels(make_lattice(L, dtype)))
+            for name, (func, items) in candidates.items():
+                if kernels is not None and name not in kernels:
+                    continue
+                t = time_kernel(func, repeats=repeats, warmup=warmup, xp=xp)
+                row = {
+                    'kernel': name, 'L': L, 'dtype': str(dtype),
+                    'median_s': t['median'], 'iqr_s': t['iqr'],
+                    'min_s': t['min'], 'max_s': t['max'],
+                    'repeats': repeats, 'items': items,
+                    'throughput': items / t['median'] if t['median'] > 0 else np.inf,
+                    'times': t['times'],
+                }
+                results.append(row)
+                if verbose:
+                    print(f"   {name:15s} L={L:2d} {dtype:10s}: {t['median'] * 1e3:9.2f} ms "
+                          f"(IQR {t['iqr'] * 1e3:.2f} ms, {row['throughput']:.3g}/s)")
+    metadata = machine_metadata()
+    metadata.update(git_metadata())
+    metadata.update({'repeats': repeats, 'warmup': warmup, 'seed': seed,
+                     'backend': 'cupy' if xp is not np else 'numpy', 'expm': expm_name,
+                     'lattice_kernels': make_lattice is not None})
+    return {'metadata': metadata, 'results': results}
+
+
+def write_report(report, prefix):
+    """
+    Schreibt <prefix>.json (mit Einzelzeiten) und <prefix>.csv; die CSV trägt
+    commit, dirty, hostname und timestamp in jeder Zeile (csv.DictReader-lesbar).
+    """
+    with open(f"{prefix}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+    meta = {key: report['metadata'].get(key) for key in ('commit', 'dirty', 'hostname', 'timestamp')}
+    with open(f"{prefix}.csv", 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows({**meta, **row} for row in report['results'])
+    return f"{prefix}.json", f"{prefix}.csv"
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _key(row):
+    return row['kernel'], int(row['L']), row['dtype']
+
+
+def compare_with_baseline(current, baseline, threshold=0.10, n_iqr=2.0):
+    """
+    Vergleicht die Mediane zweier Berichte pro (Kernel, L, Präzision).
+
+    Als Regression gilt ein Median, der um mehr als `threshold` (relativ)
+    langsamer ist und dessen Differenz zugleich n_iqr · IQR (beider Läufe
+    kombiniert) übersteigt, damit Rauschen nicht anschlägt; analog für
+    Verbesserungen. Rückgabe: Liste von dicts mit ratio und status
+    ('regression', 'improvement', 'ok', 'new', 'missing').
+    """
+    base = {_key(row): row for row in baseline['results']}
+    rows = []
+    seen = set()
+    for row in current['results']:
+        key = _key(row)
+        seen.add(key)
+        ref = base.get(key)
+        entry = {'kernel': key[0], 'L': key[1], 'dtype': key[2],
+                 'median_s': row['median_s'], 'baseline_s': None, 'ratio': None}
+        if ref is None:
+            entry['status'] = 'new'
+            rows.append(entry)
+            continue
+        diff = row['median_s'] - ref['median_s']
+        noise = n_iqr * np.hypot(row['iqr_s'], ref['iqr_s'])
+        ratio = row['median_s'] / ref['median_s']
+        if ratio > 1.0 + threshold and diff > noise:
+            status = 'regression'
+        elif ratio < 1.0 / (1.0 + threshold) and -diff > noise:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        entry.update(baseline_s=ref['median_s'], ratio=float(ratio), status=status)
+        rows.append(entry)
+    for key, ref in base.items():
+        if key not in seen:
+            rows.append({'kernel': key[0], 'L': key[1], 'dtype': key[2], 'median_s': None,
+                         'baseline_s': ref['median_s'], 'ratio': None, 'status': 'missing'})
+    return rows
+
+
+def print_comparison(rows, baseline_meta=None):
+    """Tabelle der Abweichungen; gibt die Anzahl der Regressionen zurück."""
+    if baseline_meta:
+        print(f"   Baseline: commit {baseline_meta.get('commit')} "
+              f"({baseline_meta.get('hostname')}, {baseline_meta.get('timestamp')})")
+    marks = {'regression': '❌', 'improvement': '🚀', 'ok': '  ', 'new': '🆕', 'missing': '❔'}
+    for r in rows:
+        ratio = f"×{r['ratio']:.2f}" if r['ratio'] is not None else '   -'
+        print(f"   {marks[r['status']]} {r['kernel']:15s} L={r['L']:2d} {r['dtype']:10s} "
+              f"{ratio:>7s}  {r['status']}")
+    n_regressions = sum(r['status'] == 'regression' for r in rows)
+    print(f"   {n_regressions} Regression(en)")
+    return n_regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UIDT Gitter-Benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--dtypes', nargs='+', default=list(DEFAULT_DTYPES))
+    parser.add_argument('--kernels', nargs='+', default=None)
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', default='uidt_benchmark')
+    parser.add_argument('--baseline', default=None, help="JSON-Bericht zum Vergleich")
+    parser.add_argument('--threshold', type=float, default=0.10)
+    parser.add_argument('--expm', default=EXPM_ENGINE,
+                        help=f"SU(3)-Exponential 'modul:funktion' oder '{EXPM_REFERENCE}'")
+    parser.add_argument('--lattice', default=None,
+                        help="Gitterfabrik 'modul:funktion', (L, dtype) -> Gitter, "
+                             "für die Kernels trajectory und force")
+    args = parser.parse_args(argv)
+
+    print("🚀 UIDT Gitter-Benchmarks")
+    make_lattice = load_callable(args.lattice) if args.lattice else None
+    if make_lattice is None:
+        print("⚠️ Ohne --lattice werden Trajektorie und Kraftauswertung nicht gemessen")
+    report = run_benchmarks(args.sizes, args.dtypes, kernels=args.kernels,
+                            make_lattice=make_lattice, expm=args.expm,
+                            repeats=args.repeats, warmup=args.warmup)
+    json_path, csv_path = write_report(report, args.output)
+    print(f"💾 Bericht: {json_path}, {csv_path}")
+    if args.baseline:
+        baseline = load_report(args.baseline)
+        for key in ('expm', 'lattice_kernels'):
+            if baseline['metadata'].get(key) != report['metadata'].get(key):
+                print(f"⚠️ Baseline mit {key}={baseline['metadata'].get(key)}, "
+                      f"dieser Lauf mit {key}={report['metadata'].get(key)}")
+        rows = compare_with_baseline(report, baseline, threshold=args.threshold)
+        return 1 if print_comparison(rows, baseline['metadata']) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+UIDT v3.2 Bootstrap-Resampling
+------------------------------
+Bootstrap beliebiger Schätzer über Messreihen (Achse 0 = Messungen):
+
+- jedes Replikat hat einen eigenen Zufallsstrom aus SeedSequence.spawn,
+  das Ergebnis hängt daher weder von der Chunk-Größe noch von der Anzahl
+  der Prozesse ab
+- optional geblockt (Blöcke aufeinanderfolgender Messungen, Größe aus τ_int)
+- Replikate werden in Chunks erzeugt; statt Index-Kopien der Daten wird pro
+  Replikat nur ein Gewichtsvektor (Häufigkeiten) gehalten, der Speicher ist
+  durch chunk_size × N begrenzt
+
+Der Schätzer erhält wie beim Jackknife den Mittelwert der resampelten Daten.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from uidt_resampling import block_means, block_size_from_tau
+
+
+def _replica_weights(seed_seqs, n):
+    """Häufigkeiten w_i/N der gezogenen Messungen pro Replikat, Form (chunk, N)."""
+    weights = np.empty((len(seed_seqs), n))
+    for k, seq in enumerate(seed_seqs):
+        rng = np.random.default_rng(seq)
+        weights[k] = np.bincount(rng.integers(0, n, size=n), minlength=n)
+    return weights / n
+
+
+def _bootstrap_chunk(func, data, seed_seqs, vectorized):
+    """Schätzer für einen Chunk von Replikaten (läuft ggf. in einem Worker-Prozess)."""
+    n = data.shape[0]
+    means = (_replica_weights(seed_seqs, n) @ data.reshape(n, -1)).reshape(
+        (len(seed_seqs),) + data.shape[1:])
+    if vectorized:
+        return np.asarray(func(means))
+    return np.asarray([func(m) for m in means])
+
+
+def _summarize(value, estimates, confidence):
+    lo, hi = 50.0 * (1.0 - confidence), 50.0 * (1.0 + confidence)
+    return {
+        'value': value,
+        'error': np.nanstd(estimates, axis=0, ddof=1),
+        'samples': estimates,
+        'interval': (np.nanpercentile(estimates, lo, axis=0),
+                     np.nanpercentile(estimates, hi, axis=0)),
+    }
+
+
+def bootstrap(func, samples, n_boot=1000, block_size=1, seed=None, n_workers=None,
+              chunk_size=256, vectorized=False, confidence=0.683):
+    """
+    Bootstrap-Fehler eines Schätzers func(Mittelwert).
+
+    block_size: 1, eine ganze Zahl oder 'auto' (aus τ_int)
+    seed:       Wurzel der SeedSequence; gleiche Seeds → identische Replikate
+    n_workers:  > 1 verteilt die Chunks auf einen ProcessPool (func picklebar)
+    vectorized: func erhält alle Replikat-Mittelwerte eines Chunks auf einmal
+
+    Rückgabe: dict mit value, error, samples, interval (Perzentile zum
+    Konfidenzniveau), block_size und seed (entropy der SeedSequence).
+    """
+    samples = np.asarray(samples, dtype=float)
+    if block_size == 'auto':
+        block_size = block_size_from_tau(samples)
+    data = block_means(samples, block_size) if block_size > 1 else samples
+    if data.shape[0] < 2:
+        raise ValueError("Bootstrap benötigt mindestens zwei (Block-)Messungen")
+
+    root = np.random.SeedSequence(seed)
+    replica_seqs = root.spawn(n_boot)
+    chunks = [replica_seqs[i:i + chunk_size] for i in range(0, n_boot, chunk_size)]
+
+    mean = data.mean(axis=0)
+    value = np.asarray(func(mean[None]))[0] if vectorized else np.asarray(func(mean))
+
+    if n_workers and n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_bootstrap_chunk, func, data, chunk, vectorized)
+                       for chunk in chunks]
+            estimates = np.concatenate([f.result() for f in futures])
+    else:
+        estimates = np.concatenate([_bootstrap_chunk(func, data, chunk, vectorized)
+                                    for chunk in chunks])
+
+    result = _summarize(value, estimates, confidence)
+    result['block_size'] = block_size
+    result['seed'] = root.entropy
+    return result
+
+
+def _parametric_chunk(func, values, errors, seed_seqs):
+    out = []
+    for seq in seed_seqs:
+        rng = np.random.default_rng(seq)
+        out.append(func(values + errors * rng.standard_normal(values.shape)))
+    return np.asarray(out)
+
+
+def parametric_bootstrap(func, values, errors, n_boot=1000, seed=None, n_workers=None,
+                         chunk_size=256, confidence=0.683):
+    """
+    Parametrischer Bootstrap für abgeleitete Größen aus Werten mit
+    (unkorrelierten, gaußschen) Fehlern, z.B. eine Kontinuumsextrapolation
+    aus Massen bei mehreren β.
+    """
+    values = np.asarray(values, dtype=float)
+    errors = np.asarray(errors, dtype=float)
+    root = np.random.SeedSequence(seed)
+    replica_seqs = root.spawn(n_boot)
+    chunks = [replica_seqs[i:i + chunk_size] for i in range(0, n_boot, chunk_size)]
+
+    if n_workers and n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(_parametric_chunk, func, values, errors, chunk)
+                       for chunk in chunks]
+            estimates = np.concatenate([f.result() for f in futures])
+    else:
+        estimates = np.concatenate([_parametric_chunk(func, values, errors, chunk)
+                                    for chunk in chunks])
+
+    result = _summarize(np.asarray(func(values)), estimates, confidence)
+    result['seed'] = root.entropy
+    return result
@@ -0,0 +1,237 @@
+"""
+UIDT v3.2 Fit-Engine für Korrelatoren und Potentiale
+----------------------------------------------------
+Korrelierte χ²-Fits mit analytischen Jacobi-Matrizen:
+
+    χ² = (y - f(x; p))ᵀ C⁻¹ (y - f(x; p))
+
+- Modelle: periodischer cosh / zweiseitige Exponentialfunktion (N_t als
+  Modellparameter statt globaler Variable), Mehrzustands-Exponential, Cornell
+- Kovarianzmatrix mit Shrinkage Richtung Diagonale (Ledoit-Wolf-Schätzer
+  für λ), damit kleine Stichproben invertierbar bleiben
+- Levenberg-Marquardt vektorisiert über eine Batch-Achse: alle Jackknife-/
+  Bootstrap-Stichproben werden in einem Aufruf gefittet, warm gestartet
+  vom Fit des Gesamtmittels
+
+Parameterfelder haben die Form (B, k), Daten (B, n); Einzelfits sind B = 1.
+"""
+
+import numpy as np
+
+
+# ================================================================ Modelle
+
+def _log_ratio_guess(t, y):
+    """Startwert der Masse aus dem ersten positiven Punktepaar: (Index, m0)."""
+    i = int(np.argmax(y > 0)) if np.any(y > 0) else 0
+    j = min(i + 1, len(y) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m0 = np.log(y[i] / y[j]) / max(t[j] - t[i], 1)
+    return i, (m0 if np.isfinite(m0) and m0 > 0 else 0.5)
+
+
+class CoshModel:
+    """
+    C(t) = A e^{-m t} + B e^{-m (N_t - t)}  (symmetric=False, Parameter A, m, B)
+    C(t) = A [e^{-m t} + e^{-m (N_t - t)}]  (symmetric=True,  Parameter A, m)
+    """
+
+    def __init__(self, Nt, symmetric=False):
+        self.Nt = Nt
+        self.symmetric = symmetric
+        self.param_names = ('A', 'm') if symmetric else ('A', 'm', 'B')
+
+    def __call__(self, t, p):
+        fwd = np.exp(-p[..., 1, None] * t)
+        bwd = np.exp(-p[..., 1, None] * (self.Nt - t))
+        B = p[..., 0, None] if self.symmetric else p[..., 2, None]
+        return p[..., 0, None] * fwd + B * bwd
+
+    def jacobian(self, t, p):
+        fwd = np.exp(-p[..., 1, None] * t)
+        bwd = np.exp(-p[..., 1, None] * (self.Nt - t))
+        A = p[..., 0, None]
+        B = A if self.symmetric else p[..., 2, None]
+        dm = -t * A * fwd - (self.Nt - t) * B * bwd
+        if self.symmetric:
+            return np.stack([fwd + bwd, dm], axis=-1)
+        return np.stack([fwd, dm, bwd], axis=-1)
+
+    def initial_guess(self, t, y):
+        i, m0 = _log_ratio_guess(t, y)
+        A0 = y[i] * np.exp(m0 * t[i])
+        return np.array([A0, m0] if self.symmetric else [A0, m0, 0.1 * A0])
+
+
+class MultiExpModel:
+    """C(t) = Σ_n A_n e^{-E_n t}, Parameter (A_0, E_0, A_1, E_1, ...)."""
+
+    def __init__(self, n_states=2):
+        self.n_states = n_states
+        self.param_names = tuple(name for n in range(n_states) for name in (f'A{n}', f'E{n}'))
+
+    def __call__(self, t, p):
+        A = p[..., 0::2, None]
+        E = p[..., 1::2, None]
+        return np.sum(A * np.exp(-E * t), axis=-2)
+
+    def jacobian(self, t, p):
+        A = p[..., 0::2, None]
+        E = p[..., 1::2, None]
+        e = np.exp(-E * t)
+        J = np.empty(p.shape[:-1] + (t.shape[-1], p.shape[-1]))
+        J[..., 0::2] = np.swapaxes(e, -1, -2)
+        J[..., 1::2] = np.swapaxes(-t * A * e, -1, -2)
+        return J
+
+    def initial_guess(self, t, y):
+        i, E0 = _log_ratio_guess(t, y)
+        A0 = y[i] * np.exp(E0 * t[i])
+        p = []
+        for n in range(self.n_states):
+            p += [A0 * 0.3**n, E0 * (1.0 + n)]
+        return np.array(p)
+
+
+class CornellModel:
+    """V(R) = V0 + α/R + σ R, linear in den Parametern (V0, α, σ)."""
+
+    param_names = ('V0', 'alpha', 'sigma')
+
+    def __call__(self, R, p):
+        return p[..., 0, None] + p[..., 1, None] / R + p[..., 2, None] * R
+
+    def jacobian(self, R, p):
+        J = np.stack([np.ones_like(R), 1.0 / R, R], axis=-1)
+        return np.broadcast_to(J, p.shape[:-1] + J.shape)
+
+    def initial_guess(self, R, V):
+        return np.array([0.1, -0.3, 0.05])
+
+
+# ========================================================== Kovarianzmatrix
+
+def ledoit_wolf_shrinkage(samples):
+    """
+    Optimales λ für das Schrumpfen der Korrelationsmatrix zur Einheitsmatrix
+    (Ledoit-Wolf) aus Messungen der Form (N, n). Das Ziel hat dieselbe
+    Diagonale, phi und gamma laufen daher nur über die Nebendiagonale.
+    """
+    X = np.asarray(samples, dtype=float)
+    N, n = X.shape
+    Z = (X - X.mean(axis=0)) / np.maximum(X.std(axis=0), 1e-300)
+    S = Z.T @ Z / N
+    off_diag = ~np.eye(n, dtype=bool)
+    phi = np.sum(((np.einsum('ai,aj->aij', Z, Z) - S)**2)[:, off_diag]) / N**2
+    gamma = np.sum(S[off_diag]**2)
+    return float(np.clip(phi / gamma, 0.0, 1.0)) if gamma > 0 else 1.0
+
+
+def shrink_covariance(cov, lam):
+    """C(λ) = (1-λ) C + λ diag(C)."""
+    cov = np.asarray(cov, dtype=float)
+    return (1.0 - lam) * cov + lam * np.diag(np.diag(cov))
+
+
+def whitening_matrix(cov=None, sigma=None, n=None):
+    """L⁻¹ mit C = L Lᵀ, sodass χ² = |L⁻¹ r|². Ohne Kovarianz: diag(1/σ) bzw. 1."""
+    if cov is not None:
+        L = np.linalg.cholesky(np.asarray(cov, dtype=float))
+        return np.linalg.inv(L)
+    if sigma is not None:
+        return np.diag(1.0 / np.asarray(sigma, dtype=float))
+    return np.eye(n)
+
+
+# ======================================================= Levenberg-Marquardt
+
+def fit_batch(model, x, y, p0, cov=None, sigma=None, weights=None, max_iter=200,
+              tol=1e-10, lam0=1e-3):
+    """
+    Levenberg-Marquardt für B unabhängige Fits gleichzeitig.
+
+    y: (B, n) Daten, p0: (B, k) oder (k,) Startwerte (Warmstart)
+    cov: (n, n) gemeinsame oder (B, n, n) individuelle Kovarianz; alternativ
+    sigma (n,) für unkorrelierte Fits oder direkt weights = L⁻¹ der Form
+    (n, n) / (B, n, n). Nullzeilen in weights nehmen Punkte aus dem Fit
+    (so lassen sich verschiedene Fit-Fenster in einem Batch fitten).
+    Rückgabe: dict mit params, errors, param_cov, chi2, dof, converged, n_iter.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    B, n = y.shape
+    p = np.array(np.broadcast_to(p0, (B, np.shape(p0)[-1])), dtype=float)
+    k = p.shape[-1]
+
+    if weights is not None:
+        W = np.asarray(weights, dtype=float)
+    elif cov is not None and np.ndim(cov) == 3:
+        W = np.linalg.inv(np.linalg.cholesky(cov))
+    else:
+        W = whitening_matrix(cov, sigma, n)
+
+    def residuals(p):
+        return np.einsum('...ij,...j->...i', W, y - model(x, p))
+
+    r = residuals(p)
+    chi2 = np.sum(r**2, axis=-1)
+    lam = np.full(B, lam0)
+    active = np.isfinite(chi2)
+    converged = np.zeros(B, dtype=bool)
+
+    for it in range(1, max_iter + 1):
+        J = -np.einsum('...ij,...jk->...ik', W, model.jacobian(x, p))
+        JTJ = np.swapaxes(J, -1, -2) @ J
+        g = np.einsum('...ji,...j->...i', J, r)
+        A = JTJ + lam[:, None, None] * (JTJ * np.eye(k))
+        try:
+            dp = -np.linalg.solve(A, g[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            dp = -(np.linalg.pinv(A) @ g[..., None])[..., 0]
+        dp[~active] = 0.0
+
+        p_new = p + dp
+        r_new = residuals(p_new)
+        chi2_new = np.sum(r_new**2, axis=-1)
+        accept = active & np.isfinite(chi2_new) & (chi2_new <= chi2)
+
+        small = np.abs(chi2 - chi2_new) <= tol * np.maximum(chi2, 1.0)
+        converged |= accept & small
+        p = np.where(accept[:, None], p_new, p)
+        r = np.where(accept[:, None], r_new, r)
+        chi2 = np.where(accept, chi2_new, chi2)
+        lam = np.where(accept, lam * 0.3, lam * 10.0)
+        active &= ~converged & (lam < 1e12)
+        if not active.any():
+            break
+
+    J = -np.einsum('...ij,...jk->...ik', W, model.jacobian(x, p))
+    param_cov = np.linalg.pinv(np.swapaxes(J, -1, -2) @ J)
+    return {
+        'params': p,
+        'errors': np.sqrt(np.abs(np.diagonal(param_cov, axis1=-2, axis2=-1))),
+        'param_cov': param_cov,
+        'chi2': chi2,
+        'dof': np.count_nonzero(np.any(W != 0, axis=-1), axis=-1) - k,
+        'converged': converged,
+        'n_iter': it,
+    }
+
+
+def correlated_fit(model, x, y, cov=None, sigma=None, p0=None, shrinkage=None,
+                   samples=None, **kwargs):
+    """
+    Einzelner (korrelierter) Fit. shrinkage: None, fester Wert λ oder 'auto'
+    (Ledoit-Wolf aus `samples`, Form (N, n)). Rückgabe wie fit_batch, ohne
+    Batch-Achse.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if cov is not None and shrinkage is not None:
+        lam = ledoit_wolf_shrinkage(samples) if shrinkage == 'auto' else shrinkage
+        cov = shrink_covariance(cov, lam)
+    p0 = model.initial_guess(x, y) if p0 is None else np.asarray(p0, dtype=float)
+    result = fit_batch(model, x, y[None], p0, cov=cov, sigma=sigma, **kwargs)
+    return {key: (val[0] if isinstance(val, np.ndarray) and val.ndim and val.shape[0] == 1
+                  else val)
+            for key, val in result.items()}
@@ -0,0 +1,127 @@
+"""
+UIDT v3.2 Fourier-Beschleunigung für das Skalarfeld S
+-----------------------------------------------------
+Impulsabhängige Massenmatrix für die Ps-Impulse:
+
+    H_kin = ½ Σ_p |π̃(p)|² / M(p),   M(p) = (p̂² + M²) / (p̂²_max + M²)
+
+mit p̂² = Σ_μ 4 sin²(p_μ/2) und p̂²_max = 16. Für das freie Feld laufen damit
+alle Moden mit derselben Frequenz ω² = (p̂² + M²)/M(p); die langwelligen
+Moden, die bei Einheitsmasse die Schrittweite nicht ausnutzen, werden
+schneller. UV-Moden (M ≈ 1) bleiben unverändert, die Schrittweite also auch.
+
+- Impulse π = F⁻¹[√M(p) F[η]], η ~ N(0, 1)
+- Geschwindigkeit dS/dτ = M⁻¹ π = F⁻¹[F[π] / M(p)]
+- M wird aus m_S (Gittereinheiten) gesetzt und kann skaliert werden
+- fourier_acceleration_benchmark misst τ_int von ⟨S⟩ und des
+  Skalarkorrelators pro CPU-Sekunde mit und ohne Beschleunigung
+"""
+
+import time
+
+import numpy as np
+
+from uidt_autocorrelation import integrated_autocorrelation_time
+from uidt_lattice_utils import get_array_module, to_lattice_units
+from uidt_scalar_correlators import timeslice_correlator_fft
+
+
+def lattice_p_hat_sq_4d(shape, xp=np):
+    """p̂² = Σ_μ 4 sin²(p_μ/2) auf dem rfftn-Gitter (letzte Achse halbiert)."""
+    axes = [xp.fft.fftfreq(n) * 2 * np.pi for n in shape[:-1]]
+    axes.append(xp.fft.rfftfreq(shape[-1]) * 2 * np.pi)
+    p_sq = 0.0
+    for mu, p in enumerate(axes):
+        view = [1] * len(shape)
+        view[mu] = -1
+        p_sq = p_sq + 4.0 * xp.sin(p.reshape(view) / 2.0)**2
+    return p_sq
+
+
+class FourierMass:
+    """
+    Massenmatrix M(p) für Skalarimpulse der Form `shape` (x, y, z, t).
+
+    mass:  Fourier-Masse M in Gittereinheiten, typischerweise a·m_S (siehe
+           from_scalar_mass); M → ∞ ergibt die Einheitsmasse
+    """
+
+    def __init__(self, shape, mass, xp=np):
+        self.shape = tuple(shape)
+        self.mass = float(mass)
+        self.xp = xp
+        p_sq = lattice_p_hat_sq_4d(self.shape, xp)
+        p_sq_max = 4.0 * len(self.shape)
+        self.M = (p_sq + self.mass**2) / (p_sq_max + self.mass**2)
+        self.sqrt_M = xp.sqrt(self.M)
+
+    @classmethod
+    def from_scalar_mass(cls, shape, m_S, a, scale=1.0, xp=np):
+        """M = scale · a · m_S / ħc aus der physikalischen Skalarmasse."""
+        return cls(shape, scale * to_lattice_units(m_S, a), xp=xp)
+
+    def _filter(self, field, kernel):
+        xp = get_array_module(field)
+        return xp.fft.irfftn(xp.fft.rfftn(field) * kernel, s=self.shape)
+
+    def sample_momenta(self, noise):
+        """π mit Kovarianz M aus Standardnormal-Rauschen η derselben Form."""
+        return self._filter(noise, self.sqrt_M)
+
+    def velocity(self, Ps):
+        """M⁻¹ π für das Positions-Update S ← S + ε M⁻¹ π."""
+        return self._filter(Ps, 1.0 / self.M)
+
+    def kinetic_energy(self, Ps):
+        """½ π · M⁻¹ π."""
+        xp = get_array_module(Ps)
+        return 0.5 * float(xp.sum(Ps * self.velocity(Ps)))
+
+
+def _measure_run(lattice, trajectory, n_therm, n_traj):
+    for _ in range(n_therm):
+        trajectory(lattice)
+    S_vev = np.empty(n_traj)
+    C_S = []
+    accepted = 0
+    start = time.process_time()
+    for i in range(n_traj):
+        accepted += bool(trajectory(lattice)[0])
+        S = lattice.S.get() if hasattr(lattice.S, 'get') else np.asarray(lattice.S)
+        S_vev[i] = S.mean()
+        C_S.append(timeslice_correlator_fft(S))
+    cpu = (time.process_time() - start) / n_traj
+    C_S = np.array(C_S)
+    tau_S = float(integrated_autocorrelation_time(S_vev))
+    tau_C = float(np.nanmax(integrated_autocorrelation_time(C_S[:, 1:].T)))
+    return {
+        'cpu_per_traj': cpu,
+        'acceptance': accepted / n_traj,
+        'tau_int_S': tau_S,
+        'tau_int_C': tau_C,
+        # Kosten pro unabhängiger Messung: 2 τ_int · CPU-Zeit pro Trajektorie
+        'cost_S': 2.0 * tau_S * cpu,
+        'cost_C': 2.0 * tau_C * cpu,
+    }
+
+
+def fourier_acceleration_benchmark(make_lattice, trajectory, n_therm=100, n_traj=500):
+    """
+    Vergleich Einheitsmasse vs. Fourier-Beschleunigung.
+
+    make_lattice(fourier_acceleration: bool) -> Gitter,
+    trajectory(lattice) -> (accepted, delta_H).
+    Rückgabe: {'unit': ..., 'fourier': ..., 'speedup_S', 'speedup_C'}; die
+    Speedups sind Verhältnisse der CPU-Kosten pro unabhängiger Messung.
+    """
+    results = {}
+    for label, fa in (('unit', False), ('fourier', True)):
+        results[label] = _measure_run(make_lattice(fa), trajectory, n_therm, n_traj)
+        r = results[label]
+        print(f"   {label:8s}: τ_int(⟨S⟩) = {r['tau_int_S']:.2f}, τ_int(C_S) = {r['tau_int_C']:.2f}, "
+              f"{r['cpu_per_traj'] * 1e3:.1f} ms/Traj., Akzeptanz {r['acceptance']:.2f}")
+    results['speedup_S'] = results['unit']['cost_S'] / results['fourier']['cost_S']
+    results['speedup_C'] = results['unit']['cost_C'] / results['fourier']['cost_C']
+    print(f"   Gewinn pro CPU-Zeit: ⟨S⟩ ×{results['speedup_S']:.2f}, "
+          f"Korrelator ×{results['speedup_C']:.2f}")
+    return results
@@ -0,0 +1,144 @@
+"""
+UIDT v3.2 Variationsanalyse (GEVP) für den 0++ Glueball
+--------------------------------------------------------
+Statt eines einzelnen, ungesmearten Plaquette-Operators wird eine Operatorbasis
+aus mehreren Schleifenformen und APE-Smearing-Stufen gemessen. Daraus entsteht
+eine N×N Korrelatormatrix C_ij(t), deren verallgemeinertes Eigenwertproblem
+
+    C(t) v_n = λ_n(t, t0) C(t0) v_n
+
+Grundzustand und angeregte Zustände trennt. Der Löser ist über t und über
+beliebige führende Achsen (z.B. Jackknife-Stichproben) vektorisiert.
+"""
+
+import numpy as np
+
+from uidt_lattice_utils import (
+    ape_smear_spatial, get_array_module, loop_trace_timeslices, to_physical_units
+)
+from uidt_resampling import jackknife_error, jackknife_means
+
+# A1++ Schleifen: Summe über alle räumlichen Orientierungen der jeweiligen Form
+_SPATIAL_PLANES = ((1, 2), (1, 3), (2, 3))
+
+GLUEBALL_0PP_SHAPES = {
+    'plaquette': [(i, j, -i, -j) for i, j in _SPATIAL_PLANES],
+    'rectangle': ([(i, i, j, -i, -i, -j) for i, j in _SPATIAL_PLANES]
+                  + [(i, j, j, -i, -j, -j) for i, j in _SPATIAL_PLANES]),
+}
+
+
+def variational_operator_basis(U, smear_levels=(0, 4, 8, 16), alpha=0.5,
+                               shapes=('plaquette', 'rectangle')):
+    """
+    Misst alle Operatoren der Variationsbasis in einem Durchlauf.
+
+    Alle Smearing-Stufen entstehen aus einer einzigen APE-Iteration; pro Stufe
+    werden alle Schleifenformen mit gemeinsamem Präfix-Cache ausgewertet.
+    Rückgabe: (O, names) mit O.shape = (n_ops, N_t), Re Tr pro Zeitscheibe.
+    """
+    xp = get_array_module(U)
+    operators = []
+    names = []
+    for level, U_smeared in zip(smear_levels, ape_smear_spatial(U, alpha, smear_levels)):
+        cache = {}
+        for shape in shapes:
+            O_t = sum(loop_trace_timeslices(U_smeared, path, cache=cache)
+                      for path in GLUEBALL_0PP_SHAPES[shape])
+            operators.append(xp.real(O_t))
+            names.append(f'{shape}_ape{level}')
+    O = xp.stack(operators)
+    if xp is not np:
+        O = xp.asnumpy(O)
+    return O, names
+
+
+def timeslice_correlator_matrix(O, t_extent=None):
+    """
+    Roher Korrelator einer Konfiguration via FFT über t:
+    c_ij(Δt) = 1/N_t Σ_t O_i(t+Δt) O_j(t), symmetrisiert und gefaltet.
+    Rückgabe: (c[Δt, i, j], Ō_i) mit Δt = 0 .. t_extent-1.
+    """
+    O = np.asarray(O, dtype=float)
+    n_t = O.shape[-1]
+    t_extent = n_t // 2 + 1 if t_extent is None else t_extent
+    O_hat = np.fft.rfft(O, axis=-1)
+    c = np.fft.irfft(O_hat[:, None, :] * np.conj(O_hat[None, :, :]), n=n_t, axis=-1) / n_t
+    c = 0.5 * (c + c.transpose(1, 0, 2))
+    return np.moveaxis(c, -1, 0)[:t_extent], O.mean(axis=-1)
+
+
+def vacuum_subtract(c_mean, O_mean):
+    """Verbundene Korrelatormatrix C_ij(t) = ⟨c_ij(t)⟩ - ⟨O_i⟩⟨O_j⟩."""
+    return c_mean - (O_mean[..., None, :, None] * O_mean[..., None, None, :])
+
+
+def solve_gevp(C, t0=1, n_keep=None, rcond=1e-10):
+    """
+    Verallgemeinertes Eigenwertproblem für alle t und alle führenden Achsen.
+
+    C hat die Form (..., T, N, N). Über die Eigenzerlegung von C(t0) werden
+    numerisch verschwindende Richtungen entfernt (n_keep), danach wird C(t)
+    mit C(t0)^{-1/2} symmetrisch transformiert und diagonalisiert.
+    Rückgabe: (λ[..., T, k] absteigend sortiert, v[..., T, N, k]).
+    """
+    C = 0.5 * (C + np.swapaxes(C, -1, -2))
+    w0, V0 = np.linalg.eigh(C[..., t0, :, :])
+    if n_keep is None:
+        w_max = w0[..., -1:]
+        n_keep = int(np.min(np.sum(w0 > rcond * w_max, axis=-1)))
+    n_keep = max(1, n_keep)
+    w_k = np.maximum(w0[..., -n_keep:], np.finfo(float).tiny)
+    W = V0[..., -n_keep:] / np.sqrt(w_k)[..., None, :]
+    W_t = W[..., None, :, :]
+    A = np.swapaxes(W_t, -1, -2) @ C @ W_t
+    lam, u = np.linalg.eigh(0.5 * (A + np.swapaxes(A, -1, -2)))
+    return lam[..., ::-1], (W_t @ u)[..., ::-1]
+
+
+def gevp_effective_masses(lam):
+    """m_eff,n(t) = ln[λ_n(t) / λ_n(t+1)], Form (..., T-1, k)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.log(lam[..., :-1, :] / lam[..., 1:, :])
+
+
+def analyze_variational_glueball(c_samples, O_samples, a, t0=1, t_min=2, t_max=6,
+                                 n_states=2):
+    """
+    GEVP-Analyse der gesammelten Korrelatormatrizen.
+
+    c_samples: (N_meas, T, N, N) rohe Korrelatoren pro Konfiguration
+    O_samples: (N_meas, N) Operator-Mittelwerte pro Konfiguration
+    Massen aus dem Plateau der GEVP-Effektivmassen über [t_min, t_max),
+    Fehler aus Jackknife über alle Konfigurationen.
+    """
+    c_samples = np.asarray(c_samples)
+    O_samples = np.asarray(O_samples)
+
+    C_central = vacuum_subtract(c_samples.mean(axis=0), O_samples.mean(axis=0))
+    lam_central, v_central = solve_gevp(C_central, t0=t0)
+    n_keep = lam_central.shape[-1]
+
+    C_jack = vacuum_subtract(jackknife_means(c_samples), jackknife_means(O_samples))
+    lam_jack, _ = solve_gevp(C_jack, t0=t0, n_keep=n_keep)
+
+    m_eff = gevp_effective_masses(lam_central)
+    m_eff_jack = gevp_effective_masses(lam_jack)
+    t_max = min(t_max, m_eff.shape[-2])
+    n_states = min(n_states, n_keep)
+
+    m_plateau = np.nanmean(m_eff[t_min:t_max, :n_states], axis=0)
+    m_plateau_jack = np.nanmean(m_eff_jack[:, t_min:t_max, :n_states], axis=1)
+    m_err = jackknife_error(m_plateau_jack)
+
+    return {
+        'masses': to_physical_units(m_plateau, a),
+        'mass_errors': to_physical_units(m_err, a),
+        'masses_lattice': m_plateau,
+        'm_eff': m_eff,
+        'm_eff_err': jackknife_error(m_eff_jack),
+        'eigenvalues': lam_central,
+        'eigenvectors': v_central[t0 + 1],
+        'n_operators_kept': n_keep,
+        't0': t0,
+    }
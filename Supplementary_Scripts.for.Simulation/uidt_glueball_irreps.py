@@ -0,0 +1,285 @@
+"""
+UIDT v3.2 Glueball-Operatoren in den Darstellungen der kubischen Gruppe
+-----------------------------------------------------------------------
+Auf dem Gitter ist die Drehgruppe auf O_h reduziert. Glueball-Zustände J^PC
+werden daher über die irreduziblen Darstellungen R^PC (R = A1, A2, E, T1, T2)
+gemessen:
+
+    0++ ← A1++      2++ ← E++ ⊕ T2++      0-+ ← A1-+
+    1+- ← T1+-      2-+ ← E-+ ⊕ T2-+
+
+Für jede Schleifenform (Plaquette, Rechteck, Stuhl, verdrillte Schleife)
+werden alle Orientierungen unter O_h erzeugt, die Darstellungsmatrizen
+aufgebaut und die Projektoren über die Charaktertafel vorab berechnet.
+C = + entspricht Re Tr W, C = - entspricht Im Tr W.
+"""
+
+import itertools
+from functools import lru_cache
+
+import numpy as np
+
+from uidt_lattice_utils import (
+    ape_smear_spatial, get_array_module, loop_trace_timeslices, to_physical_units
+)
+from uidt_resampling import jackknife_error, jackknife_means
+
+# Basisschleifen als Schrittfolgen ±(μ+1) in den räumlichen Richtungen
+LOOP_SHAPES = {
+    'plaquette': (1, 2, -1, -2),
+    'rectangle': (1, 1, 2, -1, -1, -2),
+    'chair': (1, 2, -1, 3, -2, -3),
+    'twisted': (1, 2, 1, -3, -2, -1, -1, 3),   # chirale 8-Link-Schleife
+}
+
+IRREPS = ('A1', 'A2', 'E', 'T1', 'T2')
+IRREP_DIMENSIONS = {'A1': 1, 'A2': 1, 'E': 2, 'T1': 3, 'T2': 3}
+
+# Charaktertafel von O, Klassen: E, 8C3, 3C2 (=C4²), 6C4, 6C2'
+_CHARACTERS_O = {
+    'A1': {'E': 1, 'C3': 1, 'C2': 1, 'C4': 1, "C2'": 1},
+    'A2': {'E': 1, 'C3': 1, 'C2': 1, 'C4': -1, "C2'": -1},
+    'E': {'E': 2, 'C3': -1, 'C2': 2, 'C4': 0, "C2'": 0},
+    'T1': {'E': 3, 'C3': 0, 'C2': -1, 'C4': 1, "C2'": -1},
+    'T2': {'E': 3, 'C3': 0, 'C2': -1, 'C4': -1, "C2'": 1},
+}
+
+# Kontinuumsspin → beitragende Gitterkanäle
+JPC_TO_CHANNELS = {
+    '0++': ('A1++',),
+    '2++': ('E++', 'T2++'),
+    '0-+': ('A1-+',),
+    '1+-': ('T1+-',),
+    '2-+': ('E-+', 'T2-+'),
+}
+
+
+def _cubic_group():
+    """Alle 48 Elemente von O_h als vorzeichenbehaftete Permutationsmatrizen."""
+    group = []
+    for perm in itertools.permutations(range(3)):
+        for signs in itertools.product((1, -1), repeat=3):
+            R = np.zeros((3, 3), dtype=int)
+            for axis, (target, sign) in enumerate(zip(perm, signs)):
+                R[target, axis] = sign
+            group.append(R)
+    return group
+
+
+def _rotation_class(R):
+    """Konjugationsklasse des Drehanteils r = det(R)·R in O."""
+    r = R * int(round(np.linalg.det(R)))
+    trace = int(np.trace(r))
+    if trace == 3:
+        return 'E'
+    if trace == 0:
+        return 'C3'
+    if trace == 1:
+        return 'C4'
+    return 'C2' if np.count_nonzero(r - np.diag(np.diag(r))) == 0 else "C2'"
+
+
+def _transform_path(path, R):
+    """Wendet R ∈ O_h auf jeden Schritt eines Pfades an."""
+    out = []
+    for step in path:
+        axis = abs(step) - 1
+        target = int(np.flatnonzero(R[:, axis])[0])
+        out.append(int(np.sign(step) * R[target, axis] * (target + 1)))
+    return tuple(out)
+
+
+def _cyclic_key(path):
+    return min(path[i:] + path[:i] for i in range(len(path)))
+
+
+def _reverse(path):
+    return tuple(-s for s in reversed(path))
+
+
+def _loop_key(path):
+    """
+    Translations- und startpunktunabhängige Kennung einer Schleife.
+    Rückgabe: (Kennung, Orientierung ±1, selbstkonjugiert)
+    """
+    forward, backward = _cyclic_key(path), _cyclic_key(_reverse(path))
+    return min(forward, backward), (1 if forward <= backward else -1), forward == backward
+
+
+@lru_cache(maxsize=None)
+def irrep_coefficient_tables(shape):
+    """
+    Vorab berechnete Projektionstabellen einer Schleifenform.
+
+    Rückgabe: (paths, tables) mit den Pfaden aller Orientierungen und
+    tables[R^PC] = Koeffizientenmatrix B (Zeilen = orthonormale Operatoren),
+    sodass O_row(t) = B @ Re/Im Tr W_k(t).
+    """
+    group = _cubic_group()
+    base = LOOP_SHAPES[shape]
+
+    keys, self_conjugate = [], []
+    for R in group:
+        key, _, self_conj = _loop_key(_transform_path(base, R))
+        if key not in keys:
+            keys.append(key)
+            self_conjugate.append(self_conj)
+    n = len(keys)
+    index = {key: k for k, key in enumerate(keys)}
+    im_mask = np.array([0.0 if sc else 1.0 for sc in self_conjugate])
+
+    D_re, D_im, classes, dets = [], [], [], []
+    for R in group:
+        Dr = np.zeros((n, n))
+        Di = np.zeros((n, n))
+        for k, path in enumerate(keys):
+            key, orientation, _ = _loop_key(_transform_path(path, R))
+            Dr[index[key], k] = 1.0
+            Di[index[key], k] = orientation
+        D_re.append(Dr)
+        D_im.append(Di * im_mask[:, None] * im_mask[None, :])
+        classes.append(_rotation_class(R))
+        dets.append(int(round(np.linalg.det(R))))
+
+    tables = {}
+    for irrep in IRREPS:
+        for parity in (+1, -1):
+            chi = np.array([_CHARACTERS_O[irrep][c] * (d if parity < 0 else 1)
+                            for c, d in zip(classes, dets)], dtype=float)
+            for charge, D in ((+1, D_re), (-1, D_im)):
+                P = IRREP_DIMENSIONS[irrep] / len(group) * np.einsum('g,gij->ij', chi, np.array(D))
+                w, V = np.linalg.eigh(0.5 * (P + P.T))
+                basis = V[:, w > 0.5].T
+                if basis.shape[0]:
+                    label = f"{irrep}{'+' if parity > 0 else '-'}{'+' if charge > 0 else '-'}"
+                    tables[label] = basis
+    return tuple(keys), tables
+
+
+class GlueballOperatorBuilder:
+    """
+    Misst alle Glueball-Kanäle R^PC aus einem vektorisierten Durchlauf pro
+    Konfiguration: ein APE-Smearing, alle Schleifen aller Orientierungen
+    mit gemeinsamem Präfix-Cache, Projektion per Matrixprodukt.
+    """
+
+    def __init__(self, shapes=('plaquette', 'rectangle', 'chair', 'twisted'),
+                 smear_level=8, alpha=0.5, t_extent=None):
+        self.shapes = tuple(shapes)
+        self.smear_level = smear_level
+        self.alpha = alpha
+        self.t_extent = t_extent
+
+        self.paths = []
+        self.entries = []        # (Form, Kanal) pro Korrelator
+        blocks = []              # (Koeffizienten, erste Orientierung, C = +)
+        for shape in self.shapes:
+            paths, tables = irrep_coefficient_tables(shape)
+            for channel, basis in tables.items():
+                blocks.append((basis, len(self.paths), channel.endswith('+')))
+                self.entries.append((shape, channel))
+            self.paths.extend(paths)
+
+        # Eine gemeinsame Koeffizientenmatrix für [Re Tr; Im Tr] aller Orientierungen
+        n_paths = len(self.paths)
+        n_rows = sum(basis.shape[0] for basis, _, _ in blocks)
+        self.coefficients = np.zeros((n_rows, 2 * n_paths))
+        self.row_entry = np.zeros(n_rows, dtype=int)
+        row = 0
+        for entry, (basis, start, is_real) in enumerate(blocks):
+            col = start if is_real else n_paths + start
+            self.coefficients[row:row + basis.shape[0], col:col + basis.shape[1]] = basis
+            self.row_entry[row:row + basis.shape[0]] = entry
+            row += basis.shape[0]
+        self.entry_matrix = np.zeros((len(self.entries), n_rows))
+        self.entry_matrix[self.row_entry, np.arange(n_rows)] = 1.0
+
+    @property
+    def channels(self):
+        return sorted({channel for _, channel in self.entries})
+
+    def loop_traces(self, U):
+        """Tr W(t) aller Orientierungen aller Formen, Form (n_paths, N_t)."""
+        xp = get_array_module(U)
+        U_smeared = ape_smear_spatial(U, self.alpha, (self.smear_level,))[0]
+        cache = {}
+        traces = xp.stack([loop_trace_timeslices(U_smeared, path, cache=cache)
+                           for path in self.paths])
+        return xp.asnumpy(traces) if xp is not np else traces
+
+    def measure(self, U):
+        """
+        Rohe Kanal-Korrelatoren einer Konfiguration.
+        Rückgabe: (c_rows[M, T], O_mean_rows[M]) für alle projizierten Operatorzeilen.
+        """
+        traces = self.loop_traces(U)
+        n_t = traces.shape[-1]
+        t_extent = n_t // 2 + 1 if self.t_extent is None else self.t_extent
+        O = self.coefficients @ np.concatenate([traces.real, traces.imag])
+        O_hat = np.fft.rfft(O, axis=-1)
+        c = np.fft.irfft(np.abs(O_hat)**2, n=n_t, axis=-1) / n_t
+        return c[:, :t_extent], O.mean(axis=-1)
+
+    def channel_correlators(self, c_rows, O_rows):
+        """Vakuumsubtrahierte Korrelatoren pro (Form, Kanal), Zeilen aufsummiert."""
+        return np.einsum('em,...mt->...et', self.entry_matrix, c_rows - O_rows[..., None]**2)
+
+    def analyze(self, c_samples, O_samples, a, t_min=1, t_max=4):
+        """
+        Massen pro Kanal und pro J^PC aus den gesammelten Messungen.
+
+        Pro Kanal werden die auf C(0) normierten Korrelatoren aller Formen
+        summiert; die Masse ist das Plateau der effektiven Masse über
+        [t_min, t_max), Fehler per Jackknife.
+        """
+        c_samples = np.asarray(c_samples)
+        O_samples = np.asarray(O_samples)
+
+        def channel_sums(c_mean, O_mean):
+            C = self.channel_correlators(c_mean, O_mean)
+            C = C / C[..., :1]
+            out = {}
+            for k, (_, channel) in enumerate(self.entries):
+                out[channel] = out.get(channel, 0.0) + C[..., k, :]
+            for jpc, channels in JPC_TO_CHANNELS.items():
+                present = [out[ch] for ch in channels if ch in out]
+                if present:
+                    out[jpc] = sum(present)
+            return out
+
+        central = channel_sums(c_samples.mean(axis=0), O_samples.mean(axis=0))
+        jack = channel_sums(jackknife_means(c_samples), jackknife_means(O_samples))
+
+        results = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for label, C in central.items():
+                m_eff = np.log(C[:-1] / C[1:])
+                m_eff_jack = np.log(jack[label][:, :-1] / jack[label][:, 1:])
+                m = np.nanmean(m_eff[t_min:t_max])
+                m_jack = np.nanmean(m_eff_jack[:, t_min:t_max], axis=1)
+                m_err = jackknife_error(m_jack)
+                results[label] = {
+                    'correlator': C,
+                    'm_eff': m_eff,
+                    'mass': to_physical_units(m, a),
+                    'mass_err': to_physical_units(m_err, a),
+                }
+        return results
+
+
+def compare_with_predictions(results, spectrum, uncertainties=None):
+    """Z-Scores der gemessenen J^PC-Massen gegen eine Vorhersage (GeV)."""
+    uncertainties = uncertainties or {}
+    comparison = {}
+    for jpc, m_pred in spectrum.items():
+        if jpc not in results:
+            continue
+        m, dm = results[jpc]['mass'], results[jpc]['mass_err']
+        sigma = np.sqrt(dm**2 + uncertainties.get(jpc, 0.0)**2)
+        comparison[jpc] = {
+            'measured': m,
+            'measured_err': dm,
+            'predicted': m_pred,
+            'z_score': abs(m - m_pred) / sigma if sigma > 0 else np.nan,
+        }
+    return comparison
@@ -0,0 +1,207 @@
+"""
+UIDT v3.2 HMC-Tuning während der Thermalisierung
+------------------------------------------------
+- Schrittweite per Nesterov Dual Averaging (Hoffman & Gelman 2014, Alg. 5)
+  auf eine Ziel-Akzeptanz ⟨min(1, e^{-ΔH})⟩; ausgegeben wird der gemittelte
+  Wert log ε̄, der nicht oszilliert
+- Trajektorienlänge τ = n_steps · ε aus Kandidaten τ_0 · Faktor nach der
+  mittleren quadratischen Sprungweite einer Observable pro Kraftauswertung
+  (ESJD / n_steps); nach jedem Fenster wird τ_0 auf den besten Kandidaten
+  gesetzt, sodass die Suche geometrisch wandern kann
+- n_steps wird pro Trajektorie gleichverteilt um ±jitter gestreut, um
+  Resonanzen periodischer Moden mit fester Trajektorienlänge zu vermeiden
+- freeze() fixiert alle Parameter für die Messphase; state() liefert sie
+  für Checkpoints (save_checkpoint / load_checkpoint), die auch den Zustand
+  der Zufallsströme des Gitters (lattice.rng, siehe uidt_rng) enthalten
+"""
+
+import json
+
+import numpy as np
+
+from uidt_rng import RNGService
+from uidt_thermalization import lattice_state, load_lattice_state
+
+
+class DualAveragingStepSize:
+    """
+    Dual Averaging der Schrittweite:
+
+        H̄_m  = (1 - 1/(m+t0)) H̄_{m-1} + (δ - α_m)/(m+t0)
+        log ε_m = μ - √m/γ · H̄_m,       μ = log(10 ε_0)
+        log ε̄_m = m^{-κ} log ε_m + (1 - m^{-κ}) log ε̄_{m-1}
+    """
+
+    def __init__(self, initial_step, target=0.8, gamma=0.05, t0=10.0, kappa=0.75):
+        self.target = target
+        self.gamma = gamma
+        self.t0 = t0
+        self.kappa = kappa
+        self.mu = np.log(10.0 * initial_step)
+        self.m = 0
+        self.h_bar = 0.0
+        self.log_step = np.log(initial_step)
+        self.log_step_bar = np.log(initial_step)
+
+    @property
+    def step_size(self):
+        """Aktuelle (explorative) Schrittweite ε_m."""
+        return float(np.exp(self.log_step))
+
+    @property
+    def final_step_size(self):
+        """Gemittelte Schrittweite ε̄ für die Messphase."""
+        return float(np.exp(self.log_step_bar))
+
+    def update(self, accept_prob):
+        self.m += 1
+        w = 1.0 / (self.m + self.t0)
+        self.h_bar = (1.0 - w) * self.h_bar + w * (self.target - accept_prob)
+        self.log_step = self.mu - np.sqrt(self.m) / self.gamma * self.h_bar
+        eta = self.m**(-self.kappa)
+        self.log_step_bar = eta * self.log_step + (1.0 - eta) * self.log_step_bar
+        return self.step_size
+
+
+def accept_probability(delta_H):
+    """min(1, e^{-ΔH}), robust gegen NaN/Überlauf."""
+    if not np.isfinite(delta_H):
+        return 0.0
+    return float(np.exp(min(0.0, -delta_H)))
+
+
+class HMCTuner:
+    """
+    Gemeinsames Tuning von Schrittweite und Trajektorienlänge.
+
+    step_size, n_steps:  Startwerte (definieren die Start-Trajektorienlänge)
+    target_acceptance:   Ziel von ⟨min(1, e^{-ΔH})⟩
+    length_factors:      Kandidaten τ = Faktor · τ_0 für die Längenwahl
+    length_window:       Trajektorien pro Auswertung der Kandidaten
+    jitter:              relative Streuung von n_steps pro Trajektorie
+    """
+
+    def __init__(self, step_size=0.02, n_steps=10, target_acceptance=0.8,
+                 length_factors=(0.5, 1.0, 1.5, 2.0), length_window=100, jitter=0.2,
+                 seed=None):
+        self.dual = DualAveragingStepSize(step_size, target=target_acceptance)
+        self.base_length = step_size * n_steps
+        self.length_factors = np.asarray(length_factors, dtype=float)
+        self.length_window = length_window
+        self.trajectory_length = self.base_length
+        self.jitter = jitter
+        self.rng = np.random.default_rng(seed)
+        self.frozen = False
+        self.step_size = step_size
+        self._esjd = np.zeros(len(self.length_factors))
+        self._cost = np.zeros(len(self.length_factors))
+        self._candidate = 0
+        self._last_efficiency = self.efficiency()
+        self._n_steps = n_steps
+        self.history = []
+
+    def _jittered_steps(self, n_mean):
+        lo = max(1, int(np.floor(n_mean * (1.0 - self.jitter))))
+        hi = max(lo, int(np.ceil(n_mean * (1.0 + self.jitter))))
+        return int(self.rng.integers(lo, hi + 1))
+
+    def next_parameters(self, tune_length=True):
+        """(step_size, n_steps) der nächsten Trajektorie."""
+        if not self.frozen:
+            self.step_size = self.dual.step_size
+            if tune_length:
+                self._candidate = int(self.rng.integers(len(self.length_factors)))
+                self.trajectory_length = self.base_length * self.length_factors[self._candidate]
+        n_mean = max(1, int(round(self.trajectory_length / self.step_size)))
+        self._n_steps = self._jittered_steps(n_mean)
+        return self.step_size, self._n_steps
+
+    def update(self, delta_H, observable_before=None, observable_after=None,
+               tune_length=True):
+        """Nach jeder Thermalisierungs-Trajektorie aufrufen."""
+        if self.frozen:
+            return
+        alpha = accept_probability(delta_H)
+        self.dual.update(alpha)
+        if tune_length and observable_before is not None:
+            jump = np.sum((np.asarray(observable_after) - np.asarray(observable_before))**2)
+            self._esjd[self._candidate] += alpha * jump
+            self._cost[self._candidate] += self._n_steps
+            if self.dual.m % self.length_window == 0:
+                self._recenter_length()
+        self.history.append((self.step_size, self._n_steps, alpha))
+
+    def _recenter_length(self):
+        eff = self.efficiency()
+        if np.any(np.isfinite(eff)):
+            self.base_length *= self.length_factors[np.nanargmax(eff)]
+        self._last_efficiency = eff
+        self._esjd[:] = 0.0
+        self._cost[:] = 0.0
+
+    def efficiency(self):
+        """ESJD pro Kraftauswertung je Längenkandidat (laufendes Fenster)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self._cost > 0, self._esjd / self._cost, np.nan)
+
+    def freeze(self):
+        """Fixiert ε̄ und die effizienteste Trajektorienlänge für die Messphase."""
+        self.step_size = self.dual.final_step_size
+        eff = self.efficiency()
+        if np.any(np.isfinite(eff)) and np.sum(self._cost) > 0:
+            self.trajectory_length = self.base_length * self.length_factors[np.nanargmax(eff)]
+        else:
+            # letztes vollständiges Fenster ist bereits in base_length enthalten
+            self.trajectory_length = self.base_length
+        self.frozen = True
+        return self.state()
+
+    def state(self):
+        """Parameter für Checkpoints (JSON-serialisierbar)."""
+        return {
+            'step_size': float(self.step_size),
+            'trajectory_length': float(self.trajectory_length),
+            'n_steps_mean': max(1, int(round(self.trajectory_length / self.step_size))),
+            'jitter': float(self.jitter),
+            'target_acceptance': float(self.dual.target),
+            'frozen': bool(self.frozen),
+            'length_efficiency': [None if not np.isfinite(e) else float(e)
+                                  for e in self._last_efficiency],
+        }
+
+    @classmethod
+    def from_state(cls, state, seed=None):
+        """Eingefrorener Tuner aus einem Checkpoint."""
+        n_steps = state['n_steps_mean']
+        tuner = cls(state['step_size'], n_steps, target_acceptance=state['target_acceptance'],
+                    jitter=state['jitter'], seed=seed)
+        tuner.trajectory_length = state['trajectory_length']
+        tuner.frozen = True
+        return tuner
+
+
+def save_checkpoint(path, lattice, trajectory, hmc_params, **extra):
+    """Felder, Trajektorienzähler, HMC-Parameter und RNG-Zustand in einer .npz-Datei."""
+    if getattr(lattice, 'rng', None) is not None:
+        extra['rng_state'] = lattice.rng.dumps()
+    np.savez(path, trajectory=trajectory, hmc_params=json.dumps(hmc_params),
+             **lattice_state(lattice), **extra)
+
+
+def load_checkpoint(path, lattice=None):
+    """
+    Liest einen Checkpoint; mit `lattice` werden U, S und die Zufallsströme
+    übernommen. Rückgabe: (trajectory, hmc_params, übrige Arrays).
+    """
+    with np.load(path) as data:
+        content = {key: data[key] for key in data.files}
+    rng_state = content.pop('rng_state', None)
+    if lattice is not None:
+        load_lattice_state(lattice, content)
+        if rng_state is not None and getattr(lattice, 'rng', None) is not None:
+            lattice.rng = RNGService.loads(str(rng_state))
+    trajectory = int(content.pop('trajectory'))
+    hmc_params = json.loads(str(content.pop('hmc_params')))
+    for key in ('U', 'S'):
+        content.pop(key, None)
+    return trajectory, hmc_params, content
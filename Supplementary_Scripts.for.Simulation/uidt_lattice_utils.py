@@ -0,0 +1,163 @@
+"""
+UIDT v3.2 Gitter-Hilfsfunktionen
+--------------------------------
+Gemeinsame, vollständig vektorisierte Bausteine für Messungen auf SU(3)-Feldern
+der Form U[x, y, z, t, μ, 3, 3]:
+
+- Verschiebungen mit periodischen Randbedingungen
+- SU(3)-Projektion (Polarzerlegung) für beliebige Batch-Formen
+- räumliches APE-Smearing mit Zwischenständen
+- Pfadprodukte beliebiger Wilson-Schleifen mit Präfix-Cache
+
+Alle Funktionen arbeiten mit NumPy- und (falls installiert) CuPy-Arrays.
+"""
+
+import numpy as np
+
+try:
+    import cupy as cp
+except ImportError:  # CPU-only Umgebung
+    cp = None
+
+HBAR_C = 0.1973  # GeV·fm
+
+
+def get_array_module(a):
+    """Liefert numpy oder cupy passend zum Array `a`."""
+    if cp is not None:
+        return cp.get_array_module(a)
+    return np
+
+
+def to_lattice_units(m_gev, a_fm):
+    """Masse in GeV → dimensionslose Gittermasse a·m."""
+    return m_gev * a_fm / HBAR_C
+
+
+def to_physical_units(m_lattice, a_fm):
+    """Dimensionslose Gittermasse a·m → Masse in GeV."""
+    return m_lattice / a_fm * HBAR_C
+
+
+def dagger(M):
+    """Hermitesch Konjugiertes über die letzten beiden Achsen."""
+    return M.conj().swapaxes(-1, -2)
+
+
+def shifted(field, offset):
+    """
+    Feld am verschobenen Ort: f(x + offset).
+    `offset` ist ein 4-Tupel (dx, dy, dz, dt); die Gitterachsen sind 0..3.
+    """
+    xp = get_array_module(field)
+    shifts = tuple(-int(o) for o in offset if o != 0)
+    axes = tuple(mu for mu, o in enumerate(offset) if o != 0)
+    if not axes:
+        return field
+    return xp.roll(field, shifts, axis=axes)
+
+
+def unit_offset(mu, n=1):
+    """Verschiebungsvektor n·μ̂."""
+    offset = [0, 0, 0, 0]
+    offset[mu] = n
+    return tuple(offset)
+
+
+def project_su3(Q):
+    """
+    Projektion beliebig vieler 3x3-Matrizen auf SU(3) via Polarzerlegung.
+    U = Q (Q†Q)^{-1/2}, anschließend det(U) = 1 durch globale Phase.
+    """
+    xp = get_array_module(Q)
+    H = dagger(Q) @ Q
+    w, V = xp.linalg.eigh(H)
+    inv_sqrt = (V * (1.0 / xp.sqrt(xp.maximum(w, 1e-300)))[..., None, :]) @ dagger(V)
+    W = Q @ inv_sqrt
+    phase = xp.exp(-1j * xp.angle(xp.linalg.det(W)) / 3.0)
+    return W * phase[..., None, None]
+
+
+def staple(U, mu, nu):
+    """
+    Summe aus oberer und unterer Staple für den Link U_μ(x) in der μν-Ebene:
+    U_ν(x) U_μ(x+ν) U_ν†(x+μ) + U_ν†(x-ν) U_μ(x-ν) U_ν(x-ν+μ)
+    """
+    U_mu = U[..., mu, :, :]
+    U_nu = U[..., nu, :, :]
+    upper = U_nu @ shifted(U_mu, unit_offset(nu)) @ dagger(shifted(U_nu, unit_offset(mu)))
+    U_nu_down = shifted(U_nu, unit_offset(nu, -1))
+    lower = (dagger(U_nu_down) @ shifted(U_mu, unit_offset(nu, -1))
+             @ shifted(U_nu_down, unit_offset(mu)))
+    return upper + lower
+
+
+def ape_smear_spatial(U, alpha=0.5, levels=(10,)):
+    """
+    Räumliches APE-Smearing (nur Links und Staples in x, y, z).
+    Gibt die Felder für alle angeforderten Smearing-Stufen aus einem
+    einzigen Durchlauf zurück, in der Reihenfolge von `levels`.
+    """
+    wanted = sorted(set(int(n) for n in levels))
+    results = {}
+    if 0 in wanted:
+        results[0] = U
+    V = U
+    for iteration in range(1, wanted[-1] + 1):
+        V_new = V.copy()
+        for mu in range(3):
+            staple_sum = sum(staple(V, mu, nu) for nu in range(3) if nu != mu)
+            Q = (1.0 - alpha) * V[..., mu, :, :] + (alpha / 4.0) * staple_sum
+            V_new[..., mu, :, :] = project_su3(Q)
+        V = V_new
+        if iteration in wanted:
+            results[iteration] = V
+    return [results[int(n)] for n in levels]
+
+
+def path_product(U, path, cache=None, max_prefix=2):
+    """
+    Produkt der Links entlang eines geschlossenen oder offenen Pfades,
+    für alle Startpunkte x gleichzeitig.
+
+    `path` ist eine Folge von Schritten ±(μ+1): +1 = +x, -3 = -z, +4 = +t.
+    Produkte von Präfixen bis zur Länge `max_prefix` werden in `cache`
+    abgelegt, sodass Schleifen mit gemeinsamem Anfang sie wiederverwenden.
+    """
+    path = tuple(int(s) for s in path)
+    W = None
+    start = 0
+    if cache is not None:
+        for n in range(min(len(path), max_prefix), 0, -1):
+            if path[:n] in cache:
+                W, start = cache[path[:n]], n
+                break
+
+    offset = [0, 0, 0, 0]
+    for step in path[:start]:
+        offset[abs(step) - 1] += 1 if step > 0 else -1
+
+    for i in range(start, len(path)):
+        step = path[i]
+        mu = abs(step) - 1
+        if step > 0:
+            link = shifted(U[..., mu, :, :], offset)
+            offset[mu] += 1
+        else:
+            offset[mu] -= 1
+            link = dagger(shifted(U[..., mu, :, :], offset))
+        W = link if W is None else W @ link
+        if cache is not None and i < max_prefix:
+            cache[path[:i + 1]] = W
+    return W
+
+
+def loop_trace_timeslices(U, path, cache=None, max_prefix=2):
+    """
+    Σ_x Tr W(x, t) einer Wilson-Schleife pro Zeitscheibe, normiert auf das
+    räumliche Volumen. Rückgabe: komplexes Array der Länge N_t.
+    """
+    xp = get_array_module(U)
+    W = path_product(U, path, cache=cache, max_prefix=max_prefix)
+    tr = xp.trace(W, axis1=-2, axis2=-1)
+    return tr.mean(axis=(0, 1, 2))
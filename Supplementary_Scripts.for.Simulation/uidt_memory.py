@@ -0,0 +1,248 @@
+"""
+UIDT v3.2 Speicher-Hochwassermarken und Budgets pro Phase
+---------------------------------------------------------
+Hängt sich an die Phasen aus uidt_profiling (trajectory, gauge_force,
+su3_expm, hamiltonian, ape_smear, measure_*, ...) und misst pro Phasenpfad:
+
+- peak_bytes:     maximale zusätzliche Allokation über dem Stand beim
+                  Eintritt (tracemalloc; NumPy meldet seine Puffer dort)
+- retained_bytes: beim Verlassen noch belegter Zuwachs (Lecks, Caches)
+- rss_peak_bytes: Zuwachs des Resident Set Size, abgetastet von einem
+                  Hintergrund-Thread alle `rss_interval` Sekunden
+
+Budgets (Bytes pro Phasenname oder vollem Pfad 'a;b') werden beim Verlassen
+geprüft; action='warn' gibt eine MemoryBudgetWarning aus, action='raise'
+wirft MemoryBudgetExceeded. Da die Temporaries proportional zum Volumen
+wachsen, lassen sich Budgets in Vielfachen von link_field_bytes angeben und
+schon auf kleinen Gittern prüfen. CuPy-Speicher auf der GPU sieht
+tracemalloc nicht; dafür wird der Pool-Stand beim Verlassen protokolliert.
+"""
+
+import json
+import os
+import threading
+import tracemalloc
+import warnings
+
+import numpy as np
+
+from uidt_lattice_utils import cp
+from uidt_profiling import PROFILER
+
+
+class MemoryBudgetWarning(UserWarning):
+    pass
+
+
+class MemoryBudgetExceeded(MemoryError):
+    pass
+
+
+def link_field_bytes(L, Nt=None, dtype=complex):
+    """Größe eines Linkfeldes U[L, L, L, Nt, 4, 3, 3] in Bytes."""
+    Nt = L if Nt is None else Nt
+    return L**3 * Nt * 4 * 9 * np.dtype(dtype).itemsize
+
+
+def _page_size():
+    try:
+        return os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+_PAGE_SIZE = _page_size()
+
+
+def current_rss():
+    """Resident Set Size des Prozesses in Bytes (Linux /proc, sonst None)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _gpu_used_bytes():
+    if cp is None:
+        return None
+    try:
+        return int(cp.get_default_memory_pool().used_bytes())
+    except Exception:  # keine GPU sichtbar
+        return None
+
+
+def format_bytes(n):
+    if n is None:
+        return '-'
+    if abs(n) < 1024:
+        return f"{int(n)} B"
+    for unit in ('KiB', 'MiB', 'GiB'):
+        n /= 1024.0
+        if abs(n) < 1024 or unit == 'GiB':
+            return f"{n:.1f} {unit}"
+
+
+class _Frame:
+    __slots__ = ('start', 'peak', 'rss_start', 'rss_peak')
+
+    def __init__(self, start, rss):
+        self.start = start
+        self.peak = start
+        self.rss_start = rss
+        self.rss_peak = rss
+
+
+class MemoryTracker:
+    """
+    Listener für den globalen Profiler (siehe uidt_profiling.Profiler.add_listener).
+
+    budgets:      dict Phasenname oder Pfad -> erlaubte peak_bytes
+    action:       'warn' oder 'raise' bei Überschreitung
+    rss_interval: Abtastintervall des RSS-Threads in Sekunden (None = nur an
+                  Phasengrenzen)
+    """
+
+    def __init__(self, budgets=None, action='warn', rss_interval=0.01):
+        if action not in ('warn', 'raise'):
+            raise ValueError(f"Unbekannte Aktion {action}")
+        self.budgets = dict(budgets or {})
+        self.action = action
+        self.rss_interval = rss_interval
+        self.stats = {}
+        self.violations = []
+        self._stack = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._started_tracing = False
+        self._was_enabled = False
+
+    def enter(self, path):
+        current, peak = tracemalloc.get_traced_memory()
+        rss = current_rss()
+        with self._lock:
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak, peak)
+            tracemalloc.reset_peak()
+            self._stack.append(_Frame(current, rss))
+
+    def exit(self, path):
+        current, peak = tracemalloc.get_traced_memory()
+        rss = current_rss()
+        with self._lock:
+            frame = self._stack.pop()
+            frame.peak = max(frame.peak, peak)
+            if rss is not None and frame.rss_peak is not None:
+                frame.rss_peak = max(frame.rss_peak, rss)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak = max(parent.peak, frame.peak)
+                if frame.rss_peak is not None and parent.rss_peak is not None:
+                    parent.rss_peak = max(parent.rss_peak, frame.rss_peak)
+        peak_bytes = frame.peak - frame.start
+        entry = self.stats.setdefault(path, {'calls': 0, 'peak_bytes': 0, 'retained_bytes': 0,
+                                             'rss_peak_bytes': None, 'gpu_used_bytes': None})
+        entry['calls'] += 1
+        entry['peak_bytes'] = max(entry['peak_bytes'], peak_bytes)
+        entry['retained_bytes'] = max(entry['retained_bytes'], current - frame.start)
+        if frame.rss_start is not None:
+            rss_growth = frame.rss_peak - frame.rss_start
+            entry['rss_peak_bytes'] = max(entry['rss_peak_bytes'] or 0, rss_growth)
+        gpu = _gpu_used_bytes()
+        if gpu is not None:
+            entry['gpu_used_bytes'] = max(entry['gpu_used_bytes'] or 0, gpu)
+        self._check_budget(path, peak_bytes)
+
+    def _budget_for(self, path):
+        key = ';'.join(path)
+        if key in self.budgets:
+            return self.budgets[key]
+        return self.budgets.get(path[-1])
+
+    def _check_budget(self, path, peak_bytes):
+        budget = self._budget_for(path)
+        if budget is None or peak_bytes <= budget:
+            return
+        message = (f"Phase {';'.join(path)}: Spitze {format_bytes(peak_bytes)} "
+                   f"über Budget {format_bytes(budget)}")
+        self.violations.append({'path': ';'.join(path), 'peak_bytes': peak_bytes,
+                                'budget': budget})
+        if self.action == 'raise':
+            raise MemoryBudgetExceeded(message)
+        warnings.warn(message, MemoryBudgetWarning, stacklevel=3)
+
+    def _sample_rss(self):
+        while not self._stop_event.wait(self.rss_interval):
+            rss = current_rss()
+            if rss is None:
+                return
+            with self._lock:
+                for frame in self._stack:
+                    if frame.rss_peak is not None:
+                        frame.rss_peak = max(frame.rss_peak, rss)
+
+    def start(self):
+        """Startet tracemalloc (falls nötig), RSS-Thread und die Profiler-Phasen."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._was_enabled = PROFILER.enabled
+        PROFILER.enable()
+        PROFILER.add_listener(self)
+        if self.rss_interval and current_rss() is not None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._sample_rss, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        PROFILER.remove_listener(self)
+        PROFILER.enabled = self._was_enabled
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def report(self):
+        """Zeilen in Baumreihenfolge mit path, depth, calls, Bytes, budget, exceeded."""
+        rows = []
+        for path in sorted(self.stats):
+            s = self.stats[path]
+            budget = self._budget_for(path)
+            rows.append(dict(s, path=';'.join(path), depth=len(path) - 1, budget=budget,
+                             exceeded=budget is not None and s['peak_bytes'] > budget))
+        return rows
+
+    def print_report(self):
+        print(f"   {'Phase':40s} {'Aufrufe':>8s} {'Spitze':>11s} {'gehalten':>11s} "
+              f"{'RSS':>11s} {'Budget':>11s}")
+        for r in self.report():
+            name = '  ' * r['depth'] + r['path'].rsplit(';', 1)[-1]
+            mark = ' ❌' if r['exceeded'] else ''
+            print(f"   {name:40s} {r['calls']:8d} {format_bytes(r['peak_bytes']):>11s} "
+                  f"{format_bytes(r['retained_bytes']):>11s} "
+                  f"{format_bytes(r['rss_peak_bytes']):>11s} "
+                  f"{format_bytes(r['budget']):>11s}{mark}")
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'report': self.report(), 'violations': self.violations,
+                       'budgets': self.budgets}, f, indent=2)
+        return path
+
+
+def memory_tracking(budgets=None, action='warn', rss_interval=0.01):
+    """Kontextmanager: with memory_tracking(budgets) as mem: ..."""
+    return MemoryTracker(budgets, action=action, rss_interval=rss_interval)
@@ -0,0 +1,212 @@
+"""
+UIDT v3.2 Live-Metriken für lange HMC-Läufe
+-------------------------------------------
+Die MD-Schleife meldet pro Trajektorie nur ein paar Zahlen (record() hängt
+an eine deque an); ein Hintergrund-Thread berechnet alle `interval`
+Sekunden daraus die Metriken und veröffentlicht sie im Prometheus-
+Textformat:
+
+- als Textdatei (atomar ersetzt, für den node_exporter Textfile-Collector)
+- optional über einen lokalen HTTP-Endpunkt http://127.0.0.1:<port>/metrics
+
+Metriken: Trajektorien/s, Akzeptanz (gesamt und im Fenster), ΔH-Mittel und
+-Streuung, ⟨e^{-ΔH}⟩, Schrittweite und n_steps, Plaquette, ⟨S⟩, τ_int von
+Plaquette und ⟨S⟩ über das Fenster sowie RSS und tracemalloc-Speicher.
+"""
+
+import collections
+import http.server
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from uidt_autocorrelation import integrated_autocorrelation_time
+from uidt_memory import current_rss
+
+METRICS = {
+    'trajectories_total': ('counter', "Anzahl abgeschlossener Trajektorien"),
+    'accepted_total': ('counter', "Anzahl akzeptierter Trajektorien"),
+    'trajectories_per_second': ('gauge', "Trajektorien pro Sekunde im Fenster"),
+    'acceptance_rate': ('gauge', "Akzeptanzrate gesamt"),
+    'acceptance_rate_window': ('gauge', "Akzeptanzrate im Fenster"),
+    'delta_h_mean': ('gauge', "Mittleres ΔH im Fenster"),
+    'delta_h_std': ('gauge', "Streuung von ΔH im Fenster"),
+    'exp_minus_delta_h_mean': ('gauge', "⟨exp(-ΔH)⟩ im Fenster (Erwartung 1)"),
+    'step_size': ('gauge', "Aktuelle MD-Schrittweite"),
+    'n_steps': ('gauge', "Aktuelle Anzahl MD-Schritte"),
+    'plaquette': ('gauge', "Letzte gemessene Plaquette"),
+    'plaquette_mean': ('gauge', "Mittlere Plaquette im Fenster"),
+    's_mean': ('gauge', "Letztes ⟨S⟩"),
+    'tau_int_plaquette': ('gauge', "τ_int der Plaquette im Fenster (Messungen)"),
+    'tau_int_s': ('gauge', "τ_int von ⟨S⟩ im Fenster (Messungen)"),
+    'rss_bytes': ('gauge', "Resident Set Size des Prozesses"),
+    'traced_bytes': ('gauge', "Von tracemalloc verfolgter Speicher (falls aktiv)"),
+    'last_update_timestamp_seconds': ('gauge', "Zeitpunkt der letzten Trajektorie"),
+}
+
+
+def format_prometheus(values, prefix='uidt_hmc', labels=None):
+    """Prometheus-Textformat; None/NaN-Werte werden ausgelassen."""
+    label_text = ''
+    if labels:
+        label_text = '{' + ','.join(f'{k}="{v}"' for k, v in sorted(labels.items())) + '}'
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        value = values.get(name)
+        if value is None or not np.isfinite(value):
+            continue
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.append(f"{prefix}_{name}{label_text} {float(value):.10g}")
+    return '\n'.join(lines) + '\n'
+
+
+def _tau_int(values, min_samples=20):
+    values = np.asarray([v for v in values if v is not None], dtype=float)
+    if len(values) < min_samples or np.ptp(values) == 0:
+        return None
+    return float(integrated_autocorrelation_time(values))
+
+
+class MetricsExporter:
+    """
+    Nicht blockierender Metrik-Export.
+
+    textfile: Pfad der .prom-Datei (None = keine Datei)
+    port:     lokaler HTTP-Port (None = kein Server, 0 = freier Port)
+    interval: Sekunden zwischen zwei Aktualisierungen
+    window:   Anzahl der letzten Trajektorien für Fenster-Statistiken
+    labels:   zusätzliche Prometheus-Labels, z.B. {'kappa': 0.5}
+    """
+
+    def __init__(self, textfile='uidt_hmc_metrics.prom', port=None, host='127.0.0.1',
+                 interval=5.0, window=500, prefix='uidt_hmc', labels=None):
+        self.textfile = textfile
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self.prefix = prefix
+        self.labels = labels or {}
+        self._events = collections.deque(maxlen=window)
+        self._n_total = 0
+        self._n_accepted = 0
+        self._text = format_prometheus({}, prefix, self.labels)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def record(self, accepted, delta_H, step_size=None, n_steps=None, plaquette=None,
+               S_mean=None):
+        """Pro Trajektorie aus der MD-Schleife; nur Anhängen, keine Auswertung."""
+        self._n_total += 1
+        self._n_accepted += bool(accepted)
+        self._events.append((time.time(), bool(accepted), float(delta_H), step_size, n_steps,
+                             None if plaquette is None else float(plaquette),
+                             None if S_mean is None else float(S_mean)))
+
+    def snapshot(self):
+        """Aktuelle Metriken als dict (wird vom Hintergrund-Thread aufgerufen)."""
+        events = list(self._events)
+        values = {
+            'trajectories_total': self._n_total,
+            'accepted_total': self._n_accepted,
+            'acceptance_rate': self._n_accepted / self._n_total if self._n_total else None,
+            'rss_bytes': current_rss(),
+            'traced_bytes': tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+        }
+        if not events:
+            return values
+        t, accepted, dH, eps, n_md, plaq, S = zip(*events)
+        dH = np.array(dH)
+        finite = dH[np.isfinite(dH)]
+        values.update({
+            'trajectories_per_second': ((len(t) - 1) / (t[-1] - t[0])
+                                        if len(t) > 1 and t[-1] > t[0] else None),
+            'acceptance_rate_window': float(np.mean(accepted)),
+            'delta_h_mean': float(finite.mean()) if finite.size else None,
+            'delta_h_std': float(finite.std()) if finite.size > 1 else None,
+            'exp_minus_delta_h_mean': float(np.mean(np.exp(-finite))) if finite.size else None,
+            'step_size': eps[-1],
+            'n_steps': n_md[-1],
+            'last_update_timestamp_seconds': t[-1],
+        })
+        plaq_values = [p for p in plaq if p is not None]
+        S_values = [s for s in S if s is not None]
+        if plaq_values:
+            values['plaquette'] = plaq_values[-1]
+            values['plaquette_mean'] = float(np.mean(plaq_values))
+            values['tau_int_plaquette'] = _tau_int(plaq_values)
+        if S_values:
+            values['s_mean'] = S_values[-1]
+            values['tau_int_s'] = _tau_int(S_values)
+        return values
+
+    def publish(self):
+        """Berechnet den Text neu und schreibt die Datei (atomar via os.replace)."""
+        self._text = format_prometheus(self.snapshot(), self.prefix, self.labels)
+        if self.textfile:
+            tmp = f"{self.textfile}.tmp"
+            with open(tmp, 'w') as f:
+                f.write(self._text)
+            os.replace(tmp, self.textfile)
+        return self._text
+
+    def _loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:  # Export darf den Lauf nie abbrechen
+                print(f"⚠️ Metrik-Export fehlgeschlagen: {e}")
+
+    def _start_server(self):
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = exporter._text.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def start(self):
+        if self.port is not None:
+            self._start_server()
+            print(f"📡 Metriken unter http://{self.host}:{self.port}/metrics")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Beendet den Thread und schreibt einen letzten Stand."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.publish()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
@@ -0,0 +1,239 @@
+"""
+UIDT v3.2 Online-Statistik für Messreihen
+-----------------------------------------
+Akkumuliert Observablen (Skalare oder Arrays beliebiger Form) während des Laufs,
+ohne die Einzelmessungen zu speichern:
+
+- Mittelwert, Varianz und optional Kovarianz nach Welford
+- Binning-Hierarchie mit Blockgrößen 1, 2, 4, ... 2^k (Fehler vs. Blockgröße, τ_int)
+- begrenzte Anzahl Jackknife-Bins, deren Breite sich bei Bedarf verdoppelt
+
+Der Speicherbedarf ist pro Observable unabhängig von N_meas. Zwischenstände
+sind jederzeit über snapshot() abrufbar.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from uidt_resampling import jackknife_error, jackknife_means
+
+
+def _to_numpy(x):
+    """Messwert als float64-NumPy-Array (CuPy-Arrays werden kopiert)."""
+    if hasattr(x, 'get'):
+        x = x.get()
+    return np.asarray(x, dtype=float)
+
+
+class _Welford:
+    """Laufender Mittelwert und Summe der Abweichungsquadrate M2."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = None
+        self.m2 = None
+
+    def push(self, x):
+        self.n += 1
+        if self.mean is None:
+            self.mean = x.copy()
+            self.m2 = np.zeros_like(x)
+            return x
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        return delta
+
+    def variance(self):
+        if self.n < 2:
+            return np.full_like(self.mean, np.nan)
+        return self.m2 / (self.n - 1)
+
+
+class OnlineAccumulator:
+    """
+    Streaming-Statistik einer Observable fester Form.
+
+    covariance:   zusätzlich volle Kovarianzmatrix der geglätteten Komponenten
+    max_levels:   Tiefe der Binning-Hierarchie (Blockgrößen bis 2^(max_levels-1))
+    max_bins:     Höchstzahl der Jackknife-Bins (gerade); bei Überlauf werden
+                  benachbarte Bins zusammengelegt und die Bin-Breite verdoppelt
+    trace_length: Anzahl der letzten Einzelwerte, die für Plots behalten werden
+    """
+
+    def __init__(self, covariance=False, max_levels=16, max_bins=64, trace_length=0):
+        if max_bins < 2 or max_bins % 2:
+            raise ValueError("max_bins muss gerade und ≥ 2 sein")
+        self.with_covariance = covariance
+        self.max_levels = max_levels
+        self.max_bins = max_bins
+        self.shape = None
+
+        self._stats = _Welford()
+        self._comoment = None
+        self._levels = [_Welford() for _ in range(max_levels)]
+        self._pending = [None] * max_levels
+
+        self.bin_width = 1
+        self._bins = []
+        self._bin_sum = None
+        self._bin_fill = 0
+
+        self.trace = deque(maxlen=trace_length) if trace_length else None
+
+    # ----------------------------------------------------------- Aktualisierung
+
+    def push(self, x):
+        """Fügt eine Messung hinzu; O(max_levels) Aufwand, kein Wachstum."""
+        x = _to_numpy(x)
+        if self.shape is None:
+            self.shape = x.shape
+        elif x.shape != self.shape:
+            raise ValueError(f"Form {x.shape} passt nicht zu {self.shape}")
+
+        delta = self._stats.push(x)
+        if self.with_covariance:
+            flat = x.ravel()
+            if self._comoment is None:
+                self._comoment = np.zeros((flat.size, flat.size))
+            else:
+                self._comoment += np.outer(delta.ravel(), flat - self._stats.mean.ravel())
+
+        value = x
+        for k in range(self.max_levels):
+            self._levels[k].push(value)
+            if self._pending[k] is None:
+                self._pending[k] = value
+                break
+            value = 0.5 * (self._pending[k] + value)
+            self._pending[k] = None
+
+        self._bin_sum = x.copy() if self._bin_fill == 0 else self._bin_sum + x
+        self._bin_fill += 1
+        if self._bin_fill == self.bin_width:
+            self._bins.append(self._bin_sum)
+            self._bin_fill = 0
+            if len(self._bins) == self.max_bins:
+                self._bins = [self._bins[i] + self._bins[i + 1]
+                              for i in range(0, self.max_bins, 2)]
+                self.bin_width *= 2
+
+        if self.trace is not None:
+            self.trace.append(x)
+
+    def extend(self, values):
+        for x in values:
+            self.push(x)
+
+    # --------------------------------------------------------------- Abfragen
+
+    @property
+    def n(self):
+        return self._stats.n
+
+    @property
+    def mean(self):
+        return self._stats.mean
+
+    @property
+    def variance(self):
+        return self._stats.variance()
+
+    @property
+    def std_error(self):
+        """Naiver Standardfehler σ/√N (ohne Autokorrelation)."""
+        return np.sqrt(self.variance / max(self.n, 1))
+
+    def covariance(self):
+        """Kovarianzmatrix der Einzelmessungen (Form: [d, d], d = Größe der Observable)."""
+        if not self.with_covariance:
+            raise RuntimeError("Akkumulator wurde ohne covariance=True angelegt")
+        if self.n < 2:
+            return np.full_like(self._comoment, np.nan)
+        return self._comoment / (self.n - 1)
+
+    def binned_errors(self, min_blocks=2):
+        """
+        Fehler des Mittelwerts für Blockgröße 2^k, k = 0, 1, ...
+        Rückgabe: (Blockgrößen, Fehler[k, ...]) nur für Stufen mit ≥ min_blocks Blöcken.
+        """
+        sizes, errors = [], []
+        for k, level in enumerate(self._levels):
+            if level.n < max(min_blocks, 2):
+                break
+            sizes.append(2**k)
+            errors.append(np.sqrt(level.variance() / level.n))
+        return np.array(sizes), np.array(errors)
+
+    def tau_int(self, min_blocks=32):
+        """
+        τ_int aus dem Binning: τ = ½ (σ_k / σ_0)² auf der gröbsten Stufe
+        mit mindestens `min_blocks` Blöcken.
+        """
+        sizes, errors = self.binned_errors(min_blocks=min_blocks)
+        if len(sizes) < 2:
+            return np.full(self.shape or (), 0.5)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau = 0.5 * (errors[-1] / errors[0])**2
+        return np.maximum(np.nan_to_num(tau, nan=0.5), 0.5)
+
+    def jackknife_bins(self):
+        """Mittelwerte der abgeschlossenen Jackknife-Bins, Form (n_bins, ...)."""
+        if not self._bins:
+            return np.empty((0,) + (self.shape or ()))
+        return np.stack(self._bins) / self.bin_width
+
+    def jackknife_samples(self):
+        """Leave-one-bin-out Mittelwerte aus den Bin-Summen."""
+        return jackknife_means(self.jackknife_bins())
+
+    def jackknife_error(self):
+        return jackknife_error(self.jackknife_samples())
+
+    def snapshot(self):
+        """Aktueller Stand als dict (Kopien, sicher zur Weitergabe)."""
+        if self.n == 0:
+            return {'n': 0}
+        tau = self.tau_int()
+        return {
+            'n': self.n,
+            'mean': self.mean.copy(),
+            'std_error': self.std_error,
+            'tau_int': tau,
+            'error': self.std_error * np.sqrt(2.0 * tau),
+            'n_bins': len(self._bins),
+            'bin_width': self.bin_width,
+        }
+
+
+class ObservableRecorder:
+    """
+    Sammlung benannter OnlineAccumulator-Objekte für einen Lauf.
+    Akkumulatoren entstehen beim ersten record(); Optionen pro Observable
+    über declare().
+    """
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self.accumulators = {}
+
+    def declare(self, name, **options):
+        self.accumulators[name] = OnlineAccumulator(**{**self.defaults, **options})
+        return self.accumulators[name]
+
+    def record(self, **values):
+        for name, value in values.items():
+            if name not in self.accumulators:
+                self.declare(name)
+            self.accumulators[name].push(value)
+
+    def __getitem__(self, name):
+        return self.accumulators[name]
+
+    def __contains__(self, name):
+        return name in self.accumulators
+
+    def snapshot(self, names=None):
+        names = self.accumulators if names is None else names
+        return {name: self.accumulators[name].snapshot() for name in names}
@@ -0,0 +1,239 @@
+"""
+UIDT v3.2 Parallel Tempering (Replica Exchange) in κ oder β
+-----------------------------------------------------------
+R Replikate laufen in eigenen Prozessen bei Werten κ_1 < ... < κ_R einer
+Leiter. Nach jeweils n_traj HMC-Trajektorien werden Nachbarn abwechselnd
+(gerade/ungerade Paare) getauscht. Da die Wirkung linear im Parameter ist,
+genügt der konjugierte Term X = ∂S/∂λ jedes Replikats:
+
+    P(Tausch i ↔ i+1) = min(1, exp[(λ_i - λ_{i+1}) (X_a - X_b)])
+
+Getauscht werden nur die Parameter, die Felder bleiben in ihren Prozessen.
+
+- adaptive Leiter während der ersten n_adapt Runden: Stützstellen werden so
+  verschoben, dass -log(Tauschrate) zwischen Nachbarn gleich wird
+  (Endpunkte fest)
+- Diagnostik: Tauschraten pro Paar, Round-Trips (unteres → oberes → unteres
+  Ende) mit mittlerer Dauer, Anteil aufwärts wandernder Replikate pro Stufe
+- Messungen werden pro Leiterstufe (nicht pro Replikat) in einem
+  ObservableRecorder gesammelt
+"""
+
+import multiprocessing as mp
+import traceback
+
+import numpy as np
+
+from uidt_online_stats import ObservableRecorder
+from uidt_reweighting import kappa_conjugate_action
+from uidt_scan_scheduler import job_seeds
+
+
+def set_parameter(lattice, name, value):
+    """Setzt κ (Attribut des Gitters) bzw. β (in lattice.cfg, von der Gauge-Kraft gelesen)."""
+    if name == 'beta':
+        lattice.cfg.beta = value
+    else:
+        setattr(lattice, name, value)
+
+
+def conjugate_action(lattice, name):
+    """
+    X = ∂S/∂λ für λ = κ (siehe kappa_conjugate_action) oder λ = β
+    (Wilson-Wirkung ∝ β, also X = S_W / β).
+    """
+    if name == 'kappa':
+        return kappa_conjugate_action(lattice)
+    if name == 'beta':
+        return float(lattice.wilson_action()) / lattice.cfg.beta
+    raise ValueError(f"Kein konjugierter Wirkungsterm für Parameter {name}")
+
+
+def default_measure(lattice):
+    return {'S_vev': float(np.mean(lattice.S))}
+
+
+def _replica_worker(conn, make_lattice, config, seed, name, measure):
+    """Prozess eines Replikats: hält sein Gitter und bearbeitet Befehle aus der Pipe."""
+    try:
+        np.random.seed(seed)
+        if hasattr(config, 'seed'):
+            # eigener Seed pro Replikat, sonst teilen sich alle dieselben RNG-Ströme
+            config.seed = seed
+        lattice = make_lattice(config)
+        while True:
+            command, arg = conn.recv()
+            if command == 'stop':
+                break
+            value, n_traj = arg
+            set_parameter(lattice, name, value)
+            accepted = sum(bool(lattice.hmc_trajectory_omelyan()[0]) for _ in range(n_traj))
+            conn.send((conjugate_action(lattice, name), measure(lattice), accepted / n_traj))
+    except Exception:
+        conn.send(RuntimeError(traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def adapt_ladder(values, swap_rates, damping=0.5, min_rate=0.02):
+    """
+    Neue Leiter mit gleichem -log(Tauschrate) pro Intervall: die kumulierte
+    "Distanz" Σ -log A_i wird gleichmäßig auf die Stützstellen verteilt,
+    gedämpft mit `damping`. Endpunkte bleiben fest, Monotonie bleibt erhalten.
+    """
+    values = np.asarray(values, dtype=float)
+    distance = -np.log(np.clip(swap_rates, min_rate, 0.999))
+    F = np.concatenate([[0.0], np.cumsum(distance)])
+    F /= F[-1]
+    target = np.interp(np.linspace(0.0, 1.0, len(values)), F, values)
+    return (1.0 - damping) * values + damping * target
+
+
+class ParallelTempering:
+    """
+    Replica-Exchange-Treiber.
+
+    make_lattice: picklebare Funktion/Klasse config -> Gitter
+    values:       Startleiter des Parameters (wird sortiert)
+    parameter:    'kappa' oder 'beta'
+    n_traj:       HMC-Trajektorien pro Replikat zwischen Tauschversuchen
+    measure:      picklebare Funktion lattice -> dict skalarer/Array-Messwerte
+    """
+
+    def __init__(self, make_lattice, config, values, parameter='kappa', n_traj=5,
+                 measure=None, seed=0):
+        self.make_lattice = make_lattice
+        self.config = config
+        self.ladder = np.sort(np.asarray(values, dtype=float))
+        self.parameter = parameter
+        self.n_traj = n_traj
+        self.measure = measure or default_measure
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def _start(self):
+        ctx = mp.get_context()
+        seeds = job_seeds(self.seed, len(self.ladder))
+        self._conns, self._procs = [], []
+        for r in range(len(self.ladder)):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_replica_worker,
+                               args=(child, self.make_lattice, self.config, seeds[r],
+                                     self.parameter, self.measure), daemon=True)
+            proc.start()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def _stop(self):
+        for conn in self._conns:
+            try:
+                conn.send(('stop', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=10)
+
+    def _reset_statistics(self):
+        K = len(self.ladder)
+        self.swap_attempts = np.zeros(K - 1, dtype=int)
+        self.swap_accepted = np.zeros(K - 1, dtype=int)
+        self.hmc_acceptance = np.zeros(K)
+        self.visits = np.zeros(K, dtype=int)
+        self.up_visits = np.zeros(K, dtype=int)
+        self.round_trip_times = []
+        self.stats = [ObservableRecorder() for _ in range(K)]
+
+    def _sweep(self, positions):
+        """Alle Replikate n_traj Trajektorien bei ihrem aktuellen Leiterwert."""
+        for r, conn in enumerate(self._conns):
+            conn.send(('run', (self.ladder[positions[r]], self.n_traj)))
+        replies = [conn.recv() for conn in self._conns]
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return replies
+
+    def _attempt_swaps(self, replica_at, X, offset):
+        for k in range(offset, len(self.ladder) - 1, 2):
+            a, b = replica_at[k], replica_at[k + 1]
+            log_p = (self.ladder[k] - self.ladder[k + 1]) * (X[a] - X[b])
+            self.swap_attempts[k] += 1
+            if np.log(self.rng.random()) < log_p:
+                self.swap_accepted[k] += 1
+                replica_at[k], replica_at[k + 1] = b, a
+
+    def run(self, n_rounds, n_adapt=0, adapt_every=20, verbose=True):
+        """
+        n_adapt Runden Leiteranpassung (ohne Messungen), danach n_rounds
+        Messrunden mit fester Leiter. Rückgabe: dict mit ladder, swap_acceptance,
+        hmc_acceptance, round_trips, round_trip_time, up_fraction, stats
+        (ObservableRecorder pro Stufe) und ladder_history.
+        """
+        K = len(self.ladder)
+        replica_at = list(range(K))
+        direction = [None] * K
+        trip_start = [0] * K
+        ladder_history = [self.ladder.copy()]
+
+        self._start()
+        try:
+            self._reset_statistics()
+            for it in range(n_adapt + n_rounds):
+                if it == n_adapt:
+                    # Messphase: Tauschstatistik der letzten (evtl. unvollständigen)
+                    # Anpassungsperiode und angefangene Round-Trips der alten
+                    # Leiter verwerfen
+                    self._reset_statistics()
+                    direction = [None] * K
+                    trip_start = [it] * K
+                positions = np.argsort(replica_at)
+                replies = self._sweep(positions)
+                X = [reply[0] for reply in replies]
+
+                if it >= n_adapt:
+                    for k, r in enumerate(replica_at):
+                        self.stats[k].record(**replies[r][1])
+                        self.hmc_acceptance[k] += replies[r][2]
+                        self.visits[k] += 1
+                        self.up_visits[k] += direction[r] == 'up'
+
+                self._attempt_swaps(replica_at, X, offset=it % 2)
+
+                # Round-Trips: Markierung am unteren Ende 'up', am oberen 'down'
+                bottom, top = replica_at[0], replica_at[-1]
+                if direction[bottom] == 'down' and it >= n_adapt:
+                    self.round_trip_times.append(it - trip_start[bottom])
+                if direction[bottom] != 'up':
+                    direction[bottom], trip_start[bottom] = 'up', it
+                if direction[top] == 'up':
+                    direction[top] = 'down'
+
+                if it < n_adapt and (it + 1) % adapt_every == 0:
+                    rates = self.swap_accepted / np.maximum(self.swap_attempts, 1)
+                    self.ladder = adapt_ladder(self.ladder, rates)
+                    ladder_history.append(self.ladder.copy())
+                    if verbose:
+                        print(f"   Leiter [{it + 1}]: " + " ".join(f"{v:.3f}" for v in self.ladder))
+                    self._reset_statistics()
+        finally:
+            self._stop()
+
+        swap_rates = self.swap_accepted / np.maximum(self.swap_attempts, 1)
+        visits = np.maximum(self.visits, 1)
+        result = {
+            'parameter': self.parameter,
+            'ladder': self.ladder.copy(),
+            'swap_acceptance': swap_rates,
+            'hmc_acceptance': self.hmc_acceptance / visits,
+            'round_trips': len(self.round_trip_times),
+            'round_trip_time': (float(np.mean(self.round_trip_times)) * self.n_traj
+                                if self.round_trip_times else np.inf),
+            'up_fraction': self.up_visits / visits,
+            'stats': self.stats,
+            'ladder_history': np.array(ladder_history),
+        }
+        if verbose:
+            print("   Tauschraten: " + " ".join(f"{a:.2f}" for a in swap_rates))
+            print(f"   Round-Trips: {result['round_trips']}, "
+                  f"mittlere Dauer {result['round_trip_time']:.0f} Trajektorien")
+        return result
@@ -0,0 +1,203 @@
+"""
+UIDT v3.2 Profiling-Hooks für HMC-Trajektorien und Messungen
+------------------------------------------------------------
+Zeitmesser (Kontextmanager/Dekorator) und Zähler, die in Integrator,
+Kräften, Exponential, Hamiltonian, Smearing und Messungen stecken:
+
+    with profiling() as prof:
+        lat.omelyan_integrator_2nd_order()
+    prof.print_report()
+    prof.write_folded('hmc.folded')   # flamegraph.pl / speedscope
+
+- Phasen sind verschachtelt; gemessen wird die inklusive Zeit pro Pfad
+  (z.B. trajectory;md_step;update_U;su3_expm), die Eigenzeit ergibt sich
+  als inklusive Zeit minus Summe der Kinder
+- ausgeschaltet (Standard) gibt phase() einen geteilten nullcontext zurück
+  und @profiled ruft die Funktion nach einer Attributabfrage direkt auf
+- synchronize=True synchronisiert CuPy an jeder Phasengrenze, sonst landen
+  asynchrone GPU-Kernel in der Phase, die zuerst auf das Ergebnis wartet
+"""
+
+import contextlib
+import functools
+import time
+
+from uidt_lattice_utils import cp
+
+_NULL_PHASE = contextlib.nullcontext()
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        prof = self.profiler
+        prof._sync()
+        prof._stack.append(self.name)
+        prof._enter(tuple(prof._stack))
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        prof = self.profiler
+        prof._sync()
+        elapsed = time.perf_counter() - self.start
+        path = tuple(prof._stack)
+        prof._stack.pop()
+        entry = prof.timings.setdefault(path, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        prof._exit(path)
+        return False
+
+
+class Profiler:
+    """
+    Sammelt Zeiten pro Phasenpfad und Zähler.
+
+    timings:  dict Pfad (Tupel von Namen) -> [Aufrufe, inklusive Sekunden]
+    counters: dict Name -> Summe
+    """
+
+    def __init__(self, enabled=False, synchronize=False):
+        self.enabled = enabled
+        self.synchronize = synchronize
+        self.timings = {}
+        self.counters = {}
+        self._stack = []
+        self._listeners = []
+
+    def enable(self, synchronize=None):
+        if synchronize is not None:
+            self.synchronize = synchronize
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+        return self
+
+    def reset(self):
+        self.timings.clear()
+        self.counters.clear()
+        self._stack.clear()
+
+    def add_listener(self, listener):
+        """Objekt mit enter(path)/exit(path), z.B. für Speichermessung pro Phase."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _enter(self, path):
+        for listener in self._listeners:
+            listener.enter(path)
+
+    def _exit(self, path):
+        for listener in self._listeners:
+            listener.exit(path)
+
+    def _sync(self):
+        if self.synchronize and cp is not None:
+            cp.cuda.Stream.null.synchronize()
+
+    def phase(self, name):
+        """Kontextmanager für eine benannte Phase (nullcontext, wenn aus)."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        """
+        Zeilen in Baumreihenfolge: path, depth, calls, total_s, self_s,
+        mean_s und fraction (Anteil an der Summe der Wurzelphasen).
+        """
+        child_time = {}
+        for path, (_, total) in self.timings.items():
+            if len(path) > 1:
+                child_time[path[:-1]] = child_time.get(path[:-1], 0.0) + total
+        root_total = sum(total for path, (_, total) in self.timings.items() if len(path) == 1)
+        rows = []
+        for path in sorted(self.timings):
+            calls, total = self.timings[path]
+            rows.append({
+                'path': ';'.join(path),
+                'depth': len(path) - 1,
+                'calls': calls,
+                'total_s': total,
+                'self_s': max(total - child_time.get(path, 0.0), 0.0),
+                'mean_s': total / calls,
+                'fraction': total / root_total if root_total > 0 else 0.0,
+            })
+        return rows
+
+    def print_report(self):
+        print(f"   {'Phase':40s} {'Aufrufe':>8s} {'gesamt [ms]':>12s} {'eigen [ms]':>11s} "
+              f"{'Mittel [ms]':>11s} {'Anteil':>7s}")
+        for r in self.report():
+            name = '  ' * r['depth'] + r['path'].rsplit(';', 1)[-1]
+            print(f"   {name:40s} {r['calls']:8d} {r['total_s'] * 1e3:12.2f} "
+                  f"{r['self_s'] * 1e3:11.2f} {r['mean_s'] * 1e3:11.3f} {r['fraction']:7.1%}")
+        for name, value in sorted(self.counters.items()):
+            print(f"   # {name}: {value}")
+
+    def folded(self):
+        """Gefaltete Stacks 'a;b;c <Eigenzeit in µs>' für Flamegraph-Werkzeuge."""
+        return [f"{r['path']} {int(round(r['self_s'] * 1e6))}" for r in self.report()
+                if r['self_s'] > 0]
+
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.folded()) + '\n')
+        return path
+
+
+PROFILER = Profiler()
+
+
+def phase(name):
+    """Phase im globalen Profiler."""
+    if not PROFILER.enabled:
+        return _NULL_PHASE
+    return _Phase(PROFILER, name)
+
+
+def count(name, n=1):
+    if PROFILER.enabled:
+        PROFILER.counters[name] = PROFILER.counters.get(name, 0) + n
+
+
+def profiled(name=None):
+    """Dekorator: jeder Aufruf ist eine Phase `name` (Standard: Funktionsname)."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with _Phase(PROFILER, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def profiling(reset=True, synchronize=False):
+    """Schaltet den globalen Profiler für einen Block ein und liefert ihn."""
+    if reset:
+        PROFILER.reset()
+    was_enabled = PROFILER.enabled
+    PROFILER.enable(synchronize=synchronize)
+    try:
+        yield PROFILER
+    finally:
+        PROFILER.enabled = was_enabled
@@ -0,0 +1,151 @@
+"""
+UIDT v3.2 Zähler-basierte Zufallsströme
+---------------------------------------
+Ein RNGService verteilt unabhängige Philox-Ströme, adressiert über
+
+    (seed, chain, purpose, slab)  →  SeedSequence(seed, spawn_key=(chain, purpose, slab))
+
+statt eines globalen np.random-Zustands. Jeder Strom hängt nur von seiner
+Adresse ab, nicht von der Reihenfolge der Anforderung; Ketten, Threads und
+Gebietszerlegungen erzeugen daher dieselben Zahlen.
+
+- purpose: Verwendungszweck ('momenta', 'scalar_momenta', 'metropolis', ...)
+- slab:    Zeitscheibe t; Felder werden scheibenweise gezogen, sodass eine
+           Zerlegung in t-Slabs bitgleiche Felder liefert (su3_momenta,
+           normal mit t_range)
+- su(3)-Impulse im Gell-Mann-Basis: P = Σ_a ω_a λ_a/√2, ω_a ~ N(0, 1), also
+  ½ tr P² = ½ Σ_a ω_a² passend zur kinetischen Energie in _compute_hamiltonian
+- state()/from_state() sind JSON-serialisierbar (Philox-Zähler und -Schlüssel)
+"""
+
+import json
+import zlib
+
+import numpy as np
+
+T_AXIS = 3
+
+
+def _gell_mann():
+    lam = np.zeros((8, 3, 3), dtype=complex)
+    lam[0, 0, 1] = lam[0, 1, 0] = 1
+    lam[1, 0, 1], lam[1, 1, 0] = -1j, 1j
+    lam[2, 0, 0], lam[2, 1, 1] = 1, -1
+    lam[3, 0, 2] = lam[3, 2, 0] = 1
+    lam[4, 0, 2], lam[4, 2, 0] = -1j, 1j
+    lam[5, 1, 2] = lam[5, 2, 1] = 1
+    lam[6, 1, 2], lam[6, 2, 1] = -1j, 1j
+    lam[7] = np.diag([1, 1, -2]) / np.sqrt(3)
+    return lam
+
+
+GELL_MANN = _gell_mann()
+# Basis T_a = λ_a/√2 mit tr(T_a T_b) = δ_ab
+SU3_BASIS = GELL_MANN / np.sqrt(2.0)
+
+
+def purpose_key(purpose):
+    """Stabile 32-bit Zahl für einen Zweck-Namen (unabhängig von PYTHONHASHSEED)."""
+    return zlib.crc32(purpose.encode()) & 0xFFFFFFFF
+
+
+def su3_from_coefficients(omega):
+    """P = Σ_a ω_a T_a für ω der Form (..., 8)."""
+    return np.tensordot(omega, SU3_BASIS, axes=([-1], [0]))
+
+
+class RNGService:
+    """
+    Zufallsströme einer Kette.
+
+    seed:  Wurzel (z.B. cfg.seed); gleiche Seeds → identische Läufe
+    chain: Index der Markov-Kette (Replikate, parallele Ketten)
+    """
+
+    def __init__(self, seed, chain=0):
+        self.seed = int(seed)
+        self.chain = int(chain)
+        self._streams = {}
+
+    def stream(self, purpose, slab=0):
+        """np.random.Generator (Philox) für (purpose, slab), einmal angelegt und gecacht."""
+        key = (purpose, int(slab))
+        gen = self._streams.get(key)
+        if gen is None:
+            seq = np.random.SeedSequence(self.seed,
+                                         spawn_key=(self.chain, purpose_key(purpose), int(slab)))
+            gen = np.random.Generator(np.random.Philox(seq))
+            self._streams[key] = gen
+        return gen
+
+    def uniform(self, purpose='metropolis'):
+        """Eine gleichverteilte Zahl aus [0, 1), z.B. für den Metropolis-Test."""
+        return float(self.stream(purpose).random())
+
+    def normal(self, shape, purpose, t_range=None):
+        """
+        Standardnormal-Feld der Form `shape` mit t auf Achse 3, pro Zeitscheibe
+        aus dem Strom (purpose, t). t_range=(t0, t1) zieht nur diese Scheiben.
+        """
+        return self._by_timeslice(shape, purpose, t_range,
+                                  lambda gen, s: gen.standard_normal(s))
+
+    def su3_momenta(self, shape, purpose='momenta', t_range=None):
+        """
+        Hermitesche, spurfreie Impulse P[..., 3, 3] für Felder der Form `shape`
+        (z.B. (Nx, Ny, Nz, Nt, 4)); 8 Koeffizienten pro Link in einem Zug.
+        """
+        omega = self._by_timeslice(tuple(shape) + (8,), purpose, t_range,
+                                   lambda gen, s: gen.standard_normal(s))
+        return su3_from_coefficients(omega)
+
+    def _by_timeslice(self, shape, purpose, t_range, draw):
+        shape = tuple(shape)
+        t0, t1 = t_range if t_range is not None else (0, shape[T_AXIS])
+        slice_shape = shape[:T_AXIS] + shape[T_AXIS + 1:]
+        slices = [draw(self.stream(purpose, t), slice_shape) for t in range(t0, t1)]
+        return np.stack(slices, axis=T_AXIS)
+
+    def state(self):
+        """JSON-serialisierbarer Zustand aller angelegten Ströme."""
+        streams = {}
+        for (purpose, slab), gen in self._streams.items():
+            bg = gen.bit_generator.state
+            streams[f"{purpose}:{slab}"] = {
+                'counter': [int(c) for c in bg['state']['counter']],
+                'key': [int(k) for k in bg['state']['key']],
+                'buffer': [int(b) for b in bg['buffer']],
+                'buffer_pos': int(bg['buffer_pos']),
+                'has_uint32': int(bg['has_uint32']),
+                'uinteger': int(bg['uinteger']),
+            }
+        return {'seed': self.seed, 'chain': self.chain, 'streams': streams}
+
+    def set_state(self, state):
+        self.seed = int(state['seed'])
+        self.chain = int(state['chain'])
+        self._streams = {}
+        for name, s in state['streams'].items():
+            purpose, slab = name.rsplit(':', 1)
+            gen = self.stream(purpose, int(slab))
+            gen.bit_generator.state = {
+                'bit_generator': 'Philox',
+                'state': {'counter': np.array(s['counter'], dtype=np.uint64),
+                          'key': np.array(s['key'], dtype=np.uint64)},
+                'buffer': np.array(s['buffer'], dtype=np.uint64),
+                'buffer_pos': s['buffer_pos'],
+                'has_uint32': s['has_uint32'],
+                'uinteger': s['uinteger'],
+            }
+        return self
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state['seed'], state['chain']).set_state(state)
+
+    def dumps(self):
+        return json.dumps(self.state())
+
+    @classmethod
+    def loads(cls, text):
+        return cls.from_state(json.loads(text))
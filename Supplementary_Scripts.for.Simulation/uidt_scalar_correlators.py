@@ -0,0 +1,126 @@
+"""
+UIDT v3.2 FFT-Korrelatoren für das Skalarfeld S
+-----------------------------------------------
+Alle Abstände auf einmal in O(V log V) statt einer roll-Schleife pro Abstand:
+
+- Zeitscheiben-Korrelator bei Impuls Null (alle Δt)
+- voller 4D-Korrelator C(Δx, Δy, Δz, Δt) (alle räumlichen Verschiebungen)
+- Korrelatoren projiziert auf die niedrigsten Gitterimpulse p = 2π n / L
+
+Dazu Effektivenergien und die Gitter-Dispersionsrelation eines freien
+Skalarfeldes für Konsistenzprüfungen E(p) vs. m.
+"""
+
+import itertools
+
+import numpy as np
+
+from uidt_lattice_utils import get_array_module
+
+
+def timeslice_correlator_fft(S, connected=True):
+    """
+    C(Δt) = ⟨S̄(t) S̄(t+Δt)⟩_t mit S̄(t) = räumlicher Mittelwert, alle Δt.
+    Identisch zur roll-Schleife in UIDTScalarAnalysis, aber via FFT.
+    """
+    xp = get_array_module(S)
+    S_t = S.mean(axis=(0, 1, 2))
+    if connected:
+        S_t = S_t - S_t.mean()
+    n_t = S_t.shape[0]
+    S_hat = xp.fft.rfft(S_t)
+    return xp.fft.irfft(xp.abs(S_hat)**2, n=n_t) / n_t
+
+
+def full_correlator_fft(S, connected=True):
+    """
+    C(Δ) = ⟨S(x) S(x+Δ)⟩_x für alle 4D-Verschiebungen Δ, Form wie S.
+    C[r, 0, 0, 0] ist der räumliche Korrelator in x-Richtung.
+    """
+    xp = get_array_module(S)
+    S_c = S - S.mean() if connected else S
+    S_hat = xp.fft.rfftn(S_c)
+    return xp.fft.irfftn(xp.abs(S_hat)**2, s=S.shape) / S.size
+
+
+def lattice_momenta(L, n_max_sq=3):
+    """
+    Alle ganzzahligen Impulsvektoren n mit |n|² ≤ n_max_sq, gruppiert nach |n|².
+    Rückgabe: {n²: Liste von n-Vektoren}, nur nicht-leere Schalen.
+    """
+    n_max = int(np.floor(np.sqrt(n_max_sq)))
+    shells = {}
+    for n in itertools.product(range(-n_max, n_max + 1), repeat=3):
+        n_sq = sum(c * c for c in n)
+        if n_sq <= n_max_sq and all(abs(c) <= L // 2 for c in n):
+            shells.setdefault(n_sq, []).append(n)
+    return dict(sorted(shells.items()))
+
+
+def lattice_p_hat_sq(n, L):
+    """p̂² = Σ_i 4 sin²(π n_i / L) für ganzzahliges n."""
+    return float(sum(4.0 * np.sin(np.pi * c / L)**2 for c in n))
+
+
+def momentum_projected_correlators(S, n_max_sq=3):
+    """
+    C(p, Δt) = ⟨Re[φ(p, t+Δt) φ(p, t)*]⟩_t mit φ(p, t) = 1/V_s Σ_x e^{-ip·x} S(x, t).
+
+    Gemittelt über alle äquivalenten Impulse einer Schale |n|². Bei p = 0 wird
+    der Vakuumerwartungswert abgezogen, sodass C(0, Δt) dem Zeitscheiben-
+    Korrelator entspricht. Rückgabe: (C[n_shell, Δt], n²-Werte, p̂²-Werte).
+    """
+    xp = get_array_module(S)
+    Nx, Ny, Nz, n_t = S.shape
+    L = min(Nx, Ny, Nz)
+    S_c = S - S.mean()
+    phi = xp.fft.fftn(S_c, axes=(0, 1, 2)) / (Nx * Ny * Nz)
+
+    shells = lattice_momenta(L, n_max_sq)
+    C = xp.zeros((len(shells), n_t))
+    n_sq_values, p_hat_sq = [], []
+    for k, (n_sq, vectors) in enumerate(shells.items()):
+        idx = tuple(xp.asarray([v[i] % dim for v in vectors])
+                    for i, dim in enumerate((Nx, Ny, Nz)))
+        phi_p = phi[idx]                                  # (n_vectors, N_t)
+        phi_hat = xp.fft.fft(phi_p, axis=-1)
+        C[k] = xp.real(xp.fft.ifft(xp.abs(phi_hat)**2, axis=-1)).mean(axis=0) / n_t
+        n_sq_values.append(n_sq)
+        p_hat_sq.append(lattice_p_hat_sq(vectors[0], L))
+    return C, np.array(n_sq_values), np.array(p_hat_sq)
+
+
+def effective_energy(C, periodic=True):
+    """
+    Effektive Energie pro Zeitabstand. Bei periodischem N_t über die
+    cosh-Gleichung C(t-1) + C(t+1) = 2 cosh(E) C(t), sonst ln[C(t)/C(t+1)].
+    """
+    C = np.asarray(C, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if periodic:
+            ratio = (C[..., :-2] + C[..., 2:]) / (2.0 * C[..., 1:-1])
+            E = np.arccosh(np.where(ratio >= 1.0, ratio, np.nan))
+            return np.concatenate([np.full(C.shape[:-1] + (1,), np.nan), E], axis=-1)
+        return np.log(C[..., :-1] / C[..., 1:])
+
+
+def lattice_dispersion(m, p_hat_sq):
+    """Freie Gitter-Dispersion: sinh²(E/2) = sinh²(m/2) + p̂²/4."""
+    return 2.0 * np.arcsinh(np.sqrt(np.sinh(m / 2.0)**2 + np.asarray(p_hat_sq) / 4.0))
+
+
+def dispersion_check(C_p, p_hat_sq, t_min=1, t_max=None):
+    """
+    Vergleicht gemessene Energien E(p) mit der Gitter-Dispersion aus E(0).
+    Rückgabe: dict mit E_measured, E_predicted und Abweichung pro Schale.
+    """
+    E_eff = effective_energy(C_p)
+    t_max = E_eff.shape[-1] // 2 if t_max is None else t_max
+    E = np.nanmean(E_eff[..., t_min:t_max], axis=-1)
+    E_pred = lattice_dispersion(E[0], p_hat_sq)
+    return {
+        'E_measured': E,
+        'E_predicted': E_pred,
+        'deviation': E - E_pred,
+        'p_hat_sq': np.asarray(p_hat_sq),
+    }
@@ -0,0 +1,273 @@
+"""
+UIDT v3.2 Parameter-Scan-Scheduler
+----------------------------------
+Führt unabhängige Simulationen eines Parametergitters (κ, β, ...) parallel
+in einem lokalen Prozesspool aus:
+
+- jede Konfiguration ist eine tiefe Kopie der Basis-Konfiguration mit den
+  gesetzten Gitterwerten und einem eigenen Seed aus einer SeedSequence
+- fertige Jobs werden sofort als JSON-Zeile in <name>.partial.jsonl
+  geschrieben; ein erneuter Start überspringt bereits erfolgreiche Jobs,
+  sofern Parameter und Seed übereinstimmen (job_key), abweichende
+  Einträge (geändertes Gitter oder root_seed) werden neu gerechnet
+- Fehler werden mit Traceback protokolliert statt still zu NaN zu werden
+- am Ende entsteht eine CSV-Tabelle im Stil von kappa_scan_results.csv
+
+Warmstart (siehe uidt_thermalization): run(..., initial_state=...) verzweigt
+alle Jobs von einem gemeinsamen thermalisierten Feld, run_chain() reicht das
+Endfeld jedes Jobs an den nächsten weiter.
+
+Ergebnis-Schlüssel mit führendem Unterstrich (dicts von Arrays, z.B. '_state'
+für das Endfeld oder '_samples' für Messreihen) werden als
+<name>.<schlüssel>_<job>.npz gespeichert und nicht in die JSON-Zeile übernommen.
+
+Die Job-Funktion job_fn(config, seed, initial_state=None) -> dict muss
+picklebar sein (auf Modulebene definiert).
+"""
+
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import numpy as np
+
+
+def config_variants(base_config, variants):
+    """
+    Tiefe Kopien der Basis-Konfiguration, je eine pro dict in `variants`
+    (Attributname -> Wert). Rückgabe: Liste von (params, config).
+    """
+    jobs = []
+    for params in variants:
+        params = {key: (value.item() if isinstance(value, np.generic) else value)
+                  for key, value in params.items()}
+        config = copy.deepcopy(base_config)
+        for key, value in params.items():
+            setattr(config, key, value)
+        jobs.append((params, config))
+    return jobs
+
+
+def config_grid(base_config, **axes):
+    """Kartesisches Produkt der Parameterachsen, z.B. config_grid(cfg, kappa=[...])."""
+    names = list(axes)
+    combos = itertools.product(*(axes[name] for name in names))
+    return config_variants(base_config, [dict(zip(names, combo)) for combo in combos])
+
+
+def job_seeds(root_seed, n_jobs):
+    """Unabhängige 32-bit Seeds pro Job aus einer gemeinsamen Wurzel."""
+    children = np.random.SeedSequence(root_seed).spawn(n_jobs)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"nicht serialisierbar: {type(value)}")
+
+
+def job_key(params, seed):
+    """Kennung eines Jobs aus Parametern und Seed (Hash der JSON-Darstellung)."""
+    text = json.dumps({'params': params, 'seed': int(seed)}, sort_keys=True, default=_to_json)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _run_job(job_fn, index, params, config, seed):
+    """
+    Worker: führt einen Job aus und fängt jede Ausnahme samt Traceback ab.
+    Der Job-Seed ersetzt config.seed (Wurzel der RNGService-Ströme der
+    Gitter) und initialisiert den globalen NumPy-RNG für übrigen Code
+    (geforkte Worker hätten sonst identische Zufallsfolgen).
+    """
+    if hasattr(config, 'seed'):
+        config.seed = seed
+    np.random.seed(seed)
+    start = time.time()
+    record = {'job': index, 'key': job_key(params, seed), 'params': params, 'seed': seed}
+    try:
+        record['result'] = job_fn(config, seed)
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = f"{type(e).__name__}: {e}"
+        record['traceback'] = traceback.format_exc()
+    record['elapsed_s'] = time.time() - start
+    return record
+
+
+class ScanScheduler:
+    """
+    Parallele Ausführung eines Parametergitters mit Teilergebnissen auf der Platte.
+
+    job_fn:     Funktion (config, seed) -> dict mit skalaren Ergebnissen
+    name:       Basisname der Ausgabedateien in output_dir
+    n_workers:  Prozesse (None = os.cpu_count(), 1 = seriell im Hauptprozess)
+    root_seed:  Wurzel der Job-Seeds (reproduzierbar pro Job-Index)
+    """
+
+    def __init__(self, job_fn, name='scan', output_dir='scan_results', n_workers=None,
+                 root_seed=0):
+        self.job_fn = job_fn
+        self.name = name
+        self.output_dir = output_dir
+        self.n_workers = n_workers
+        self.root_seed = root_seed
+        os.makedirs(output_dir, exist_ok=True)
+        self.partial_path = os.path.join(output_dir, f'{name}.partial.jsonl')
+
+    def load_partial(self):
+        """Bisher geschriebene Job-Einträge (letzter Eintrag pro Job gewinnt)."""
+        records = {}
+        if os.path.exists(self.partial_path):
+            with open(self.partial_path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        records[record['job']] = record
+        return records
+
+    def array_path(self, index, key='state'):
+        return os.path.join(self.output_dir, f'{self.name}.{key}_{index}.npz')
+
+    def load_arrays(self, index, key='state'):
+        """Gespeicherte Arrays eines Jobs (z.B. Endfeld 'state') oder None."""
+        path = self.array_path(index, key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    def load_state(self, index):
+        return self.load_arrays(index, 'state')
+
+    def _write(self, record):
+        result = record.get('result') or {}
+        for key in [k for k in result if k.startswith('_')]:
+            np.savez(self.array_path(record['job'], key[1:]), **result.pop(key))
+        with open(self.partial_path, 'a') as f:
+            f.write(json.dumps(record, default=_to_json) + '\n')
+            f.flush()
+
+    def _done(self, jobs, seeds, resume):
+        """
+        Erfolgreiche Einträge, deren Parameter und Seed zum Job mit demselben
+        Index passen; alle anderen Jobs laufen (erneut).
+        """
+        if not resume:
+            return {}
+        keys = [job_key(params, seed) for (params, _), seed in zip(jobs, seeds)]
+        done, stale = {}, 0
+        for i, record in self.load_partial().items():
+            if record['status'] != 'ok' or i >= len(jobs):
+                continue
+            if job_key(record['params'], record['seed']) == keys[i]:
+                done[i] = record
+            else:
+                stale += 1
+        if stale:
+            print(f"⚠️  {stale} gespeicherte Jobs passen nicht zu Parametern/Seed "
+                  f"in {self.partial_path}, sie werden neu gerechnet")
+        return done
+
+    def run(self, jobs, resume=True, initial_state=None):
+        """
+        Führt alle Jobs unabhängig voneinander aus (Liste von (params, config),
+        z.B. aus config_grid). Mit initial_state starten alle Jobs von diesem
+        Feld (Verzweigung), die Zufallsströme bleiben pro Job unabhängig.
+        Rückgabe: Einträge in Job-Reihenfolge.
+        """
+        seeds = job_seeds(self.root_seed, len(jobs))
+        done = self._done(jobs, seeds, resume)
+        pending = [i for i in range(len(jobs)) if i not in done]
+        print(f"🗂  Scan '{self.name}': {len(jobs)} Jobs, {len(done)} bereits fertig")
+
+        job_fn = self.job_fn
+        if initial_state is not None:
+            job_fn = partial(job_fn, initial_state=initial_state)
+
+        records = dict(done)
+        if self.n_workers == 1:
+            for i in pending:
+                records[i] = self._finish(_run_job(job_fn, i, *jobs[i], seeds[i]), len(jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+                futures = [pool.submit(_run_job, job_fn, i, *jobs[i], seeds[i])
+                           for i in pending]
+                for future in as_completed(futures):
+                    record = self._finish(future.result(), len(jobs))
+                    records[record['job']] = record
+        return [records[i] for i in range(len(jobs))]
+
+    def run_chain(self, jobs, resume=True, initial_state=None):
+        """
+        Führt die Jobs nacheinander in Listenreihenfolge aus; jeder Job startet
+        vom gespeicherten Endfeld seines Vorgängers (benachbarte Parameter,
+        kurze Re-Thermalisierung). Nach einem Fehler oder fehlendem Feld
+        startet der nächste Job kalt bzw. von initial_state.
+        """
+        seeds = job_seeds(self.root_seed, len(jobs))
+        done = self._done(jobs, seeds, resume)
+        print(f"🔗 Kette '{self.name}': {len(jobs)} Jobs, {len(done)} bereits fertig")
+
+        records = dict(done)
+        state = initial_state
+        for i in range(len(jobs)):
+            if i not in done:
+                job_fn = partial(self.job_fn, initial_state=state)
+                records[i] = self._finish(_run_job(job_fn, i, *jobs[i], seeds[i]), len(jobs))
+            state = self.load_state(i) if records[i]['status'] == 'ok' else None
+            if state is None:
+                state = initial_state
+        return [records[i] for i in range(len(jobs))]
+
+    def _finish(self, record, n_jobs):
+        self._write(record)
+        status = '✓' if record['status'] == 'ok' else f"❌ {record['error']}"
+        print(f"   [{record['job'] + 1}/{n_jobs}] {record['params']} {status} "
+              f"({record['elapsed_s']:.1f} s)")
+        return record
+
+    def write_table(self, records, columns, filename=None):
+        """
+        CSV mit einer Zeile pro Job. columns: Liste von (Spaltenname, Schlüssel),
+        siehe result_rows. Rückgabe: Pfad der CSV-Datei.
+        """
+        path = os.path.join(self.output_dir, filename or f'{self.name}_results.csv')
+        rows = result_rows(records, [key for _, key in columns])
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([col for col, _ in columns])
+            for row in rows:
+                writer.writerow([row[key] for _, key in columns])
+        return path
+
+
+def result_rows(records, keys):
+    """
+    Flache dicts pro Job: Schlüssel werden zuerst in params, dann in result
+    gesucht; fehlgeschlagene Jobs liefern NaN.
+    """
+    rows = []
+    for record in records:
+        result = record.get('result') or {}
+        row = {}
+        for key in keys:
+            value = record['params'].get(key, result.get(key))
+            row[key] = np.nan if value is None else value
+        rows.append(row)
+    return rows
+
+
+def failures(records):
+    """Fehlgeschlagene Jobs (mit error und traceback)."""
+    return [r for r in records if r['status'] != 'ok']
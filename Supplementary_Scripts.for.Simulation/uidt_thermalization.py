@@ -0,0 +1,94 @@
+"""
+UIDT v3.2 Thermalisierung und Warmstart
+---------------------------------------
+Automatische Erkennung des Thermalisierungsendes und Übergabe von Feldern
+zwischen benachbarten Scan-Punkten:
+
+- MSER (Marginal Standard Error Rule): Abschneidepunkt d*, der
+  Σ_{i≥d} (x_i - x̄_d)² / (N - d)² minimiert; bei stationären Reihen liegt
+  d* nahe 0, solange die Reihe driftet, wandert d* mit
+- zusätzlich müssen beide Hälften des Rests x[d*:] im Mittel übereinstimmen
+- thermalize() führt Trajektorien aus, bis d* im ersten Viertel der Reihe
+  liegt (höchstens max_traj, z.B. config.N_therm)
+- lattice_state()/load_lattice_state() kopieren U und S (CPU-Kopie, auch
+  für CuPy-Felder), sodass thermalisierte Felder als Start für den nächsten
+  κ- oder β-Punkt dienen
+"""
+
+import numpy as np
+
+from uidt_lattice_utils import get_array_module
+
+
+def mser_cutoff(series, max_fraction=0.5):
+    """
+    MSER-Abschneidepunkt d* entlang der letzten Achse (vektorisiert über
+    führende Achsen), gesucht in d ∈ [0, max_fraction · N].
+    """
+    x = np.asarray(series, dtype=float)
+    n = x.shape[-1]
+    # Summen und Quadratsummen der Reste x[d:], d = 0..n-1
+    tail_sum = np.cumsum(x[..., ::-1], axis=-1)[..., ::-1]
+    tail_sq = np.cumsum(x[..., ::-1]**2, axis=-1)[..., ::-1]
+    m = np.arange(n, 0, -1)
+    ss = tail_sq - tail_sum**2 / m
+    d_max = max(1, int(max_fraction * n))
+    return np.argmin(ss[..., :d_max] / m[:d_max]**2, axis=-1)
+
+
+def halves_agree(series, n_sigma=2.0):
+    """
+    Stationaritätstest des Rests: Mittelwerte beider Hälften stimmen innerhalb
+    n_sigma (naiver Fehler) überein. Vektorisiert über führende Achsen.
+    """
+    x = np.asarray(series, dtype=float)
+    h = x.shape[-1] // 2
+    a, b = x[..., :h], x[..., h:2 * h]
+    err = np.sqrt((a.var(axis=-1, ddof=1) + b.var(axis=-1, ddof=1)) / h)
+    return np.abs(a.mean(axis=-1) - b.mean(axis=-1)) <= n_sigma * err
+
+
+def thermalization_observables(lattice):
+    """Beobachtete Größen während der Thermalisierung: Wilson-Wirkung und ⟨S⟩."""
+    return np.array([float(lattice.wilson_action()), float(np.mean(lattice.S))])
+
+
+def thermalize(lattice, max_traj, min_traj=50, check_every=10, observables=None):
+    """
+    Thermalisierung mit automatischem Abbruch.
+
+    Nach jeweils check_every Trajektorien (frühestens nach min_traj) wird der
+    MSER-Abschneidepunkt aller Observablen bestimmt; liegt er für alle im
+    ersten Viertel und stimmen beide Hälften des Rests überein, gilt das
+    Gitter als thermalisiert.
+    Rückgabe: dict mit n_traj, cutoff (größtes d*), thermalized, history.
+    """
+    observables = observables or thermalization_observables
+    history = [observables(lattice)]
+    cutoff = 0
+    for n_traj in range(1, max_traj + 1):
+        lattice.hmc_trajectory_omelyan()
+        history.append(observables(lattice))
+        if n_traj >= min_traj and n_traj % check_every == 0:
+            series = np.array(history).T
+            cutoff = int(np.max(mser_cutoff(series)))
+            if cutoff < series.shape[-1] // 4 and np.all(halves_agree(series[:, cutoff:])):
+                return {'n_traj': n_traj, 'cutoff': cutoff, 'thermalized': True,
+                        'history': np.array(history)}
+    return {'n_traj': max_traj, 'cutoff': cutoff, 'thermalized': False,
+            'history': np.array(history)}
+
+
+def lattice_state(lattice):
+    """CPU-Kopie der Felder (U, S) zur Übergabe an andere Prozesse / Dateien."""
+    return {name: (getattr(lattice, name).get() if hasattr(getattr(lattice, name), 'get')
+                   else np.array(getattr(lattice, name)))
+            for name in ('U', 'S')}
+
+
+def load_lattice_state(lattice, state):
+    """Übernimmt U und S aus lattice_state() (auf dem Gerät des Gitters)."""
+    for name in ('U', 'S'):
+        xp = get_array_module(getattr(lattice, name))
+        setattr(lattice, name, xp.asarray(state[name]).copy())
+    return lattice
@@ -0,0 +1,120 @@
+"""
+UIDT v3.2 Update-Scheduler
+--------------------------
+Verschränkt verschiedene Markov-Updates derselben Kette zu einem Sweep,
+z.B. eine HMC-Trajektorie gefolgt von zwei Cluster-Updates des Skalarfeldes:
+
+    sched = UpdateScheduler()
+    sched.add('hmc', lambda: lat.omelyan_integrator_2nd_order(n_steps=10, step_size=0.02))
+    sched.add('cluster', lat.cluster_update, repeat=2)
+    for _ in range(n):
+        results = sched.sweep()
+
+- every:  Update nur in jedem `every`-ten Sweep (z.B. teure Reunitarisierung)
+- repeat: Anzahl Aufrufe pro Sweep
+- jedes Update ist eine Profiling-Phase seines Namens
+- Rückgaben der Form (accepted, ...) oder dict mit 'accepted' werden als
+  Akzeptanz gezählt; dicts mit 'site_updates' gehen in den Durchsatz ein
+
+Jedes einzelne Update muss die Zielverteilung erhalten; die Verkettung
+erhält sie dann ebenfalls (feste Reihenfolge, keine Detailed Balance nötig).
+"""
+
+import time
+
+from uidt_profiling import phase
+
+
+class _Update:
+    __slots__ = ('name', 'func', 'every', 'repeat', 'calls', 'seconds', 'accepted',
+                 'decisions', 'site_updates')
+
+    def __init__(self, name, func, every, repeat):
+        self.name = name
+        self.func = func
+        self.every = every
+        self.repeat = repeat
+        self.calls = 0
+        self.seconds = 0.0
+        self.accepted = 0
+        self.decisions = 0
+        self.site_updates = 0
+
+
+class UpdateScheduler:
+    """Feste Abfolge benannter Updates; sweep() führt einen Zyklus aus."""
+
+    def __init__(self):
+        self.updates = []
+        self.n_sweeps = 0
+
+    def add(self, name, func, every=1, repeat=1):
+        """Hängt func() als Update `name` an; Rückgabe self zum Verketten."""
+        if any(u.name == name for u in self.updates):
+            raise ValueError(f"Update {name} ist bereits eingeplant")
+        if every < 1 or repeat < 0:
+            raise ValueError("every ≥ 1 und repeat ≥ 0 erforderlich")
+        self.updates.append(_Update(name, func, int(every), int(repeat)))
+        return self
+
+    def sweep(self):
+        """Ein Zyklus; Rückgabe dict Name -> letztes Ergebnis (nur ausgeführte Updates)."""
+        results = {}
+        for u in self.updates:
+            if self.n_sweeps % u.every:
+                continue
+            for _ in range(u.repeat):
+                start = time.perf_counter()
+                with phase(u.name):
+                    result = u.func()
+                u.seconds += time.perf_counter() - start
+                u.calls += 1
+                self._record(u, result)
+                results[u.name] = result
+        self.n_sweeps += 1
+        return results
+
+    @staticmethod
+    def _record(u, result):
+        if isinstance(result, dict):
+            if 'accepted' in result:
+                u.accepted += int(result['accepted'])
+                u.decisions += int(result.get('decisions', 1))
+            u.site_updates += int(result.get('site_updates', 0))
+        elif isinstance(result, tuple) and result and isinstance(result[0], bool):
+            u.accepted += result[0]
+            u.decisions += 1
+
+    def run(self, n_sweeps, callback=None):
+        """n_sweeps Zyklen; callback(i, results) nach jedem Zyklus (z.B. Messungen)."""
+        for i in range(n_sweeps):
+            results = self.sweep()
+            if callback is not None:
+                callback(i, results)
+
+    def report(self):
+        """Pro Update: calls, seconds, Anteil an der Gesamtzeit, Akzeptanz, Durchsatz."""
+        total = sum(u.seconds for u in self.updates)
+        rows = []
+        for u in self.updates:
+            rows.append({
+                'name': u.name,
+                'every': u.every,
+                'repeat': u.repeat,
+                'calls': u.calls,
+                'seconds': u.seconds,
+                'fraction': u.seconds / total if total > 0 else 0.0,
+                'acceptance': u.accepted / u.decisions if u.decisions else None,
+                'site_updates_per_s': (u.site_updates / u.seconds
+                                       if u.site_updates and u.seconds > 0 else None),
+            })
+        return rows
+
+    def print_report(self):
+        print(f"   {'Update':16s} {'Aufrufe':>8s} {'Zeit [s]':>9s} {'Anteil':>7s} "
+              f"{'Akzeptanz':>10s} {'Sites/s':>10s}")
+        for r in self.report():
+            acc = f"{r['acceptance']:.3f}" if r['acceptance'] is not None else '-'
+            rate = f"{r['site_updates_per_s']:.3g}" if r['site_updates_per_s'] else '-'
+            print(f"   {r['name']:16s} {r['calls']:8d} {r['seconds']:9.2f} {r['fraction']:7.1%} "
+                  f"{acc:>10s} {rate:>10s}")
@@ -8,27 +8,11 @@ License: CC BY 4.0
 """
 
 import numpy as np
-from scipy.optimize import fsolve
 
-def uidt_system(params, C=0.277):
-    """Coupled UIDT equations (same as verification_code.py)"""
-    m_S, kappa, lambda_S = params
-    Lambda = 1.0
-    Delta_target = 1.71
-    
-    v = kappa * C / (Lambda * m_S**2)
-    eq1 = m_S**2 * v + (lambda_S * v**3) / 6 - kappa * C / Lambda
-    
-    log_term = np.log(Lambda**2 / m_S**2) if m_S > 0 else 0
-    Pi_S = (kappa**2 * C) / (4 * Lambda**2) * \
-           (1 + log_term / (16 * np.pi**2))
-    Delta_calc = np.sqrt(m_S**2 + Pi_S)
-    eq2 = Delta_calc - Delta_target
-    
-    eq3 = 5 * kappa**2 - 3 * lambda_S
-    
-    return [eq1, eq2, eq3]
+from uidt_batch_solver import print_convergence_report, solve_canonical_batch
 
+# The canonical equations fix m_S and lambda_S = 5 kappa^2 / 3 for given kappa;
+# kappa itself is not determined by C or Delta (see uidt_batch_solver).
 
 def propagate_errors():
     """
@@ -50,20 +34,22 @@ def propagate_errors():
     delta_Delta = 0.08  # GeV
     eps_num = 0.001  # Numerical convergence
     
-    # Error from gluon condensate
+    # Error from gluon condensate (both shifted points in one batch solve at fixed kappa)
     print("\n1. Gluon Condensate Uncertainty:")
-    params_plus_C = fsolve(uidt_system, [m_S_central, kappa_central, lambda_S_central], 
-                            args=(C_central + delta_C,))
-    params_minus_C = fsolve(uidt_system, [m_S_central, kappa_central, lambda_S_central], 
-                             args=(C_central - delta_C,))
+    shifted = solve_canonical_batch(C=[C_central + delta_C, C_central - delta_C],
+                                    Delta_target=Delta_central, kappa=kappa_central,
+                                    x0=[m_S_central, kappa_central, lambda_S_central])
+    if not shifted['converged'].all():
+        print_convergence_report(shifted)
+        raise RuntimeError("canonical system not solved at C ± δC")
+    params_plus_C, params_minus_C = shifted['x']
     
     dm_S_C = abs(params_plus_C[0] - params_minus_C[0]) / 2
-    dkappa_C = abs(params_plus_C[1] - params_minus_C[1]) / 2
-    dlambda_C = abs(params_plus_C[2] - params_minus_C[2]) / 2
+    # kappa is an input and lambda_S = 5 kappa^2 / 3 does not involve C
+    dkappa_C = dlambda_C = 0.0
     
-    print(f"   δm_S(C) = ±{dm_S_C:.3f} GeV")
-    print(f"   δκ(C) = ±{dkappa_C:.3f}")
-    print(f"   δλ_S(C) = ±{dlambda_C:.3f}")
+    print(f"   δm_S(C) = ±{dm_S_C:.4f} GeV")
+    print("   κ, λ_S: not determined by C (κ input, λ_S = 5κ²/3)")
     
     # Error from lattice Delta (scaling estimate)
     print("\n2. Lattice Mass Gap Uncertainty:")
@@ -94,5 +80,28 @@ def propagate_errors():
     print(f"{'='*70}")
 
 
+def monte_carlo_errors(n_samples=100_000, C_central=0.277, delta_C=0.014,
+                       Delta_central=1.71, delta_Delta=0.08, kappa_central=0.500,
+                       delta_kappa=0.014, seed=0):
+    """
+    Monte Carlo propagation: sample (C, Delta, kappa) from Gaussians and
+    solve the canonical system for (m_S, lambda_S) for all samples in one
+    batch. kappa is an input; delta_kappa defaults to δκ(Δ) of section 2.
+    """
+    print(f"\n4. Monte Carlo over (C, Δ, κ), {n_samples} samples:")
+    rng = np.random.default_rng(seed)
+    C = rng.normal(C_central, delta_C, n_samples)
+    Delta = rng.normal(Delta_central, delta_Delta, n_samples)
+    kappa = rng.normal(kappa_central, delta_kappa, n_samples)
+    result = solve_canonical_batch(C=C, Delta_target=Delta, kappa=kappa)
+    print_convergence_report(result)
+    
+    params = result['x'][result['converged']]
+    for name, values, unit in zip(("m_S", "κ", "λ_S"), params.T, (" GeV", "", "")):
+        print(f"   {name} = {values.mean():.3f} ± {values.std(ddof=1):.3f}{unit}")
+    return result
+
+
 if __name__ == "__main__":
-    propagate_errors()
\ No newline at end of file
+    propagate_errors()
+    monte_carlo_errors()
\ No newline at end of file
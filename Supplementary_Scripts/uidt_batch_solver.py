@@ -0,0 +1,268 @@
+"""
+UIDT v3.2 Batch Newton Solver
+=============================
+Vectorized damped Newton iteration for the canonical equation system,
+solving many parameter points at once with NumPy broadcasting instead of
+one fsolve/root call per point.
+
+- residual functions take x of shape (N, n) and return (N, k)
+- Jacobians by batched forward differences (or analytic, if supplied)
+- Levenberg-Marquardt regularized steps with mu = |F|^2
+  (Yamashita-Fukushima): quadratic convergence at regular roots, well
+  defined for singular or non-square Jacobians
+- per-point backtracking line search on |F|; invalid points (NaN) are
+  rejected like any other failed step
+- per-point convergence masks, iteration counts and residuals
+- rank check of the Jacobian at the solution: roots on a solution curve
+  (rank < number of unknowns) are reported as 'rank_deficient', not as
+  converged, because their position depends on the start value
+
+The three-equation systems of the repo determine only two parameters:
+with the exact VEV the vacuum equation vanishes identically, and with
+v = kappa C / (Lambda m_S^2) its only roots have kappa = lambda_S = 0.
+solve_canonical_batch therefore takes kappa as an input and solves the
+mass-gap and RG fixed-point equations for (m_S, lambda_S).
+
+Author: Philipp Rietz
+License: CC BY 4.0
+"""
+
+import time
+
+import numpy as np
+
+C_GLUON = 0.277        # GeV^4
+LAMBDA = 1.0           # GeV
+DELTA_TARGET = 1.710   # GeV
+KAPPA = 0.500
+X0_CANONICAL = (1.705, 0.500, 0.417)
+
+
+def exact_cubic_v(m_S, lambda_S, kappa, C=C_GLUON, Lambda=LAMBDA):
+    """
+    Real root of m_S^2 v + lambda_S v^3 / 6 - kappa C / Lambda = 0 (Cardano),
+    polished by two Newton steps; vectorized over all arguments.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = 6 * m_S**2 / lambda_S
+        q = -6 * kappa * C / (Lambda * lambda_S)
+        sqrt_D = np.sqrt((q / 2)**2 + (p / 3)**3)
+        v = np.cbrt(-q / 2 + sqrt_D) + np.cbrt(-q / 2 - sqrt_D)
+        for _ in range(2):
+            v = v - (v**3 + p * v + q) / (3 * v**2 + p)
+    return v
+
+
+def _mass_gap(m_S, kappa, C, Lambda):
+    log_term = np.log(Lambda**2 / m_S**2)
+    Pi_S = (kappa**2 * C) / (4 * Lambda**2) * (1 + log_term / (16 * np.pi**2))
+    return np.sqrt(m_S**2 + Pi_S)
+
+
+def uidt_system_batch(x, C=C_GLUON, Lambda=LAMBDA, Delta_target=DELTA_TARGET):
+    """
+    Original error_propagation system for x = [m_S, kappa, lambda_S] of shape
+    (N, 3), with v = kappa C / (Lambda m_S^2). Then eq1 = lambda_S v^3 / 6,
+    so its roots have kappa = 0 or lambda_S = 0; kept for comparison.
+    """
+    m_S, kappa, lambda_S = np.moveaxis(x, -1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = kappa * C / (Lambda * m_S**2)
+        eq1 = m_S**2 * v + (lambda_S * v**3) / 6 - kappa * C / Lambda
+        eq2 = np.where(m_S > 0, _mass_gap(m_S, kappa, C, Lambda), np.nan) - Delta_target
+    eq3 = 5 * kappa**2 - 3 * lambda_S
+    return np.stack([eq1, eq2, eq3], axis=-1)
+
+
+def core_system_batch(x, C=C_GLUON, Lambda=LAMBDA, Delta_target=DELTA_TARGET):
+    """
+    core_system_root of the v3.5 verification suite for x = [m_S, kappa, lambda_S].
+    Unphysical points (any parameter <= 0) give NaN instead of [1, 1, 1].
+    With the exact VEV, eq1 vanishes identically: the roots form a curve in
+    (m_S, kappa, lambda_S), and batch_newton reports them as 'rank_deficient'.
+    """
+    m_S, kappa, lambda_S = np.moveaxis(x, -1, 0)
+    valid = (m_S > 0) & (kappa > 0) & (lambda_S > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = exact_cubic_v(m_S, lambda_S, kappa, C, Lambda)
+        eq1 = (m_S**2 * v + (lambda_S * v**3) / 6 - (kappa * C) / Lambda) * 100
+        eq2 = _mass_gap(m_S, kappa, C, Lambda) - Delta_target
+    eq3 = 5 * kappa**2 - 3 * lambda_S
+    F = np.stack([eq1, eq2, eq3], axis=-1)
+    return np.where(valid[..., None], F, np.nan)
+
+
+def fixed_kappa_system_batch(x, kappa=KAPPA, C=C_GLUON, Lambda=LAMBDA,
+                             Delta_target=DELTA_TARGET):
+    """
+    Well-posed canonical system for x = [m_S, lambda_S] at given kappa:
+    mass gap Delta(m_S, kappa) = Delta_target and 5 kappa^2 = 3 lambda_S.
+    """
+    m_S, lambda_S = np.moveaxis(x, -1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eq2 = np.where(m_S > 0, _mass_gap(m_S, kappa, C, Lambda), np.nan) - Delta_target
+    eq3 = 5 * kappa**2 - 3 * lambda_S
+    return np.stack([eq2, eq3], axis=-1)
+
+
+def canonical_system_batch(x, C=C_GLUON, Lambda=LAMBDA, Target_Delta=DELTA_TARGET):
+    """objective_function_system of the HMC master script for x = [m_S, kappa, lambda_S, v]."""
+    m_S, kappa, lambda_S, v = np.moveaxis(x, -1, 0)
+    F1 = (m_S**2 * v + (lambda_S * v**3) / 6) - (kappa * C) / Lambda
+    F2 = 5 * kappa**2 - 3 * lambda_S
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correction = (kappa**2 * C) / (4 * Lambda**2) * (1 + np.log(Lambda**2 / m_S**2) / (16 * np.pi**2))
+    F3 = (m_S**2 + correction) - Target_Delta**2
+    return np.stack([F1, F2, F3], axis=-1)
+
+
+def _take(args, idx):
+    return tuple(a if np.ndim(a) == 0 else np.asarray(a)[idx] for a in args)
+
+
+def _fd_jacobian(residual, x, F, args):
+    n = x.shape[-1]
+    h = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(x), 1.0)
+    J = np.empty(F.shape + (n,))
+    for j in range(n):
+        x_h = x.copy()
+        x_h[:, j] += h[:, j]
+        J[..., j] = (residual(x_h, *args) - F) / h[:, j, None]
+    return J
+
+
+def _rank(J, rcond):
+    s = np.linalg.svd(J, compute_uv=False)
+    return np.sum(s > rcond * s[..., :1], axis=-1)
+
+
+def batch_newton(residual, x0, args=(), jacobian=None, tol=1e-12, xtol=1e-15,
+                 max_iter=50, max_backtrack=20, rcond=1e-6):
+    """
+    Solve residual(x, *args) = 0 for all N points simultaneously.
+
+    x0:       start values, shape (N, n) or (n,) (broadcast to all points)
+    args:     scalars or arrays of length N (one value per point)
+    jacobian: optional jacobian(x, *args) -> (N, k, n)
+    rcond:    singular values below rcond * s_max count as zero; the
+              forward-difference noise of the Jacobian is ~sqrt(eps)
+    Returns a dict with x, residual, residual_norm (max |F_i|), rank of the
+    Jacobian at x, converged and status ('converged', 'rank_deficient',
+    'stalled' or 'max_iter') per point. converged requires |F| < tol and
+    full column rank, i.e. an isolated root.
+    """
+    sizes = [np.shape(a)[0] for a in args if np.ndim(a) > 0]
+    x0 = np.asarray(x0, dtype=float)
+    N = x0.shape[0] if x0.ndim == 2 else (sizes[0] if sizes else 1)
+    x = np.array(np.broadcast_to(x0, (N, x0.shape[-1])))
+    args = tuple(a if np.ndim(a) == 0 else np.broadcast_to(a, (N,)) for a in args)
+
+    F = residual(x, *args)
+    norm = np.max(np.abs(F), axis=-1)
+    n_iter = np.zeros(N, dtype=int)
+    stalled = np.zeros(N, dtype=bool)
+    active = np.flatnonzero(~(norm < tol))
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        a_args = _take(args, active)
+        xa, Fa = x[active], F[active]
+        J = jacobian(xa, *a_args) if jacobian is not None else _fd_jacobian(residual, xa, Fa, a_args)
+        JT = np.swapaxes(J, -1, -2)
+        JTJ = JT @ J
+        # Floor relative to the scale of J^T J keeps A regular for singular J
+        mu = np.maximum(np.sum(Fa**2, axis=-1),
+                        1e-14 * np.trace(JTJ, axis1=-2, axis2=-1) / x.shape[-1])
+        A = JTJ + mu[:, None, None] * np.eye(x.shape[-1])
+        g = (JT @ Fa[..., None])[..., 0]
+        with np.errstate(invalid='ignore'):
+            step = -np.linalg.solve(A, g[..., None])[..., 0]
+
+        # Backtracking: halve the step where |F| does not decrease
+        phi = np.sum(Fa**2, axis=-1)
+        alpha = np.ones(active.size)
+        x_new, F_new = xa + step, residual(xa + step, *a_args)
+        for _ in range(max_backtrack):
+            with np.errstate(invalid='ignore'):
+                bad = ~(np.sum(F_new**2, axis=-1) <= (1 - 1e-4 * alpha) * phi)
+            if not bad.any():
+                break
+            alpha[bad] *= 0.5
+            x_new[bad] = xa[bad] + alpha[bad, None] * step[bad]
+            F_new[bad] = residual(x_new[bad], *_take(a_args, bad))
+
+        ok = ~bad
+        x[active[ok]] = x_new[ok]
+        F[active[ok]] = F_new[ok]
+        norm[active] = np.max(np.abs(F[active]), axis=-1)
+        n_iter[active] += 1
+        tiny = np.linalg.norm(alpha[:, None] * step, axis=-1) <= xtol * (np.linalg.norm(xa, axis=-1) + xtol)
+        stalled[active[bad | tiny]] = True
+        active = active[~(norm[active] < tol) & ok & ~tiny]
+
+    n = x.shape[-1]
+    rank = np.zeros(N, dtype=int)
+    root = np.flatnonzero(norm < tol)
+    if root.size:
+        r_args = _take(args, root)
+        J = (jacobian(x[root], *r_args) if jacobian is not None
+             else _fd_jacobian(residual, x[root], F[root], r_args))
+        rank[root] = _rank(J, rcond)
+    converged = (norm < tol) & (rank == n)
+    status = np.where(converged, 'converged',
+                      np.where(norm < tol, 'rank_deficient',
+                               np.where(stalled, 'stalled', 'max_iter')))
+    return {
+        'x': x,
+        'residual': F,
+        'residual_norm': norm,
+        'rank': rank,
+        'converged': converged,
+        'n_iter': n_iter,
+        'status': status,
+    }
+
+
+def solve_canonical_batch(C=C_GLUON, Delta_target=DELTA_TARGET, kappa=KAPPA, Lambda=LAMBDA,
+                          x0=X0_CANONICAL, **kwargs):
+    """
+    Convenience wrapper: (m_S, kappa, lambda_S) for arrays of C, Delta and
+    kappa via fixed_kappa_system_batch. x0 is (m_S, kappa, lambda_S) as
+    elsewhere; its kappa entry is ignored. result['x'] has shape (N, 3).
+    """
+    C, Delta_target, kappa = np.broadcast_arrays(np.atleast_1d(C).astype(float),
+                                                 np.atleast_1d(Delta_target).astype(float),
+                                                 np.atleast_1d(kappa).astype(float))
+    x0 = np.asarray(x0, dtype=float)[..., [0, 2]]
+    result = batch_newton(fixed_kappa_system_batch, x0,
+                          args=(kappa, C, Lambda, Delta_target), **kwargs)
+    m_S, lambda_S = result['x'].T
+    result['x'] = np.stack([m_S, kappa, lambda_S], axis=-1)
+    return result
+
+
+def print_convergence_report(result):
+    """Summary of convergence masks, iterations and residuals."""
+    N = result['converged'].size
+    n_conv = int(result['converged'].sum())
+    print(f"   converged:      {n_conv}/{N} ({n_conv / N:.2%})")
+    for status in ('rank_deficient', 'stalled', 'max_iter'):
+        n = int(np.sum(result['status'] == status))
+        if n:
+            print(f"   {status + ':':15s} {n}")
+    finite = result['residual_norm'][np.isfinite(result['residual_norm'])]
+    if finite.size:
+        print(f"   max |F|:        {finite.max():.2e} (median {np.median(finite):.2e})")
+    print(f"   iterations:     mean {result['n_iter'].mean():.1f}, max {result['n_iter'].max()}")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    C = rng.normal(C_GLUON, 0.014, n)
+    Delta = rng.normal(DELTA_TARGET, 0.08, n)
+    start = time.perf_counter()
+    result = solve_canonical_batch(C, Delta)
+    print(f"{n} solves in {time.perf_counter() - start:.2f} s")
+    print_convergence_report(result)
@@ -0,0 +1,224 @@
+"""
+UIDT v3.2 Monte Carlo Propagation Engine
+========================================
+Samples the input distributions (C, Delta_target, kappa, alpha_s), solves
+the canonical system for (m_S, lambda_S) for every sample with the
+vectorized batch solver and derives v, Pi_S, Delta, the kinetic VEV,
+gamma and Psi = gamma^2.
+
+- the canonical equations do not determine kappa (see uidt_batch_solver),
+  so kappa is sampled as an input like C and Delta_target
+- the input spreads are the input uncertainties of error_propagation.py,
+  not fits to the published output spreads
+
+- samples are written chunk by chunk into a columnar store: a directory
+  with one .npy file per column (np.load(..., mmap_mode='r') works
+  directly) and meta.json; memory stays bounded by the chunk size
+- random numbers come from one Philox stream per block of BLOCK samples,
+  SeedSequence(seed, spawn_key=(block,)), so the chain does not depend on
+  the chunk size and interrupted runs resume where they stopped
+- 10^8 samples take about 0.8 GB per float column on disk
+
+Usage:
+    python uidt_monte_carlo.py --samples 100000 \\
+        --out data/raw/UIDT_MonteCarlo_samples_100k --csv
+
+Author: Philipp Rietz
+License: CC BY 4.0
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from uidt_batch_solver import (
+    C_GLUON, DELTA_TARGET, KAPPA, LAMBDA, X0_CANONICAL, exact_cubic_v, solve_canonical_batch
+)
+
+BLOCK = 65_536
+ALPHA_S = 0.5
+
+# name -> (mean, std); std = 0 keeps an input fixed
+DEFAULT_INPUTS = {
+    'C': (C_GLUON, 0.014),              # GeV^4, delta_C of error_propagation
+    'Delta_target': (DELTA_TARGET, 0.08),  # GeV, lattice delta_Delta of error_propagation
+    'kappa': (KAPPA, 0.014),            # delta_kappa(Delta) of error_propagation
+    'alpha_s': (ALPHA_S, 0.0),          # fixed at 1 GeV in the v3.3/v3.5 verification
+}
+
+COLUMNS = {
+    'C': 'f8', 'Delta_target': 'f8', 'kappa': 'f8', 'alpha_s': 'f8',
+    'm_S': 'f8', 'lambda_S': 'f8', 'v': 'f8',
+    'Pi_S': 'f8', 'Delta': 'f8', 'kin_vev': 'f8', 'gamma': 'f8', 'Psi': 'f8',
+    'residual_norm': 'f8', 'n_iter': 'i2', 'converged': '?',
+}
+
+
+def sample_inputs(seed, start, n, inputs=None):
+    """Inputs for samples [start, start + n); start must be a multiple of BLOCK."""
+    if start % BLOCK:
+        raise ValueError(f"start {start} is not a multiple of BLOCK={BLOCK}")
+    inputs = DEFAULT_INPUTS if inputs is None else inputs
+    out = {name: np.empty(n) for name in inputs}
+    for offset in range(0, n, BLOCK):
+        block = (start + offset) // BLOCK
+        rng = np.random.Generator(np.random.Philox(np.random.SeedSequence(seed, spawn_key=(block,))))
+        m = min(BLOCK, n - offset)
+        # Full blocks are always drawn, so a truncated last block matches a longer run
+        for name, (mean, std) in inputs.items():
+            out[name][offset:offset + m] = rng.normal(mean, std, BLOCK)[:m]
+    return out
+
+
+def derived_quantities(m_S, kappa, lambda_S, C, alpha_s, Lambda=LAMBDA):
+    """v, Pi_S, Delta, kinetic VEV, gamma and Psi = gamma^2 for solved parameters."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = exact_cubic_v(m_S, lambda_S, kappa, C, Lambda)
+        Pi_S = (kappa**2 * C) / (4 * Lambda**2) * (1 + np.log(Lambda**2 / m_S**2) / (16 * np.pi**2))
+        Delta = np.sqrt(m_S**2 + Pi_S)
+        kin_vev = (kappa * alpha_s * C) / (2 * np.pi * Lambda)
+        gamma = Delta / np.sqrt(kin_vev)
+    return {'v': v, 'Pi_S': Pi_S, 'Delta': Delta, 'kin_vev': kin_vev,
+            'gamma': gamma, 'Psi': gamma**2}
+
+
+def simulate_chunk(seed, start, n, inputs=None, Lambda=LAMBDA, x0=X0_CANONICAL):
+    """All columns for samples [start, start + n)."""
+    cols = sample_inputs(seed, start, n, inputs)
+    for name, (mean, _) in DEFAULT_INPUTS.items():
+        cols.setdefault(name, np.full(n, mean))
+    result = solve_canonical_batch(C=cols['C'], Delta_target=cols['Delta_target'],
+                                   kappa=cols['kappa'], Lambda=Lambda, x0=x0)
+    m_S, kappa, lambda_S = result['x'].T
+    cols.update(m_S=m_S, lambda_S=lambda_S,
+                residual_norm=result['residual_norm'], n_iter=result['n_iter'],
+                converged=result['converged'])
+    cols.update(derived_quantities(m_S, kappa, lambda_S, cols['C'], cols['alpha_s'], Lambda))
+    return cols
+
+
+def _meta_path(path):
+    return os.path.join(path, 'meta.json')
+
+
+def _write_meta(path, meta):
+    tmp = _meta_path(path) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, _meta_path(path))
+
+
+def run_monte_carlo(path, n_samples=100_000, chunk_size=4 * BLOCK, seed=42, inputs=None,
+                    Lambda=LAMBDA, resume=True, verbose=True):
+    """
+    Fill the columnar store at `path` with n_samples samples.
+    chunk_size is rounded up to a multiple of BLOCK; returns the metadata.
+    """
+    inputs = DEFAULT_INPUTS if inputs is None else inputs
+    chunk_size = -(-chunk_size // BLOCK) * BLOCK
+    config = {'n_samples': n_samples, 'seed': seed, 'block': BLOCK, 'Lambda': Lambda,
+              'inputs': {k: list(v) for k, v in inputs.items()}, 'columns': COLUMNS}
+
+    meta = None
+    if resume and os.path.exists(_meta_path(path)):
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+        if meta['config'] != config:
+            raise ValueError(f"{path} was written with a different configuration")
+    if meta is None:
+        os.makedirs(path, exist_ok=True)
+        meta = {'config': config, 'n_done': 0, 'n_converged': 0, 'seconds': 0.0}
+        for name, dtype in COLUMNS.items():
+            np.lib.format.open_memmap(os.path.join(path, f'{name}.npy'), mode='w+',
+                                      dtype=dtype, shape=(n_samples,)).flush()
+        _write_meta(path, meta)
+
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r+') for name in COLUMNS}
+    for start in range(meta['n_done'], n_samples, chunk_size):
+        t0 = time.perf_counter()
+        n = min(chunk_size, n_samples - start)
+        cols = simulate_chunk(seed, start, n, inputs, Lambda)
+        for name, arr in arrays.items():
+            arr[start:start + n] = cols[name]
+            arr.flush()
+        meta['n_done'] = start + n
+        meta['n_converged'] += int(cols['converged'].sum())
+        meta['seconds'] += time.perf_counter() - t0
+        _write_meta(path, meta)
+        if verbose:
+            print(f"   {meta['n_done']}/{n_samples} samples "
+                  f"({meta['n_done'] / meta['seconds']:.3g}/s)")
+    return meta
+
+
+def load_samples(path, columns=None):
+    """Read-only memmaps of the requested columns (default: all)."""
+    columns = COLUMNS if columns is None else columns
+    return {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in columns}
+
+
+def summarize(path, columns=('m_S', 'kappa', 'lambda_S', 'Delta', 'gamma', 'Psi'),
+              chunk_size=1 << 22):
+    """Streaming mean/std/min/max over converged samples, chunk by chunk."""
+    data = load_samples(path, tuple(columns) + ('converged',))
+    n_total = len(data['converged'])
+    stats = {name: [0, 0.0, 0.0, np.inf, -np.inf] for name in columns}
+    for start in range(0, n_total, chunk_size):
+        mask = np.asarray(data['converged'][start:start + chunk_size])
+        for name in columns:
+            x = np.asarray(data[name][start:start + chunk_size])[mask]
+            if x.size == 0:
+                continue
+            s = stats[name]
+            # Chan et al. parallel update of count, mean and M2
+            n_b, mean_b = x.size, x.mean()
+            delta = mean_b - s[1]
+            n = s[0] + n_b
+            s[2] += ((x - mean_b)**2).sum() + delta**2 * s[0] * n_b / n
+            s[1] += delta * n_b / n
+            s[0] = n
+            s[3], s[4] = min(s[3], x.min()), max(s[4], x.max())
+    return {name: {'n': n, 'mean': mean, 'std': np.sqrt(m2 / (n - 1)) if n > 1 else np.nan,
+                   'min': lo, 'max': hi}
+            for name, (n, mean, m2, lo, hi) in stats.items()}
+
+
+def export_csv(path, csv_path, columns=None, chunk_size=1 << 20):
+    """Write the store as CSV (header + rows), chunk by chunk."""
+    data = load_samples(path, columns)
+    names = list(data)
+    n_total = len(data[names[0]])
+    with open(csv_path, 'w') as f:
+        f.write(','.join(names) + '\n')
+        for start in range(0, n_total, chunk_size):
+            block = np.column_stack([np.asarray(data[k][start:start + chunk_size], dtype=float)
+                                     for k in names])
+            np.savetxt(f, block, delimiter=',', fmt='%.17g')
+    return csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UIDT Monte Carlo propagation engine")
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--out', default='UIDT_MonteCarlo_samples_100k')
+    parser.add_argument('--chunk', type=int, default=4 * BLOCK)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-resume', action='store_true')
+    parser.add_argument('--csv', action='store_true', help="also write <out>.csv")
+    args = parser.parse_args()
+
+    print(f"UIDT Monte Carlo: {args.samples} samples -> {args.out}")
+    meta = run_monte_carlo(args.out, args.samples, args.chunk, args.seed,
+                           resume=not args.no_resume)
+    print(f"   converged: {meta['n_converged']}/{meta['n_done']}")
+    for name, s in summarize(args.out).items():
+        print(f"   {name:9s} = {s['mean']:.5g} ± {s['std']:.3g}")
+    if args.csv:
+        print(f"   CSV: {export_csv(args.out, args.out + '.csv')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,55 +37,39 @@ DPI = 300
 BASE_DIR = os.getcwd()
 DATA_DIR = os.path.join(BASE_DIR, "data", "raw")
 OUTPUT_DIR = os.path.join(BASE_DIR, "docs", "assets")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Supplementary_Scripts"))
 
 # Create output directory if not exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def generate_synthetic_data(n_samples=100000):
+def generate_monte_carlo_data(n_samples=100000, seed=42):
     """
-    Fallback: Generates synthetic Monte Carlo data based on UIDT v3.5.6 canonical values
-    if the external CSV file is missing. This ensures the visualization engine never fails.
+    Fallback if the CSV is missing: runs the Monte Carlo propagation engine
+    (Supplementary_Scripts/uidt_monte_carlo.py) into a columnar store next
+    to the CSV. The chain is reproducible from the seed; an existing store
+    is reused (and resumed if it was interrupted).
     """
-    print(">> [INFO] Generating synthetic canonical data (v3.5.6 fallback)...")
-    np.random.seed(42)
-    
-    # Canonical Centers (v3.5.6)
-    m_S_mean = 1.705
-    kappa_mean = 0.500
-    
-    # Generate Distributions
-    m_S = np.random.normal(m_S_mean, 0.015, n_samples)
-    kappa = np.random.normal(kappa_mean, 0.008, n_samples)
-    
-    # Derived physics (simplified correlations for visualization)
-    # Delta approx m_S (strong correlation)
-    Delta = m_S * 1.0029 + np.random.normal(0, 0.001, n_samples) # Aligned to 1.710 target
-    
-    # Gamma derived from kappa (inverse correlation)
-    # gamma approx 16.339 * (0.5 / kappa)
-    gamma = 16.339 * (0.500 / kappa) + np.random.normal(0, 0.05, n_samples)
-    
-    # Psi
-    Psi = gamma**2
-    
-    df = pd.DataFrame({
-        'm_S': m_S,
-        'kappa': kappa,
-        'Delta': Delta,
-        'gamma': gamma,
-        'Psi': Psi
-    })
-    return df
+    from uidt_monte_carlo import load_samples, run_monte_carlo
+    
+    store = os.path.join(DATA_DIR, f"UIDT_MonteCarlo_samples_{n_samples // 1000}k")
+    print(f">> [INFO] Running Monte Carlo engine ({n_samples} samples, seed {seed}) -> {store}")
+    meta = run_monte_carlo(store, n_samples=n_samples, seed=seed, verbose=False)
+    print(f">> [INFO] {meta['n_converged']}/{meta['n_done']} samples converged")
+    
+    samples = load_samples(store)
+    converged = np.asarray(samples['converged'])
+    return pd.DataFrame({name: np.asarray(col)[converged] for name, col in samples.items()
+                         if name not in ('converged', 'n_iter', 'residual_norm')})
 
 def load_data(filename="UIDT_MonteCarlo_samples_100k.csv"):
-    """Loads real simulation data or falls back to synthetic."""
+    """Loads the sample CSV or generates the chain with the Monte Carlo engine."""
     path = os.path.join(DATA_DIR, filename)
     if os.path.exists(path):
         print(f">> [INFO] Loading real data from {path}...")
         return pd.read_csv(path)
     else:
-        print(f">> [WARN] {path} not found. Switching to synthetic generator.")
-        return generate_synthetic_data()
+        print(f">> [WARN] {path} not found. Generating it with the Monte Carlo engine.")
+        return generate_monte_carlo_data()
 
 def plot_stability_topology():
     """Figure 12.1: Stability Landscape (The Deep Well)"""